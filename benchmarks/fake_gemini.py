@@ -0,0 +1,252 @@
+# benchmarks/fake_gemini.py
+# 本機 Gemini API 替身（REST v1beta），讓基準測試不打真實 API、也不受其延遲與配額影響。
+# 後端以 GOOGLE_GEMINI_BASE_URL 指向這裡（見 GoogleSettings.base_url）。
+# - GET  models/{model}                         ：暖機用的模型資訊
+# - POST models/{model}:generateContent          ：重播 recordings.json 的 functionCall，收到 functionResponse 後回傳答案
+# - POST models/{model}:streamGenerateContent    ：同上，以 SSE 分段回傳
+# - POST models/{model}:batchEmbedContents / :embedContent：字元 bigram 雜湊向量（相近的問題 cosine 較高）
+# - latency_ms：每次生成呼叫的延遲；串流時平均分攤到各段
+
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+EMBEDDING_DIM = 256
+STREAM_CHUNK_CHARS = 16
+
+_PATH_PAT = re.compile(r"^/(?:v1beta|v1)/models/([^:/?]+)(?::(\w+))?")
+
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """字元 unigram + bigram 雜湊到固定維度後正規化。"""
+    vec = [0.0] * dim
+    s = re.sub(r"\s+", "", text or "")
+    for gram in list(s) + [s[i:i + 2] for i in range(len(s) - 1)]:
+        vec[zlib.crc32(gram.encode()) % dim] += 1.0
+    length = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / length for v in vec]
+
+
+class Recordings:
+    """recordings.json：依問題關鍵字與提到的公司數挑選劇本。"""
+
+    def __init__(self, path: str, companies: List[str]):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.scenarios = data["scenarios"]
+        self.default = data["default"]
+        self.no_company = data["no_company"]
+        # 長名稱先比對，避免「聯電」吃掉「聯電子」之類的重疊
+        self.companies = sorted(set(companies), key=len, reverse=True)
+
+    def companies_in(self, text: str) -> List[str]:
+        found, rest = [], text
+        for name in self.companies:
+            if name in rest:
+                found.append((text.find(name), name))
+                rest = rest.replace(name, "\0")
+        return [name for _, name in sorted(found)]
+
+    def pick(self, text: str) -> tuple:
+        companies = self.companies_in(text)
+        if not companies:
+            return self.no_company, companies
+        for sc in self.scenarios:
+            if len(companies) < sc.get("min_companies", 1):
+                continue
+            if not sc["keywords"] or any(k in text for k in sc["keywords"]):
+                return sc, companies
+        return self.default, companies
+
+
+def _fill(value, companies: List[str]):
+    if value == "{companies}":
+        return list(companies)
+    if isinstance(value, str):
+        return value.replace("{company}", companies[0] if companies else "").replace(
+            "{companies_text}", "、".join(companies)
+        )
+    if isinstance(value, dict):
+        return {k: _fill(v, companies) for k, v in value.items()}
+    return value
+
+
+def _text_of(content: dict) -> str:
+    return "".join(p.get("text") or "" for p in content.get("parts") or [])
+
+
+def _declared_name(tools: List[dict], tool: str) -> Optional[str]:
+    """mcp-agent 會替工具名稱加上 server 前綴；依後綴找回實際宣告的名稱。"""
+    for t in tools or []:
+        for decl in t.get("functionDeclarations") or t.get("function_declarations") or []:
+            name = decl.get("name", "")
+            if name == tool or name.endswith(f"_{tool}") or name.endswith(f"-{tool}"):
+                return name
+    return None
+
+
+class FakeGemini:
+    """
+    gemini = FakeGemini("benchmarks/recordings.json", companies, latency_ms=300).start()
+    os.environ["GOOGLE_GEMINI_BASE_URL"] = gemini.base_url
+    """
+
+    def __init__(
+        self,
+        recordings_path: str,
+        companies: List[str],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+    ):
+        self.recordings = Recordings(recordings_path, companies)
+        self.latency = latency_ms / 1000.0
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/"
+
+    def start(self) -> "FakeGemini":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    # ---------- 回應內容 ----------
+    def respond(self, body: dict) -> dict:
+        """依對話內容產生下一輪的 model content。"""
+        contents = body.get("contents") or []
+        question = next((_text_of(c) for c in contents if c.get("role", "user") == "user" and _text_of(c)), "")
+        scenario, companies = self.recordings.pick(question)
+
+        last = contents[-1] if contents else {}
+        answered = any("functionResponse" in p or "function_response" in p for p in last.get("parts") or [])
+        parts = []
+        if not answered:
+            for call in scenario["calls"]:
+                name = _declared_name(body.get("tools"), call["tool"])
+                if name:
+                    parts.append({"functionCall": {"name": name, "args": _fill(call["args"], companies)}})
+        if not parts:
+            parts = [{"text": _fill(scenario["answer"], companies)}]
+            self._count(f"answer:{scenario['name']}")
+        else:
+            self._count(f"tool_calls:{scenario['name']}")
+        return {"role": "model", "parts": parts}
+
+    @staticmethod
+    def envelope(content: dict, prompt_chars: int, finish: Optional[str] = "STOP") -> dict:
+        out_chars = sum(len(json.dumps(p, ensure_ascii=False)) for p in content["parts"])
+        candidate = {"content": content, "index": 0}
+        if finish:
+            candidate["finishReason"] = finish
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {
+                "promptTokenCount": prompt_chars // 2,
+                "candidatesTokenCount": out_chars // 2,
+                "totalTokenCount": (prompt_chars + out_chars) // 2,
+            },
+            "modelVersion": "fake-gemini",
+        }
+
+    def _handler(self):
+        gemini = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, payload: dict, status: int = 200) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                m = _PATH_PAT.match(self.path)
+                if not m or m.group(2):
+                    self._json({"error": {"code": 404, "message": "not found"}}, 404)
+                    return
+                gemini._count("models.get")
+                model = m.group(1)
+                self._json({
+                    "name": f"models/{model}",
+                    "displayName": model,
+                    "inputTokenLimit": 1048576,
+                    "outputTokenLimit": 8192,
+                    "supportedGenerationMethods": ["generateContent", "countTokens", "embedContent"],
+                })
+
+            def do_POST(self):
+                m = _PATH_PAT.match(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b"{}"
+                body = json.loads(raw or b"{}")
+                method = m.group(2) if m else None
+
+                if method == "batchEmbedContents":
+                    gemini._count("embed")
+                    self._json({"embeddings": [
+                        {"values": embed_text(_text_of(r.get("content") or {}))} for r in body.get("requests") or []
+                    ]})
+                elif method == "embedContent":
+                    gemini._count("embed")
+                    self._json({"embedding": {"values": embed_text(_text_of(body.get("content") or {}))}})
+                elif method == "generateContent":
+                    gemini._count("generate")
+                    if gemini.latency:
+                        time.sleep(gemini.latency)
+                    self._json(gemini.envelope(gemini.respond(body), len(raw)))
+                elif method == "streamGenerateContent":
+                    gemini._count("stream")
+                    self._stream(body, len(raw))
+                else:
+                    self._json({"error": {"code": 404, "message": f"unsupported: {self.path}"}}, 404)
+
+            def _stream(self, body: dict, prompt_chars: int) -> None:
+                content = gemini.respond(body)
+                text = "".join(p.get("text", "") for p in content["parts"])
+                if text:
+                    pieces = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+                    chunks = [{"role": "model", "parts": [{"text": p}]} for p in pieces]
+                else:
+                    chunks = [content]
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                delay = gemini.latency / len(chunks) if gemini.latency else 0.0
+                for i, chunk in enumerate(chunks):
+                    if delay:
+                        time.sleep(delay)
+                    finish = "STOP" if i == len(chunks) - 1 else None
+                    event = gemini.envelope(chunk, prompt_chars, finish)
+                    data = f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
@@ -0,0 +1,121 @@
+# benchmarks/fixtures.py
+# 基準測試用的本機資料集：欄名與線上 ESG / 勞動部 CSV 相同，內容由亂數種子決定（每次產生的檔案一樣）。
+# - 前幾家是真實公司名稱（含代號、英文簡稱），讓問題文字、別名與快速路徑的行為接近實際
+# - 其餘是合成公司，用來把資料集放大到指定的規模
+
+import csv
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+ESG_HEADERS = [
+    "申報年度", "公司代號", "公司名稱", "英文簡稱", "產業類別",
+    "員工薪資平均數(仟元/人)", "非擔任主管之全時員工薪資中位數(仟元/人)", "管理職女性主管佔比",
+]
+VIO_HEADERS = ["主管機關", "公告日期", "處分日期", "處分字號", "事業單位名稱或負責人", "違法法規法條", "違反法規內容", "罰鍰金額", "備註說明"]
+
+# (代號, 簡稱, 全名, 英文簡稱, 產業)
+KNOWN_COMPANIES = [
+    ("2330", "台積電", "台灣積體電路製造股份有限公司", "TSMC", "半導體業"),
+    ("2317", "鴻海", "鴻海精密工業股份有限公司", "Hon Hai", "其他電子業"),
+    ("2454", "聯發科", "聯發科技股份有限公司", "MediaTek", "半導體業"),
+    ("2303", "聯電", "聯華電子股份有限公司", "UMC", "半導體業"),
+    ("2412", "中華電", "中華電信股份有限公司", "CHT", "通信網路業"),
+    ("2308", "台達電", "台達電子工業股份有限公司", "Delta", "電子零組件業"),
+    ("2382", "廣達", "廣達電腦股份有限公司", "Quanta", "電腦及週邊設備業"),
+    ("3711", "日月光投控", "日月光投資控股股份有限公司", "ASEH", "半導體業"),
+    ("2603", "長榮", "長榮海運股份有限公司", "EMC", "航運業"),
+    ("2912", "統一超", "統一超商股份有限公司", "PCSC", "貿易百貨業"),
+    ("2882", "國泰金", "國泰金融控股股份有限公司", "CATHAY FHC", "金融保險業"),
+    ("5903", "全家", "全家便利商店股份有限公司", "FamilyMart", "貿易百貨業"),
+]
+
+_SYNTH_HEAD = "宏泰豐信盛興達昌隆聯光明華新富永順德安元大成和"
+_SYNTH_TAIL = ["科技", "電子", "精密", "實業", "工業", "光電", "材料", "國際", "生技", "物流"]
+_INDUSTRIES = ["半導體業", "電子零組件業", "光電業", "其他電子業", "航運業", "生技醫療業", "貿易百貨業"]
+_AGENCIES = ["臺北市政府", "新北市政府", "桃園市政府", "臺中市政府", "臺南市政府", "高雄市政府", "新竹科學園區管理局"]
+_LAB_ARTICLES = [
+    ("勞動基準法第24條", "延長工作時間未依規定加給工資"),
+    ("勞動基準法第32條第2項", "延長工作時間超過法定上限"),
+    ("勞動基準法第30條第6項", "未置備勞工出勤紀錄"),
+    ("勞動基準法第36條", "未使勞工每七日中有二日之休息"),
+    ("勞動基準法第22條第2項", "工資未全額直接給付勞工"),
+]
+_GE_ARTICLES = [
+    ("性別平等工作法第13條第2項", "知悉性騷擾情形未採取立即有效之糾正及補救措施"),
+    ("性別平等工作法第15條第1項", "未給予產假"),
+    ("性別平等工作法第21條第1項", "拒絕受僱者請求育嬰留職停薪"),
+    ("性別平等工作法第11條第1項", "資遣或解僱時因性別而有差別待遇"),
+]
+
+
+@dataclass
+class Fixtures:
+    directory: str
+    paths: Dict[str, str]  # 資料集 → CSV 路徑
+    companies: List[str]  # 問題中會用到的公司簡稱（真實公司在前）
+
+
+def _synthetic(rng: random.Random, n: int) -> List[tuple]:
+    out, seen = [], set()
+    code = 6100
+    while len(out) < n:
+        short = "".join(rng.sample(_SYNTH_HEAD, 2)) + rng.choice(_SYNTH_TAIL)
+        if short in seen:
+            continue
+        seen.add(short)
+        code += 1
+        out.append((str(code), short, f"{short}股份有限公司", f"SYN{code}", rng.choice(_INDUSTRIES)))
+    return out
+
+
+def _violations(rng: random.Random, companies: List[tuple], articles, rate: float) -> List[list]:
+    rows = []
+    for _, _, full, _, _ in companies:
+        for _ in range(rng.randint(0, 6) if rng.random() < rate else 0):
+            year = rng.randint(2019, 2025)
+            date = f"{year - 1911}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+            article, content = rng.choice(articles)
+            rows.append([
+                rng.choice(_AGENCIES), date, date, f"府勞字第{rng.randint(10**9, 10**10 - 1)}號",
+                full if rng.random() < 0.8 else f"{full}（負責人：{rng.choice('王李張陳林')}ＯＯ）",
+                article, content, str(rng.choice([20000, 50000, 100000, 200000, 500000])),
+                "",
+            ])
+    rows.sort(key=lambda r: r[1], reverse=True)
+    return rows
+
+
+def build(directory: str, n_companies: int = 2000, seed: int = 20250829) -> Fixtures:
+    """產生三個資料集的 CSV；n_companies 為公司總數（至少包含全部真實公司）。"""
+    rng = random.Random(seed)
+    companies = KNOWN_COMPANIES + _synthetic(rng, max(0, n_companies - len(KNOWN_COMPANIES)))
+    os.makedirs(directory, exist_ok=True)
+
+    esg = []
+    for code, short, _, en, industry in companies:
+        base = rng.randint(450, 2200)
+        for year in (2022, 2023, 2024):
+            growth = 1 + 0.03 * (year - 2022)
+            esg.append([
+                str(year), code, short, en, industry,
+                str(int(base * growth * 1.25)), str(int(base * growth)), f"{rng.uniform(5, 45):.2f}",
+            ])
+
+    tables = {
+        "esg_hr": (ESG_HEADERS, esg),
+        "labor_violations": (VIO_HEADERS, _violations(rng, companies, _LAB_ARTICLES, 0.35)),
+        "ge_work_equality_violations": (VIO_HEADERS, _violations(rng, companies, _GE_ARTICLES, 0.1)),
+    }
+    paths = {}
+    for key, (headers, rows) in tables.items():
+        path = os.path.join(directory, f"{key}.csv")
+        # 線上檔案是 UTF-8 with BOM
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        paths[key] = path
+
+    return Fixtures(directory, paths, [c[1] for c in companies])
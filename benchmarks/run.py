@@ -0,0 +1,371 @@
+# benchmarks/run.py
+# 端到端基準測試：本機 CSV 伺服器 + Gemini 替身 + 實際的後端與 MCP server。
+#
+#   python benchmarks/run.py --users 8 --requests 20 --companies 2000 --gemini-latency-ms 400
+#
+# 報告（JSON，印在 stdout 或寫到 --output）：
+# - startup：/readyz 各暖機階段的耗時（datasets 即冷啟動時的資料集下載與建索引時間）
+# - datasets：直接以 MCP client 呼叫 prefetch_datasets 的冷啟動 / 記憶體 / 磁碟快照三種情況
+# - tools：各 MCP 工具直接呼叫的延遲分位數
+# - load：N 個並行使用者打 /query 的 req/s、延遲分位數、錯誤數、回答路徑（cache / fast_path / llm）
+# - backend_tool_latency：後端 span 統計的 MCPAggregator.call_tool 延遲（/telemetry/latency）
+# - processes：負載期間 backend / mcp_server / telemetry_server 各自的 CPU% 與 RSS（需要 psutil）
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+try:
+    import psutil
+except ImportError:  # 沒有 psutil 時略過 CPU / 記憶體取樣
+    psutil = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fixtures  # noqa: E402
+from fake_gemini import FakeGemini  # noqa: E402
+from stub_http import StubFileServer  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "mcp_basic_google_agent")
+SERVER_PATH = os.path.join(ROOT, "mcp_server", "server.py")
+RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings.json")
+
+# 問題樣板：前四種是單一公司的結構化查詢（可走快取 / 快速路徑），後三種一定交給 LLM
+SINGLE_TEMPLATES = ["{a}有違反勞基法嗎", "{a}薪水多少", "{a}有違反性平法嗎", "幫我查一下{a}"]
+LLM_TEMPLATES = ["{a}和{b}哪一家比較適合新鮮人", "{a} 2023 年以後有違反勞基法嗎", "加班費怎麼計算"]
+
+# 直接呼叫的 MCP 工具與參數（{a} 代入公司）
+TOOL_CASES = [
+    ("query_context", {"text": "{a}有違反勞基法嗎"}),
+    ("company_profile", {"company": "{a}", "max_names": 5}),
+    ("esg_hr", {"company": "{a}", "limit": 3}),
+    ("labor_violations", {"company": "{a}", "limit": 5}),
+    ("ge_work_equality_violations", {"company": "{a}", "limit": 5}),
+    ("resolve_company", {"company": "{a}"}),
+    ("batch_company_report", {"companies": ["{a}", "{b}"], "limit": 5}),
+]
+
+
+# ------------------------------------------------------------
+# 統計
+# ------------------------------------------------------------
+def percentiles(samples: List[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    s = sorted(samples)
+
+    def q(p: float) -> float:
+        return round(s[min(len(s) - 1, int(p * len(s)))] * 1000, 2)
+
+    return {
+        "count": len(s),
+        "mean_ms": round(sum(s) / len(s) * 1000, 2),
+        "p50_ms": q(0.5),
+        "p90_ms": q(0.9),
+        "p99_ms": q(0.99),
+        "max_ms": round(s[-1] * 1000, 2),
+    }
+
+
+def make_query(rng: random.Random, companies: List[str], llm_ratio: float) -> str:
+    # 熱門公司被問得比較多（接近實際流量），重複的問題才有機會命中快取
+    pick = lambda: companies[min(int(rng.paretovariate(1.2)) - 1, len(companies) - 1)]  # noqa: E731
+    a, b = pick(), pick()
+    while b == a and len(companies) > 1:
+        b = rng.choice(companies)
+    template = rng.choice(LLM_TEMPLATES if rng.random() < llm_ratio else SINGLE_TEMPLATES)
+    return template.format(a=a, b=b)
+
+
+def fill(args: dict, a: str, b: str) -> dict:
+    def one(v):
+        if isinstance(v, str):
+            return v.format(a=a, b=b)
+        if isinstance(v, list):
+            return [one(x) for x in v]
+        return v
+
+    return {k: one(v) for k, v in args.items()}
+
+
+# ------------------------------------------------------------
+# 行程取樣（psutil）
+# ------------------------------------------------------------
+def component_of(proc) -> str:
+    try:
+        cmd = " ".join(proc.cmdline())
+    except Exception:
+        return "other"
+    if "mcp_server" in cmd and "server.py" in cmd:
+        return "mcp_server"
+    if "telemetry_server.py" in cmd:
+        return "telemetry_server"
+    return "backend"
+
+
+class ProcessSampler(threading.Thread):
+    """每 interval 秒取樣 backend 與其子行程的 CPU% / RSS，依元件彙總。"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: {"cpu": [], "rss": []})
+        self._procs: Dict[int, object] = {}
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            try:
+                root = psutil.Process(self.pid)
+                procs = [root, *root.children(recursive=True)]
+            except psutil.Error:
+                return
+            totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+            for p in procs:
+                proc = self._procs.setdefault(p.pid, p)
+                try:
+                    cpu = proc.cpu_percent(None)  # 第一次呼叫回傳 0，之後為兩次取樣間的平均
+                    rss = proc.memory_info().rss
+                except psutil.Error:
+                    continue
+                t = totals[component_of(proc)]
+                t[0] += cpu
+                t[1] += rss
+            for name, (cpu, rss) in totals.items():
+                self.samples[name]["cpu"].append(cpu)
+                self.samples[name]["rss"].append(rss)
+
+    def stop(self) -> dict:
+        self._done.set()
+        self.join()
+        out = {}
+        for name, s in sorted(self.samples.items()):
+            cpu, rss = s["cpu"][1:] or s["cpu"], s["rss"]
+            out[name] = {
+                "cpu_mean_pct": round(sum(cpu) / len(cpu), 1) if cpu else None,
+                "cpu_max_pct": round(max(cpu), 1) if cpu else None,
+                "rss_mean_mb": round(sum(rss) / len(rss) / 2**20, 1) if rss else None,
+                "rss_max_mb": round(max(rss) / 2**20, 1) if rss else None,
+            }
+        return out
+
+
+# ------------------------------------------------------------
+# MCP 工具（直接以 stdio client 呼叫，不經過後端）
+# ------------------------------------------------------------
+async def call_timed(session: ClientSession, tool: str, args: dict) -> float:
+    start = time.perf_counter()
+    result = await session.call_tool(tool, args)
+    elapsed = time.perf_counter() - start
+    if result.isError:
+        raise RuntimeError(f"{tool} 失敗: {result.content[0].text if result.content else ''}")
+    return elapsed
+
+
+async def bench_tools(env: dict, companies: List[str], repeat: int) -> dict:
+    params = StdioServerParameters(command=sys.executable, args=[SERVER_PATH], env=env, cwd=os.path.dirname(SERVER_PATH))
+    datasets, tools = {}, {}
+    rng = random.Random(7)
+
+    async with stdio_client(params) as (read, write), ClientSession(read, write) as session:
+        await session.initialize()
+        datasets["cold"] = round(await call_timed(session, "prefetch_datasets", {}) * 1000, 2)
+        datasets["memory"] = round(await call_timed(session, "prefetch_datasets", {}) * 1000, 2)
+        for tool, args in TOOL_CASES:
+            samples = []
+            for _ in range(repeat):
+                a, b = rng.sample(companies[: max(2, min(len(companies), 50))], 2)
+                samples.append(await call_timed(session, tool, fill(args, a, b)))
+            tools[tool] = percentiles(samples)
+
+    # 新行程、同一個 CACHE_DIR：從磁碟快照（mmap）載入
+    async with stdio_client(params) as (read, write), ClientSession(read, write) as session:
+        await session.initialize()
+        datasets["disk_snapshot"] = round(await call_timed(session, "prefetch_datasets", {}) * 1000, 2)
+
+    return {"datasets_ms": datasets, "tools": tools}
+
+
+# ------------------------------------------------------------
+# 後端負載
+# ------------------------------------------------------------
+async def wait_ready(client: httpx.AsyncClient, timeout: float) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            r = await client.get("/readyz")
+            if r.status_code == 200:
+                return r.json()
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise TimeoutError(f"後端在 {timeout:.0f} 秒內沒有就緒")
+
+
+async def drive_load(client: httpx.AsyncClient, companies: List[str], users: int, requests: int, llm_ratio: float) -> dict:
+    latencies: List[float] = []
+    by_route: Dict[str, List[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+
+    async def user(uid: int) -> None:
+        rng = random.Random(1000 + uid)
+        for _ in range(requests):
+            query = make_query(rng, companies, llm_ratio)
+            start = time.perf_counter()
+            try:
+                r = await client.post("/query", json={"query": query})
+                elapsed = time.perf_counter() - start
+                statuses[r.status_code] += 1
+                if r.status_code == 200:
+                    latencies.append(elapsed)
+                    by_route[r.json().get("route", "llm")].append(elapsed)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    wall = time.perf_counter() - start
+    ok = sum(n for code, n in statuses.items() if code == 200)
+    return {
+        "users": users,
+        "requests": users * requests,
+        "wall_seconds": round(wall, 2),
+        "req_per_sec": round(ok / wall, 2) if wall else None,
+        "latency": percentiles(latencies),
+        "routes": {route: percentiles(s) for route, s in sorted(by_route.items())},
+        "status": {str(k): v for k, v in statuses.items()},
+    }
+
+
+def start_backend(env: dict, port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+def stop_backend(proc: subprocess.Popen) -> None:
+    children = []
+    if psutil is not None:
+        try:
+            children = psutil.Process(proc.pid).children(recursive=True)
+        except psutil.Error:
+            pass
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+    for child in children:  # telemetry_server 由後端 Popen 啟動，不會隨後端結束
+        try:
+            child.terminate()
+        except psutil.Error:
+            pass
+
+
+# ------------------------------------------------------------
+# 主程式
+# ------------------------------------------------------------
+async def main(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="job-guardian-bench-")
+    try:
+        fx = fixtures.build(os.path.join(workdir, "data"), args.companies)
+        files = StubFileServer(
+            {f"/{key}.csv": path for key, path in fx.paths.items()}, latency_ms=args.dataset_latency_ms
+        ).start()
+        gemini = FakeGemini(RECORDINGS, fx.companies, latency_ms=args.gemini_latency_ms).start()
+
+        env = {
+            **os.environ,
+            "ESG_URL": files.url("/esg_hr.csv"),
+            "LAB_VIO_URL": files.url("/labor_violations.csv"),
+            "GE_VIO_URL": files.url("/ge_work_equality_violations.csv"),
+            "GOOGLE_API_KEY": "benchmark",
+            "GOOGLE_GEMINI_BASE_URL": gemini.base_url,
+            "RESPONSE_CACHE_ENABLED": "0" if args.no_cache else "1",
+            "FAST_PATH_ENABLED": "0" if args.no_fast_path else "1",
+            "LLM_POOL_SIZE": str(args.pool_size),
+            "PYTHONUNBUFFERED": "1",
+        }
+        report: dict = {
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            "fixtures": {k: os.path.getsize(p) for k, p in fx.paths.items()},
+        }
+
+        if not args.skip_tools:
+            report.update(await bench_tools({**env, "CACHE_DIR": os.path.join(workdir, "tools-cache")}, fx.companies, args.tool_repeat))
+
+        backend = start_backend({**env, "CACHE_DIR": os.path.join(workdir, "backend-cache")}, args.port)
+        sampler = ProcessSampler(backend.pid) if psutil is not None else None
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=args.timeout) as client:
+                start = time.perf_counter()
+                ready = await wait_ready(client, args.startup_timeout)
+                report["startup"] = {
+                    "ready_seconds": round(time.perf_counter() - start, 2),
+                    "stages": ready.get("stages"),
+                }
+                if sampler is not None:
+                    sampler.start()
+                report["load"] = await drive_load(client, fx.companies, args.users, args.requests, args.llm_ratio)
+                report["processes"] = sampler.stop() if sampler is not None else "psutil 未安裝"
+                report["backend_tool_latency"] = (await client.get("/telemetry/latency")).json()
+                report["backend_status"] = (await client.get("/")).json()
+        finally:
+            stop_backend(backend)
+
+        report["gemini_calls"] = dict(gemini.stats)
+        report["dataset_server"] = files.stats
+        gemini.stop()
+        files.stop()
+        return report
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Job Guardian 端到端基準測試")
+    p.add_argument("--users", type=int, default=8, help="並行使用者數")
+    p.add_argument("--requests", type=int, default=20, help="每位使用者送出的查詢數")
+    p.add_argument("--companies", type=int, default=2000, help="合成資料集的公司數")
+    p.add_argument("--llm-ratio", type=float, default=0.3, help="一定要交給 LLM 的問題比例")
+    p.add_argument("--gemini-latency-ms", type=float, default=400.0, help="Gemini 替身每次生成的延遲")
+    p.add_argument("--dataset-latency-ms", type=float, default=50.0, help="CSV 伺服器每個請求的延遲")
+    p.add_argument("--pool-size", type=int, default=4, help="後端 LLM_POOL_SIZE")
+    p.add_argument("--tool-repeat", type=int, default=30, help="每個 MCP 工具直接呼叫的次數")
+    p.add_argument("--no-cache", action="store_true", help="關閉回應快取")
+    p.add_argument("--no-fast-path", action="store_true", help="關閉快速路徑")
+    p.add_argument("--skip-tools", action="store_true", help="略過 MCP 工具直接呼叫的量測")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--timeout", type=float, default=120.0, help="單一查詢的逾時秒數")
+    p.add_argument("--startup-timeout", type=float, default=180.0)
+    p.add_argument("--keep", action="store_true", help="保留暫存目錄（資料集與快照）")
+    p.add_argument("--output", help="報告寫到此檔案（預設印在 stdout）")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
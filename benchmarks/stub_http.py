@@ -0,0 +1,93 @@
+# benchmarks/stub_http.py
+# 本機 CSV 檔案伺服器，代替 data.gov.tw / 勞動部的下載端點。
+# - 支援 ETag / Last-Modified 條件式請求（304），與線上端點一樣觸發 dataset_cache 的刷新路徑
+# - latency_ms：每個請求先睡一段時間，模擬遠端下載的來回延遲
+# - 記錄每個路徑的請求數、304 次數與傳送 bytes
+
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class StubFileServer:
+    """
+    server = StubFileServer({"/esg_hr.csv": path, ...}, latency_ms=50).start()
+    url = server.url("/esg_hr.csv")
+    ...
+    server.stop()
+    """
+
+    def __init__(self, files: Dict[str, str], host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        self.files = files
+        self.latency = latency_ms / 1000.0
+        self.stats: Dict[str, Dict[str, int]] = {p: {"requests": 0, "not_modified": 0, "bytes": 0} for p in files}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def start(self) -> "StubFileServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, path: str, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[path][key] += n
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):  # 不輸出 access log
+                pass
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                file = server.files.get(path)
+                if file is None:
+                    self.send_error(404)
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                server._count(path, "requests")
+
+                st = os.stat(file)
+                etag = '"' + hashlib.md5(f"{st.st_size}-{st.st_mtime_ns}".encode()).hexdigest() + '"'
+                last_modified = formatdate(st.st_mtime, usegmt=True)
+                if self.headers.get("If-None-Match") == etag:
+                    server._count(path, "not_modified")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                with open(file, "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+                server._count(path, "bytes", len(body))
+
+        return Handler
@@ -7,17 +7,56 @@ import {
     type ChatModelAdapter,
 } from "@assistant-ui/react";
 
+type ToolCallPart = {
+    type: "tool-call";
+    toolCallId: string;
+    toolName: string;
+    args: Record<string, unknown>;
+    argsText: string;
+    result?: string;
+    isError?: boolean;
+};
+
+// 把 fetch 的 response body 拆成一個個 SSE 事件（event + JSON data）
+async function* readEvents(body: ReadableStream<Uint8Array>) {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    try {
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, "\n");
+            let sep: number;
+            while ((sep = buffer.indexOf("\n\n")) >= 0) {
+                const block = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+                let event = "message";
+                let data = "";
+                for (const line of block.split("\n")) {
+                    if (line.startsWith("event:")) event = line.slice(6).trim();
+                    else if (line.startsWith("data:")) data += line.slice(5).trim();
+                }
+                if (data) yield { event, data: JSON.parse(data) };
+            }
+        }
+    } finally {
+        reader.releaseLock();
+    }
+}
+
 const MyModelAdapter: ChatModelAdapter = {
-    async run({ messages, abortSignal }) {
+    async *run({ messages, abortSignal }) {
         const lastMessage = messages.at(-1);
         const query = lastMessage?.content.find(c => c.type === 'text')?.text ?? '';
 
         // TODO replace with your own API
         const apiUrl = (process.env.BACKEND_HOST && process.env.BACKEND_PORT) ? `http://${process.env.BACKEND_HOST}:${process.env.BACKEND_PORT}` : "http://localhost:8000";
-        const result = await fetch(`${apiUrl}/query`, {
+        const result = await fetch(`${apiUrl}/query/stream`, {
             method: "POST",
             headers: {
                 "Content-Type": "application/json",
+                "Accept": "text/event-stream",
             },
             // forward the messages in the chat to the API
             body: JSON.stringify({
@@ -27,15 +66,54 @@ const MyModelAdapter: ChatModelAdapter = {
             signal: abortSignal,
         });
 
-        const data = await result.json();
-        return {
+        // 尚未初始化 / 輸入錯誤時後端直接回 JSON
+        if (!result.ok || !result.body) {
+            const data = await result.json().catch(() => ({}));
+            yield { content: [{ type: "text", text: data.error ?? `查詢失敗 (${result.status})` }] };
+            return;
+        }
+
+        // 工具呼叫依開始順序顯示，摘要文字逐段累加
+        const toolCalls: ToolCallPart[] = [];
+        let text = "";
+        const snapshot = () => ({
             content: [
-                {
-                    type: "text",
-                    text: data.result ?? "",
-                },
+                ...toolCalls,
+                ...(text ? [{ type: "text" as const, text }] : []),
             ],
-        };
+        });
+
+        for await (const { event, data } of readEvents(result.body)) {
+            switch (event) {
+                case "tool_start":
+                    toolCalls.push({
+                        type: "tool-call",
+                        toolCallId: data.id ?? `${data.name}-${toolCalls.length}`,
+                        toolName: data.name,
+                        args: data.arguments ?? {},
+                        argsText: JSON.stringify(data.arguments ?? {}),
+                    });
+                    break;
+                case "tool_end": {
+                    const call = toolCalls.find(c => !c.result && c.toolName === data.name && (!data.id || c.toolCallId === data.id));
+                    if (call) {
+                        call.result = data.is_error ? "查詢失敗" : "完成";
+                        call.isError = Boolean(data.is_error);
+                    }
+                    break;
+                }
+                case "delta":
+                    text += data.text ?? "";
+                    break;
+                case "done":
+                    text = data.result ?? text;
+                    break;
+                case "error":
+                    text = data.error ?? "查詢失敗";
+                    break;
+            }
+            yield snapshot();
+        }
     },
 };
 
@@ -51,4 +129,4 @@ export function MyRuntimeProvider({
             {children}
         </AssistantRuntimeProvider>
     );
-}
\ No newline at end of file
+}
@@ -0,0 +1,258 @@
+# mcp_basic_google_agent/fast_path.py
+# 確定性快速路徑：「查某家公司」這類結構化問題不經過 LLM。
+# - 公司：由 MCP server 的 query_context（名稱索引 + 別名表）取出，問題只提到一家公司時才走快速路徑
+# - 意圖：EmbeddingIntentClassifier 分類；信心不足、或判定為開放式問題時交回 LLM
+# - 直接以 MCPAggregator.call_tool 平行呼叫對應工具，再以固定模板組出回答
+# - 任何一步失敗都回傳 None，由呼叫端改走 LLM
+
+import asyncio
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from mcp_agent.mcp.mcp_aggregator import MCPAggregator
+from mcp_agent.workflows.intent_classifier.intent_classifier_base import Intent
+from mcp_agent.workflows.intent_classifier.intent_classifier_embedding import EmbeddingIntentClassifier
+
+SERVER_NAME = "job_guardian"
+OPEN_ENDED = "open_ended"
+
+# 問題中指定了年份（例如「2023 年以後」）時需要 LLM 判斷篩選條件
+_YEAR_PAT = re.compile(r"(?<!\d)(19|20)\d{2}(?!\d)")
+
+INTENTS = [
+    Intent(
+        name="company_overview",
+        description="查詢一家公司的整體狀況：ESG 人力資料與違反勞動法規紀錄的綜合概況",
+        examples=["台積電這家公司怎麼樣", "鴻海的風險概況", "幫我查一下聯發科", "中華電信是好公司嗎", "長榮的資料"],
+    ),
+    Intent(
+        name="esg_hr",
+        description="查詢一家公司的薪資、員工福利、女性主管比例等 ESG 人力發展資料",
+        examples=["台積電薪水多少", "聯電的員工薪資中位數", "廣達女性主管比例", "台達電福利好嗎", "日月光平均薪資"],
+    ),
+    Intent(
+        name="labor_violations",
+        description="查詢一家公司違反勞動基準法的紀錄、罰鍰與違反法條",
+        examples=["台積電有違反勞基法嗎", "鴻海勞基法違規紀錄", "全家有沒有被罰過", "統一超商違反勞基法", "長榮加班違法"],
+    ),
+    Intent(
+        name="ge_work_equality_violations",
+        description="查詢一家公司違反性別平等工作法的紀錄",
+        examples=["台積電有違反性平法嗎", "鴻海性別工作平等法違規", "中華電信性騷擾防治違規", "國泰產假違法紀錄"],
+    ),
+    Intent(
+        name=OPEN_ENDED,
+        description="需要推理、比較、建議或解釋的開放式問題",
+        examples=[
+            "台積電和聯電哪一家比較適合新鮮人",
+            "什麼是勞基法第 24 條",
+            "加班費怎麼計算",
+            "科技業哪家公司最好",
+            "違反勞基法的公司還值得去嗎",
+        ],
+    ),
+]
+
+# 意圖 → 要平行呼叫的工具（company_profile 只讀預先算好的彙總，幾乎不花時間）
+_PLANS: Dict[str, List[Tuple[str, dict]]] = {
+    "company_overview": [("company_profile", {"max_names": 5})],
+    "esg_hr": [("company_profile", {"max_names": 5})],
+    "labor_violations": [("company_profile", {"max_names": 5}), ("labor_violations", {"limit": 5})],
+    "ge_work_equality_violations": [
+        ("company_profile", {"max_names": 5}),
+        ("ge_work_equality_violations", {"limit": 5}),
+    ],
+}
+
+
+@dataclass
+class FastPathAnswer:
+    intent: str
+    company: str
+    confidence: float
+    text: str
+    tools: List[str]
+
+
+class FastPathRouter:
+    """
+    answer = await router.route(query, context)   # context = query_context 工具的回傳值
+    answer 為 None 時交給 LLM。
+    """
+
+    def __init__(
+        self,
+        aggregator: MCPAggregator,
+        classifier: EmbeddingIntentClassifier,
+        min_confidence: float = 0.7,
+    ):
+        self.aggregator = aggregator
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self._routed = 0
+        self._fallbacks = 0
+
+    async def route(self, query: str, context: Optional[dict]) -> Optional[FastPathAnswer]:
+        company = _single_company(query, context)
+        if company is None:
+            return self._fallback()
+
+        try:
+            results = await self.classifier.classify(query, top_k=1)
+        except Exception:
+            return self._fallback()
+        if not results or results[0].intent == OPEN_ENDED or results[0].p_score < self.min_confidence:
+            return self._fallback()
+        intent = results[0].intent
+
+        plan = _PLANS[intent]
+        outputs = await asyncio.gather(
+            *(self._call(tool, {"company": company, **args}) for tool, args in plan),
+            return_exceptions=True,
+        )
+        if any(o is None or isinstance(o, BaseException) for o in outputs):
+            return self._fallback()
+        data = {tool: out for (tool, _), out in zip(plan, outputs)}
+
+        text = render(intent, company, data)
+        if text is None:
+            return self._fallback()
+        self._routed += 1
+        return FastPathAnswer(intent, company, results[0].p_score, text, [tool for tool, _ in plan])
+
+    def stats(self) -> dict:
+        return {"routed": self._routed, "fallbacks": self._fallbacks, "min_confidence": self.min_confidence}
+
+    async def _call(self, tool: str, arguments: dict) -> Optional[dict]:
+        result = await self.aggregator.call_tool(tool, arguments, server_name=SERVER_NAME)
+        if result.isError or not result.content:
+            return None
+        return json.loads(result.content[0].text)
+
+    def _fallback(self) -> None:
+        self._fallbacks += 1
+        return None
+
+
+def _single_company(query: str, context: Optional[dict]) -> Optional[str]:
+    """問題只提到一家公司、且沒有指定年份時回傳該公司；否則 None。"""
+    if not context or len(context.get("entities") or []) != 1:
+        return None
+    company = context["entities"][0]
+    if _YEAR_PAT.search(query.replace(company, "")):
+        return None
+    return company
+
+
+# ------------------------------------------------------------
+# 回答模板
+# ------------------------------------------------------------
+def _num(v) -> str:
+    if v is None:
+        return "—"
+    if isinstance(v, float) and not v.is_integer():
+        return f"{v:,.2f}"
+    return f"{int(v):,}"
+
+
+def _pct(p) -> str:
+    return f"（同業 PR {p:.0f}）" if isinstance(p, (int, float)) else ""
+
+
+def _render_esg(profile: dict) -> List[str]:
+    rows = profile.get("esg_hr") or []
+    if not rows:
+        return ["- ESG 人力資料：查無資料"]
+    lines = []
+    for r in rows[:3]:
+        pr = r.get("percentile") or {}
+        head = f"- **{r.get('公司名稱')}**（{r.get('公司代號') or '無代號'}，{r.get('年度') or '年度不明'}）"
+        lines.append(head)
+        for m in ("員工薪資中位數", "員工薪資平均數", "女性主管比例"):
+            if r.get(m) is not None:
+                lines.append(f"  - {m}：{_num(r[m])}{_pct(pr.get(m))}")
+        lines.append(f"  - 比較基準：{r.get('peer_group')}（{r.get('peer_count')} 家）")
+    return lines
+
+
+def _render_violation_summary(title: str, v: dict) -> List[str]:
+    count = v.get("count") or 0
+    if not v.get("matched_name_count"):
+        return [f"- {title}：資料集中沒有名稱相符的事業單位"]
+    if not count:
+        return [f"- {title}：查無紀錄"]
+    lines = [f"- {title}：共 {count} 件，罰鍰合計 {_num(v.get('total_fine'))} 元，最近公告 {v.get('latest_date') or '—'}"]
+    by_year = v.get("count_by_year") or {}
+    if by_year:
+        lines.append("  - 各年件數：" + "、".join(f"{y} 年 {n} 件" for y, n in sorted(by_year.items(), reverse=True)))
+    articles = v.get("top_articles") or []
+    if articles:
+        lines.append("  - 常見違反法條：" + "、".join(f"{a['法條']}（{a['count']}）" for a in articles[:3]))
+    return lines
+
+
+def _render_items(title: str, result: dict) -> List[str]:
+    items = result.get("items") or []
+    if not items:
+        return []
+    lines = [f"**{title}最近 {len(items)} 筆**"]
+    for it in items:
+        lines.append(
+            f"- {it.get('公告日期') or '—'}｜{it.get('事業單位名稱') or ''}｜{it.get('違反法條') or '—'}"
+            f"｜罰鍰 {it.get('罰鍰金額') or '—'}"
+        )
+    return lines
+
+
+def _resolved_note(profile: dict) -> List[str]:
+    """三個資料集各自的名稱解析結果：已依代號/別名對應的名稱，或只找到、需要使用者確認的相近名稱。"""
+    company = profile.get("company")
+    sections = (
+        ("ESG 人力資料", profile.get("esg_resolved")),
+        ("違反勞動基準法", (profile.get("labor_violations") or {}).get("resolved")),
+        ("違反性別平等工作法", (profile.get("ge_work_equality_violations") or {}).get("resolved")),
+    )
+    adopted: Dict[Tuple[str, ...], List[str]] = {}
+    similar: List[str] = []
+    for title, resolved in sections:
+        if not resolved:
+            continue
+        names = tuple(resolved.get("resolved_to") or ())
+        if names:
+            adopted.setdefault(names, []).append(title)
+        elif resolved.get("candidates"):
+            cands = "、".join(c["name"] for c in resolved["candidates"][:3])
+            similar.append(f"（{title}：查無「{company}」，相近名稱有 {cands}，請確認是否為同一家公司）")
+    notes = [
+        f"（{'、'.join(titles)}：查詢名稱「{company}」已對應到 {'、'.join(names)}）"
+        for names, titles in adopted.items()
+    ]
+    return notes + similar
+
+
+def render(intent: str, company: str, data: Dict[str, dict]) -> Optional[str]:
+    """依意圖把工具結果組成 Markdown 回答；資料不足以回答時回傳 None。"""
+    profile = data.get("company_profile") or {}
+    lab = profile.get("labor_violations") or {}
+    ge = profile.get("ge_work_equality_violations") or {}
+    if not profile.get("esg_hr") and not lab.get("count") and not ge.get("count"):
+        # 三個資料集都查不到：可能是名稱對不上，交給 LLM 以 resolve_company 等工具再試
+        return None
+
+    esg_names = [r.get("公司名稱") for r in profile.get("esg_hr") or [] if r.get("公司名稱")]
+    lines = [f"### {esg_names[0] if len(esg_names) == 1 else company} 查詢結果", *_resolved_note(profile), ""]
+    if intent in ("company_overview", "esg_hr"):
+        lines += ["**ESG 人力發展**", *_render_esg(profile), ""]
+    if intent in ("company_overview", "labor_violations"):
+        lines += _render_violation_summary("違反勞動基準法", lab)
+    if intent in ("company_overview", "ge_work_equality_violations"):
+        lines += _render_violation_summary("違反性別平等工作法", ge)
+    if intent == "labor_violations":
+        lines += ["", *_render_items("違反勞基法", data.get("labor_violations") or {})]
+    if intent == "ge_work_equality_violations":
+        lines += ["", *_render_items("違反性平法", data.get("ge_work_equality_violations") or {})]
+
+    lines += ["", "資料來源：臺灣證券交易所 ESG 資訊、勞動部違反勞動法令事業單位公布資料。"]
+    return "\n".join(lines).strip()
@@ -1,21 +1,32 @@
 import asyncio
+import json
 import sys, os
 import time
 import subprocess
+from contextlib import AsyncExitStack, aclosing
+from typing import Optional
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
+from opentelemetry import trace
 from pydantic import BaseModel
 from mcp_agent.app import MCPApp
 from mcp_agent.config import get_settings, MCPSettings, MCPServerSettings
 from mcp_agent.agents.agent import Agent
-from mcp_agent.workflows.llm.augmented_llm_google import GoogleAugmentedLLM
+from mcp_agent.mcp.mcp_aggregator import MCPAggregator
+from mcp_agent.workflows.llm.augmented_llm_google import GoogleAugmentedLLM, create_google_client
+from mcp_agent.workflows.embedding.embedding_google import GoogleEmbeddingModel
+from mcp_agent.workflows.intent_classifier.intent_classifier_embedding_google import GoogleEmbeddingIntentClassifier
 from telemetry.config import setup_telemetry
+from telemetry.ring_buffer import SpanRingBuffer
 from telemetry.tracing import trace_span
+from session_pool import LLMSessionPool, PoolBusyError
+from response_cache import SemanticResponseCache
+from fast_path import INTENTS, FastPathRouter
 
 # === Data Model ===
 class Essay(BaseModel):
@@ -34,11 +45,61 @@ settings = get_settings()
 # resolving the issue from loading the relative path in the YAML file.
 if not settings.mcp:
     settings.mcp = MCPSettings()
-settings.mcp.servers["job_guardian"] = MCPServerSettings(
-    command="python",
-    args=[os.path.join(BASE_DIR, "mcp_server", "server.py")],
-    transport="stdio",
+# stdio 子行程預設只繼承少數系統環境變數；資料來源、快取與解析設定需明確轉交（未設定的交給 server 的 .env）
+MCP_SERVER_ENV_KEYS = (
+    "ESG_URL", "LAB_VIO_URL", "GE_VIO_URL", "CACHE_DIR", "DATASET_TTL",
+    "HTTP_TIMEOUT", "HTTP_MAX_CONNECTIONS", "HTTP2", "STREAM_CHUNK_SIZE", "PARSE_BATCH_SIZE",
+    "CASE_SENSITIVE", "PARTIAL_MATCH", "SNAPSHOT_KEEP", "SNAPSHOT_MEMORY",
+    "RESOLVE_MIN_SCORE", "RESOLVE_LIMIT", "ALIAS_FILE", "DEFAULT_VERBOSITY",
 )
+# 共用模式：連到主機上已啟動的 streamable-HTTP job-guardian server（多個後端共用資料集快照），不另外啟動子行程
+JOB_GUARDIAN_MCP_URL = os.getenv("JOB_GUARDIAN_MCP_URL", "").strip()
+# 同時呼叫工具時分散到多條 MCP 連線（STDIO 子行程或 HTTP session），忙碌時才增加到上限
+MCP_POOL_MIN_SIZE = int(os.getenv("MCP_POOL_MIN_SIZE", "1"))
+MCP_POOL_MAX_SIZE = int(os.getenv("MCP_POOL_MAX_SIZE", "1"))
+if JOB_GUARDIAN_MCP_URL:
+    settings.mcp.servers["job_guardian"] = MCPServerSettings(
+        transport="streamable_http",
+        url=JOB_GUARDIAN_MCP_URL,
+        pool_min_size=MCP_POOL_MIN_SIZE,
+        pool_max_size=MCP_POOL_MAX_SIZE,
+    )
+else:
+    settings.mcp.servers["job_guardian"] = MCPServerSettings(
+        command=sys.executable,
+        args=[os.path.join(BASE_DIR, "mcp_server", "server.py")],
+        transport="stdio",
+        env={k: os.environ[k] for k in MCP_SERVER_ENV_KEYS if k in os.environ},
+        pool_min_size=MCP_POOL_MIN_SIZE,
+        pool_max_size=MCP_POOL_MAX_SIZE,
+    )
+
+# MCP server 的工具／提示／資源清單快取（依 server 設定與回報的版本；收到 list_changed 即失效）
+# 設定路徑則寫到磁碟，重啟後版本沒變就不必重新列出工具
+MCP_CAPABILITY_CACHE_PATH = os.getenv("MCP_CAPABILITY_CACHE_PATH", "").strip()
+if MCP_CAPABILITY_CACHE_PATH:
+    settings.mcp.capability_cache_path = MCP_CAPABILITY_CACHE_PATH
+
+# LLM session pool：同時處理的查詢數、排隊上限與等待逾時（秒）
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "4"))
+LLM_POOL_MAX_WAITING = int(os.getenv("LLM_POOL_MAX_WAITING", "32"))
+LLM_POOL_ACQUIRE_TIMEOUT = float(os.getenv("LLM_POOL_ACQUIRE_TIMEOUT", "60"))
+
+# 語意回應快取：條目上限、存活秒數、cosine 相似度門檻與 embedding 模型（留空則只做字串比對）
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") not in ("0", "false", "False")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))
+RESPONSE_CACHE_EMBEDDING_MODEL = os.getenv("RESPONSE_CACHE_EMBEDDING_MODEL", "text-embedding-004")
+
+# 快速路徑：單一公司的結構化查詢不經 LLM，直接呼叫工具 + 模板回答；意圖信心低於門檻時交回 LLM
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "1") not in ("0", "false", "False")
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.7"))
+FAST_PATH_EMBEDDING_MODEL = os.getenv("FAST_PATH_EMBEDDING_MODEL", "text-embedding-004")
+
+# 記憶體中保留的最近 spans（給 /telemetry/* 查詢）
+SPAN_BUFFER_TRACES = int(os.getenv("SPAN_BUFFER_TRACES", "200"))
+SPAN_BUFFER_SPANS_PER_TRACE = int(os.getenv("SPAN_BUFFER_SPANS_PER_TRACE", "256"))
 
 # === FastAPI 初始化 ===
 app = FastAPI(title="Job Guardian API", version="1.0")
@@ -53,7 +114,13 @@ app.add_middleware(
 
 # === Agent 狀態 ===
 mcp_app = MCPApp(name="job_guardian_agent", settings=settings)
-agent_state = {"ready": False, "agent": None, "llm": None, "logs": []}
+span_buffer = SpanRingBuffer(max_traces=SPAN_BUFFER_TRACES, max_spans_per_trace=SPAN_BUFFER_SPANS_PER_TRACE)
+agent_state = {"ready": False, "agent": None, "pool": None, "cache": None, "router": None, "logs": []}
+
+# 暖機階段：與 MCP server 無關的（Gemini、意圖分類器）和 server 啟動平行進行；
+# server 起來後工具清單與資料集預載也平行進行。全部結束才開始接受查詢
+WARMUP_STAGES = ("mcp_server", "tools", "datasets", "gemini", "intent_classifier")
+agent_state["stages"] = {name: {"status": "pending"} for name in WARMUP_STAGES}
 
 
 # === 啟動事件 ===
@@ -64,13 +131,37 @@ async def startup_event():
     subprocess.Popen([sys.executable, telemetry_server_path])
     agent_state["logs"].append("📡 Telemetry server started.")
 
-    setup_telemetry("job_guardian_backend")
+    setup_telemetry("job_guardian_backend", span_buffer=span_buffer)
     asyncio.create_task(start_agent())  # 背景啟動
     agent_state["logs"].append("🚀 Agent startup task scheduled.")
 
 
+async def run_stage(name: str, coro, required: bool = False):
+    """執行一個暖機階段並記錄狀態與耗時；非必要階段失敗時回傳 None，不中斷啟動。"""
+    stage = agent_state["stages"][name]
+    stage["status"] = "running"
+    start = time.time()
+    try:
+        result = await coro
+    except Exception as e:
+        stage.update(status="failed", elapsed=round(time.time() - start, 3), error=str(e))
+        agent_state["logs"].append(f"⚠️ 暖機階段 {name} 失敗: {e}")
+        if required:
+            raise
+        return None
+    stage.update(status="done", elapsed=round(time.time() - start, 3))
+    if isinstance(result, dict):
+        stage["detail"] = result
+    return result
+
+
+def skip_stage(name: str, reason: str) -> None:
+    agent_state["stages"][name].update(status="skipped", reason=reason)
+
+
 async def start_agent():
     async with mcp_app.run() as agent_app:
+        context = agent_app.context
         job_guardian_agent = Agent(
             name="job_guardian",
             instruction=(
@@ -78,31 +169,160 @@ async def start_agent():
                 "可用的工具有：\n"
                 "1. esg_hr: 查詢公司的 ESG 人力發展資料（薪資、福利、女性主管比例）。\n"
                 "2. labor_violations: 查詢勞動部違反勞基法紀錄。\n"
-                "3. ge_work_equality_violations: 查詢違反性別工作平等法紀錄。\n\n"
+                "3. ge_work_equality_violations: 查詢違反性別工作平等法紀錄。\n"
+                "4. company_profile: 一次取得單一公司的綜合風險概況（違規件數/罰鍰/常見法條、ESG 指標與百分位）。\n"
+                "   詢問某家公司整體狀況時優先使用，不必依序呼叫上述三個工具。\n"
+                "5. batch_company_report: 一次查詢多家公司的上述三類資料（比較多家公司時優先使用）。\n"
+                "   另有 esg_hr_many / labor_violations_many / ge_work_equality_violations_many 可一次查多家公司的單一資料集。\n"
+                "6. resolve_company: 將股票代號、英文名或可能有錯字的名稱解析成資料集中的公司名稱候選。\n"
+                "   工具回傳含 resolved 欄位時：resolved_to 非空代表查詢名稱已依代號/別名自動對應，回答時請說明實際對應到的公司；\n"
+                "   needs_confirmation=true 代表只找到相近名稱（candidates），不可直接當成同一家公司，請向使用者確認。\n"
+                "查詢工具預設只回傳精簡欄位；回傳 has_more=true 時可帶 next_cursor 作為 cursor 取得下一頁，"
+                "需要原始資料列時再指定 verbosity=\"full\" 或 fields。\n\n"
                 "你的任務是根據使用者的問題呼叫正確的工具。\n"
                 "當你收到工具回傳的結果後，你必須將該結果撰寫成一段通順的中文摘要來回答使用者。"
             ),
             server_names=["job_guardian"],
         )
 
-        async with job_guardian_agent:
-            llm = await job_guardian_agent.attach_llm(GoogleAugmentedLLM)
+        startup = time.time()
+        # 不需要 MCP server 的階段先開始
+        gemini_task = asyncio.create_task(run_stage("gemini", warm_gemini(context)))
+        if FAST_PATH_ENABLED:
+            classifier_task = asyncio.create_task(run_stage("intent_classifier", build_intent_classifier(context)))
+        else:
+            skip_stage("intent_classifier", "FAST_PATH_ENABLED=0")
+            classifier_task = None
+
+        async with AsyncExitStack() as stack:
+            try:
+                # 啟動 MCP server（stdio 子行程）並完成 initialize
+                await run_stage("mcp_server", stack.enter_async_context(job_guardian_agent), required=True)
+                # 快速路徑直接以 MCPAggregator 呼叫工具；persistent 連線與 agent 共用同一個 MCP server 行程
+                aggregator = await stack.enter_async_context(MCPAggregator(
+                    server_names=["job_guardian"], context=context, name="job_guardian_fast_path"
+                ))
+                await asyncio.gather(
+                    run_stage("tools", list_agent_tools(job_guardian_agent), required=True),
+                    run_stage("datasets", prefetch_datasets(aggregator)),
+                )
+            except Exception as e:
+                agent_state["logs"].append(f"❌ Job Guardian agent 啟動失敗: {e}")
+                for task in (gemini_task, classifier_task):
+                    if task is not None:
+                        task.cancel()
+                return
+
+            # 每個 session 是獨立的 GoogleAugmentedLLM（各自的 history），共用同一個 agent 的 MCP 連線
+            pool = LLMSessionPool(
+                lambda: GoogleAugmentedLLM(agent=job_guardian_agent),
+                size=LLM_POOL_SIZE,
+                max_waiting=LLM_POOL_MAX_WAITING,
+                acquire_timeout=LLM_POOL_ACQUIRE_TIMEOUT,
+            )
+            cache = build_response_cache(context) if RESPONSE_CACHE_ENABLED else None
+            classifier = await classifier_task if classifier_task is not None else None
+            router = FastPathRouter(aggregator, classifier, min_confidence=FAST_PATH_MIN_CONFIDENCE) if classifier else None
+            await gemini_task
+
             agent_state.update({
                 "ready": True,
                 "agent": job_guardian_agent,
-                "llm": llm
+                "pool": pool,
+                "cache": cache,
+                "router": router,
+                "startup_seconds": round(time.time() - startup, 3),
             })
-            agent_state["logs"].append("✅ Job Guardian agent initialized and ready.")
+            agent_state["logs"].append(
+                f"✅ Job Guardian agent initialized and ready ({pool.size} LLM sessions, "
+                f"warm-up {agent_state['startup_seconds']:.1f}s)."
+            )
 
             # 保持常駐
             while True:
                 await asyncio.sleep(60)
 
 
+async def list_agent_tools(agent: Agent) -> dict:
+    result = await agent.list_tools()
+    return {"count": len(result.tools)}
+
+
+async def prefetch_datasets(aggregator: MCPAggregator) -> dict:
+    """請 MCP server 先載入三個資料集並建好索引（第一個查詢不必等下載）"""
+    result = await aggregator.call_tool("prefetch_datasets", {}, server_name="job_guardian")
+    if result.isError or not result.content:
+        raise RuntimeError(f"prefetch_datasets 失敗: {result.content}")
+    data = json.loads(result.content[0].text)
+    for name, info in data["datasets"].items():
+        if "error" in info:
+            agent_state["logs"].append(f"⚠️ 資料集 {name} 預載失敗，將於第一次查詢時重試: {info['error']}")
+    return data
+
+
+async def warm_gemini(context) -> dict:
+    """建立共用的 Gemini client 並先打一次輕量 API，讓連線與 TLS 在第一個查詢前就緒"""
+    config = context.config.google
+    model = getattr(config, "default_model", None) or "gemini-2.0-flash"
+    client = create_google_client(config)
+    # 工具迴圈走同步 client，串流與 embedding 走非同步 client；兩組連線都先建立
+    await asyncio.gather(
+        asyncio.to_thread(client.models.get, model=model),
+        client.aio.models.get(model=model),
+    )
+    return {"model": model}
+
+
+def build_response_cache(context) -> SemanticResponseCache:
+    embedder = None
+    if RESPONSE_CACHE_EMBEDDING_MODEL:
+        try:
+            embedder = GoogleEmbeddingModel(model=RESPONSE_CACHE_EMBEDDING_MODEL, context=context)
+        except Exception as e:
+            agent_state["logs"].append(f"⚠️ Embedding 模型初始化失敗，回應快取只做字串比對: {e}")
+    return SemanticResponseCache(
+        embedder,
+        max_entries=RESPONSE_CACHE_SIZE,
+        ttl=RESPONSE_CACHE_TTL,
+        threshold=RESPONSE_CACHE_THRESHOLD,
+    )
+
+
+async def build_intent_classifier(context) -> GoogleEmbeddingIntentClassifier:
+    """快速路徑用的意圖分類器；失敗時（run_stage 回傳 None）停用快速路徑"""
+    embedder = GoogleEmbeddingModel(model=FAST_PATH_EMBEDDING_MODEL, context=context)
+    classifier = GoogleEmbeddingIntentClassifier(intents=INTENTS, embedding_model=embedder, context=context)
+    await classifier.initialize()  # 預先計算各意圖的 embedding
+    return classifier
+
+
 # === API ===
 @app.get("/")
 async def root():
-    return {"status": "running", "agent_ready": agent_state["ready"]}
+    pool = agent_state["pool"]
+    cache = agent_state["cache"]
+    router = agent_state["router"]
+    return {
+        "status": "running",
+        "agent_ready": agent_state["ready"],
+        "pool": pool.stats() if pool else None,
+        "cache": cache.stats() if cache else None,
+        "fast_path": router.stats() if router else None,
+        "startup_seconds": agent_state.get("startup_seconds"),
+    }
+
+
+@app.get("/healthz")
+async def healthz():
+    """liveness：行程活著就回 200"""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """readiness：所有暖機階段結束才回 200；未完成時回 503 與各階段進度"""
+    body = {"ready": agent_state["ready"], "stages": agent_state["stages"]}
+    return body if agent_state["ready"] else JSONResponse(body, status_code=503)
 
 
 @app.get("/logs")
@@ -111,35 +331,106 @@ async def logs():
     return PlainTextResponse("\n".join(agent_state["logs"][-50:]))
 
 
+# === Telemetry 查詢（讀記憶體中的 span 環狀緩衝區） ===
+def _ns(seconds):
+    return int(seconds * 1e9) if seconds is not None else None
+
+
+@app.get("/telemetry/traces")
+async def telemetry_traces(limit: int = 50):
+    """最近的 trace 摘要（新到舊）"""
+    return {"traces": span_buffer.traces(limit)}
+
+
+@app.get("/telemetry/traces/{trace_id}")
+async def telemetry_trace(trace_id: str):
+    """單一 trace 的所有 spans（依開始時間排序）"""
+    spans = span_buffer.trace(trace_id)
+    if not spans:
+        return JSONResponse({"error": f"查無 trace {trace_id}（可能已被較新的 trace 擠出緩衝區）"}, status_code=404)
+    return {"trace_id": trace_id, "spans": spans}
+
+
+@app.get("/telemetry/spans")
+async def telemetry_spans(name: str | None = None, since: float | None = None, until: float | None = None, limit: int = 100):
+    """依 span 名稱（子字串）與結束時間範圍（epoch 秒）查詢"""
+    return {"spans": span_buffer.search(name, _ns(since), _ns(until), limit)}
+
+
+@app.get("/telemetry/latency")
+async def telemetry_latency():
+    """各工具的呼叫延遲分佈（毫秒）"""
+    return {"tools": span_buffer.latency()}
+
+
 @trace_span("receive_prompt")
 def receive_prompt(user_query: str):
     """Logs the received user query."""
     agent_state["logs"].append(f"🔍 Received query: {user_query}")
 
+@trace_span("query_context")
+async def fetch_query_context(user_query: str):
+    """問題提到的公司與目前的資料版本（回應快取的鍵）；MCP server 查詢失敗時回傳 None。"""
+    try:
+        result = await agent_state["agent"].call_tool("query_context", {"text": user_query}, server_name="job_guardian")
+        if result.isError or not result.content:
+            return None
+        return json.loads(result.content[0].text)
+    except Exception as e:
+        agent_state["logs"].append(f"⚠️ query_context 失敗，略過回應快取: {e}")
+        return None
+
+def llm_prompt(user_query: str) -> str:
+    return f"根據輸入內容「{user_query}」，請查詢對應的公司紀錄並回傳總結。"
+
 @trace_span("llm_tool_call_and_synthesis")
 async def execute_llm_generation(llm, user_query: str) -> str:
     """Calls the LLM to generate a response using tools."""
-    result = await llm.generate_str(
-        message=f"根據輸入內容「{user_query}」，請查詢對應的公司紀錄並回傳總結。"
-    )
+    result = await llm.generate_str(message=llm_prompt(user_query))
     return result
 
+@trace_span("fast_path")
+async def try_fast_path(user_query: str, context):
+    """單一公司的結構化查詢直接呼叫工具並套模板；不適用時回傳 None。"""
+    router = agent_state["router"]
+    if router is None or context is None:
+        return None
+    try:
+        return await router.route(user_query, context)
+    except Exception as e:
+        agent_state["logs"].append(f"⚠️ 快速路徑失敗，改由 LLM 回答: {e}")
+        return None
+
 @trace_span("format_response")
-def format_response(query: str, result: str, elapsed: float):
+def format_response(
+    query: str,
+    result: str,
+    elapsed: float,
+    queued: float = 0.0,
+    cached: bool = False,
+    route: str = "llm",
+    confidence: Optional[float] = None,
+):
     """Formats the final successful response."""
-    msg = f"✅ 查詢完成 ({elapsed:.2f}s)：{query}"
+    # confidence：快速路徑的意圖分類信心分數，其他路徑為 None
+    note = "，快取" if cached else (f"，快速路徑 {confidence:.2f}" if route == "fast_path" else "")
+    msg = f"✅ 查詢完成 ({elapsed:.2f}s{note})：{query}"
     agent_state["logs"].append(msg)
     return {
         "query": query,
         "result": result,
         "elapsed": elapsed,
+        "queued": queued,
+        "cached": cached,
+        "route": "cache" if cached else route,
+        "confidence": confidence,
     }
 
 @app.post("/query")
 async def query(request: Request):
     """Assistant-UI 呼叫的主要 API"""
     if not agent_state["ready"]:
-        return JSONResponse({"error": "Agent 尚未初始化完成"}, status_code=503)
+        return JSONResponse({"error": "Agent 尚未初始化完成", "stages": agent_state["stages"]}, status_code=503)
 
     data = await request.json()
     user_query = data.get("query", "").strip()
@@ -148,23 +439,151 @@ async def query(request: Request):
 
     receive_prompt(user_query)
 
-    llm = agent_state["llm"]
+    pool = agent_state["pool"]
+    cache = agent_state["cache"]
     start = time.time()
 
     try:
-        # LLM 判斷應用的 tool 並查詢 + 總結
-        result = await execute_llm_generation(llm, user_query)
+        # 同公司、同資料版本、意思相近的問題直接回傳先前的答案，不佔用 LLM session
+        context = await fetch_query_context(user_query) if cache or agent_state["router"] else None
+        if cache and context is not None:
+            hit = await cache.lookup(user_query, context["entities"], context["snapshots"])
+            if hit is not None:
+                return format_response(user_query, hit, time.time() - start, cached=True)
+
+        # 只問一家公司的某類資料：不經 LLM，直接呼叫工具 + 模板回答
+        answer = await try_fast_path(user_query, context)
+        if answer is not None:
+            return format_response(
+                user_query, answer.text, time.time() - start, route="fast_path", confidence=answer.confidence
+            )
+
+        # 借一個獨立的 LLM session；所有 session 都在忙時排隊
+        async with pool.session() as llm:
+            queued = time.time() - start
+
+            # LLM 判斷應用的 tool 並查詢 + 總結
+            result = await execute_llm_generation(llm, user_query)
+
+        if cache and context is not None:
+            await cache.store(user_query, context["entities"], context["snapshots"], result)
 
         elapsed = time.time() - start
         
-        response = format_response(user_query, result, elapsed)
+        response = format_response(user_query, result, elapsed, queued)
         return response
 
+    except PoolBusyError as e:
+        agent_state["logs"].append(f"⏳ 查詢排隊已滿: {e}")
+        return JSONResponse({"error": str(e)}, status_code=429)
+
     except Exception as e:
         err_msg = f"❌ 查詢失敗: {e}"
         agent_state["logs"].append(err_msg)
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+# === 串流查詢（SSE） ===
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/query/stream")
+async def query_stream(request: Request):
+    """
+    與 /query 相同，但以 server-sent events 逐步回傳：
+      tool_start / tool_end：工具呼叫開始與結束
+      delta：Gemini 產生的摘要片段
+      done：完整結果（同 /query 的回應格式）
+      error：查詢失敗
+    """
+    if not agent_state["ready"]:
+        return JSONResponse({"error": "Agent 尚未初始化完成", "stages": agent_state["stages"]}, status_code=503)
+
+    data = await request.json()
+    user_query = data.get("query", "").strip()
+    if not user_query:
+        return JSONResponse({"error": "請輸入查詢內容"}, status_code=400)
+
+    receive_prompt(user_query)
+    return StreamingResponse(
+        stream_llm_generation(user_query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def stream_llm_generation(user_query: str):
+    pool = agent_state["pool"]
+    cache = agent_state["cache"]
+    start = time.time()
+    # 非同步產生器跨越多次 yield，span 不設為 current，手動結束
+    span = trace.get_tracer(__name__).start_span("llm_tool_call_and_synthesis_stream")
+    span.set_attribute("args", user_query[:200])
+
+    try:
+        context = await fetch_query_context(user_query) if cache or agent_state["router"] else None
+        if cache and context is not None:
+            hit = await cache.lookup(user_query, context["entities"], context["snapshots"])
+            if hit is not None:
+                yield sse("delta", {"text": hit})
+                yield sse("done", format_response(user_query, hit, time.time() - start, cached=True))
+                return
+
+        answer = await try_fast_path(user_query, context)
+        if answer is not None:
+            for tool in answer.tools:
+                yield sse("tool_start", {"id": None, "name": tool, "arguments": {"company": answer.company}})
+                yield sse("tool_end", {"id": None, "name": tool, "is_error": False})
+            yield sse("delta", {"text": answer.text})
+            yield sse(
+                "done",
+                format_response(
+                    user_query, answer.text, time.time() - start, route="fast_path", confidence=answer.confidence
+                ),
+            )
+            return
+
+        async with pool.session() as llm:
+            queued = time.time() - start
+            result = ""
+            async with aclosing(llm.generate_stream(message=llm_prompt(user_query))) as events:
+                async for event in events:
+                    if event.type == "text":
+                        yield sse("delta", {"text": event.text})
+                    elif event.type == "tool_call_start":
+                        yield sse("tool_start", {
+                            "id": event.tool_call_id,
+                            "name": event.tool_name,
+                            "arguments": event.arguments,
+                        })
+                    elif event.type == "tool_call_end":
+                        yield sse("tool_end", {
+                            "id": event.tool_call_id,
+                            "name": event.tool_name,
+                            "is_error": event.is_error,
+                        })
+                    elif event.type == "done":
+                        result = event.text
+
+        if cache and context is not None:
+            await cache.store(user_query, context["entities"], context["snapshots"], result)
+
+        span.set_attribute("result.preview", result[:200])
+        yield sse("done", format_response(user_query, result, time.time() - start, queued))
+
+    except PoolBusyError as e:
+        agent_state["logs"].append(f"⏳ 查詢排隊已滿: {e}")
+        yield sse("error", {"error": str(e), "status": 429})
+
+    except Exception as e:
+        agent_state["logs"].append(f"❌ 查詢失敗: {e}")
+        span.record_exception(e)
+        yield sse("error", {"error": str(e), "status": 500})
+
+    finally:
+        span.end()
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
@@ -0,0 +1,176 @@
+# mcp_basic_google_agent/response_cache.py
+# /query 的語意回應快取：同一家公司、同一版資料、意思相近的問題直接回傳先前的答案，不再呼叫 LLM。
+# - 快取鍵 = 問題中解析出的公司（以公司代號統一寫法）+ 問題中的年份/數字 + 三個資料集的快照版本
+# - 同一組公司與數字內先比對正規化後的問題字串，再以 embedding 的 cosine 相似度比對
+#   （embedding 分不出「2023 年」與「2024 年」，數字不同的問題不互相命中）
+# - 問題中解析不出公司時只做字串比對：不同公司的問題全落在同一組，語意相近不代表答案相同
+# - LRU + TTL 淘汰；任一資料集的快照版本改變時整個快取清空
+# - 沒有 embedding 模型（或呼叫失敗）時退化成只做字串比對
+
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mcp_agent.workflows.embedding.embedding_base import EmbeddingModel
+
+# 標點與空白不影響問題的意思
+_STRIP_PAT = re.compile(r"[\s\W_]+", re.UNICODE)
+
+# 年份、筆數、金額等數字（NFKC 後全形數字已轉成半形）
+_NUMBER_PAT = re.compile(r"\d+(?:\.\d+)?")
+
+# 快取分組：(公司, 問題中的數字)
+Group = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+def normalize_query(text: str) -> str:
+    """全形半形統一、轉小寫、去掉空白與標點。"""
+    return _STRIP_PAT.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def query_group(query: str, entities: List[str]) -> Group:
+    """
+    同一組的問題才做語意比對：公司相同，且問題中的數字（年份、筆數…）相同。
+    公司代號本身也是數字，已由 entities 表示，不重複計入。
+    """
+    companies = tuple(sorted(entities))
+    # 從原始問題取數字：正規化會去掉空白，「2330 2023」會黏成一個數字
+    numbers = _NUMBER_PAT.findall(unicodedata.normalize("NFKC", query or ""))
+    numbers = tuple(sorted(set(numbers) - set(companies)))
+    return companies, numbers
+
+
+@dataclass
+class _Entry:
+    norm: str
+    vector: Optional[np.ndarray]
+    answer: str
+    created_at: float
+
+
+class SemanticResponseCache:
+    """
+    hit = await cache.lookup(query, entities, snapshots)
+    ...
+    await cache.store(query, entities, snapshots, answer)
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingModel] = None,
+        max_entries: int = 256,
+        ttl: float = 3600.0,
+        threshold: float = 0.92,
+    ):
+        self.embedder = embedder
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.threshold = threshold
+        # (正規化問題, 分組) → 條目；OrderedDict 的順序即 LRU 順序
+        self._entries: "OrderedDict[Tuple[str, Group], _Entry]" = OrderedDict()
+        self._snapshots: Optional[Tuple[Tuple[str, str], ...]] = None
+        # lookup 算過的向量留給緊接著的 store 用，不重複呼叫 embedding API
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    # ---------- 查詢 ----------
+    async def lookup(self, query: str, entities: List[str], snapshots: Dict[str, str]) -> Optional[str]:
+        """回傳快取中的答案；沒有命中時回傳 None。"""
+        self._check_snapshots(snapshots)
+        self._purge()
+        norm = normalize_query(query)
+        group = query_group(query, entities)
+
+        entry = self._entries.get((norm, group))
+        if entry is not None:
+            self._entries.move_to_end((norm, group))
+            self._hits += 1
+            return entry.answer
+
+        # 沒有公司的條目不存向量，這裡自然不會有候選
+        candidates = [(k, e) for k, e in self._entries.items() if k[1] == group and e.vector is not None]
+        vector = await self._embed(norm) if candidates else None
+        if vector is not None:
+            key, entry, score = max(
+                ((k, e, float(np.dot(vector, e.vector))) for k, e in candidates),
+                key=lambda t: t[2],
+            )
+            if score >= self.threshold:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._semantic_hits += 1
+                return entry.answer
+
+        self._misses += 1
+        return None
+
+    async def store(self, query: str, entities: List[str], snapshots: Dict[str, str], answer: str) -> None:
+        self._check_snapshots(snapshots)
+        norm = normalize_query(query)
+        if not norm or not answer:
+            return
+        key = (norm, query_group(query, entities))
+        vector = await self._embed(norm) if entities else None
+        self._entries[key] = _Entry(norm, vector, answer, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._vectors.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "semantic_hits": self._semantic_hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "semantic": self.embedder is not None,
+        }
+
+    # ---------- 內部 ----------
+    def _check_snapshots(self, snapshots: Dict[str, str]) -> None:
+        current = tuple(sorted((snapshots or {}).items()))
+        if self._snapshots is not None and current != self._snapshots:
+            # 資料換版：舊答案可能已過時
+            self.clear()
+            self._invalidations += 1
+        self._snapshots = current
+
+    def _purge(self) -> None:
+        if not self.ttl:
+            return
+        deadline = time.time() - self.ttl
+        # 依 LRU 順序不等於依建立時間，需整個掃過；條目數有上限，成本可忽略
+        for key in [k for k, e in self._entries.items() if e.created_at < deadline]:
+            del self._entries[key]
+
+    async def _embed(self, norm: str) -> Optional[np.ndarray]:
+        if self.embedder is None or not norm:
+            return None
+        vector = self._vectors.get(norm)
+        if vector is None:
+            try:
+                vector = (await self.embedder.embed([norm]))[0]
+            except Exception:
+                return None
+            length = float(np.linalg.norm(vector))
+            if not length:
+                return None
+            vector = vector / length
+            self._vectors[norm] = vector
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        self._vectors.move_to_end(norm)
+        return vector
@@ -0,0 +1,78 @@
+# mcp_basic_google_agent/session_pool.py
+# 每個 /query 請求借一個獨立的 LLM session，用完歸還。
+# - 所有 session 共用同一個 Agent（同一條 MCP server 連線），只有對話 history 各自獨立
+# - 同時執行的請求數上限 = pool 大小；其餘請求排隊（FIFO），排隊人數也有上限
+# - 借出與歸還時都清空 history，請求之間不會看到彼此的對話
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Generic, Optional, TypeVar
+
+LLMT = TypeVar("LLMT")
+
+
+class PoolBusyError(Exception):
+    """排隊人數已滿，或等待 session 逾時。"""
+
+
+class LLMSessionPool(Generic[LLMT]):
+    """
+    async with pool.session() as llm:
+        await llm.generate_str(...)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], LLMT],
+        size: int = 4,
+        max_waiting: int = 32,
+        acquire_timeout: Optional[float] = 60.0,
+    ):
+        self.size = max(1, size)
+        self.max_waiting = max_waiting
+        self.acquire_timeout = acquire_timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(factory())
+        self._waiting = 0
+        self._served = 0
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[LLMT]:
+        """借出一個 session；沒有空閒時排隊等待，排隊已滿或逾時丟出 PoolBusyError。"""
+        # 正在取 session 的人數扣掉空閒 session 數 = 真正要排隊的人數
+        if self._waiting - self._idle.qsize() >= self.max_waiting:
+            raise PoolBusyError(f"目前查詢人數過多（排隊 {self.max_waiting} 人），請稍後再試")
+
+        self._waiting += 1
+        try:
+            llm = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise PoolBusyError(f"等待可用的 LLM session 超過 {self.acquire_timeout:.0f} 秒")
+        finally:
+            self._waiting -= 1
+
+        _reset(llm)
+        try:
+            yield llm
+        finally:
+            _reset(llm)
+            self._served += 1
+            self._idle.put_nowait(llm)
+
+    def stats(self) -> dict:
+        idle = self._idle.qsize()
+        return {
+            "size": self.size,
+            "idle": idle,
+            "in_use": self.size - idle,
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "served": self._served,
+        }
+
+
+def _reset(llm) -> None:
+    history = getattr(llm, "history", None)
+    if history is not None:
+        history.clear()
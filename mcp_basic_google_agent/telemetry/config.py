@@ -2,10 +2,11 @@ from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from telemetry.exporter import get_exporter
+from telemetry.ring_buffer import SpanRingBuffer
 
 
-def setup_telemetry(service_name: str = "mcp_basic_google_agent"):
-    """初始化 OpenTelemetry Provider 與 Exporter"""
+def setup_telemetry(service_name: str = "mcp_basic_google_agent", span_buffer: SpanRingBuffer | None = None):
+    """初始化 OpenTelemetry Provider 與 Exporter；span_buffer 另外保留最近的 spans 供 API 查詢"""
     # 建立 provider
     provider = TracerProvider()
     
@@ -13,6 +14,8 @@ def setup_telemetry(service_name: str = "mcp_basic_google_agent"):
     exporter = get_exporter()
     processor = BatchSpanProcessor(exporter)
     provider.add_span_processor(processor)
+    if span_buffer is not None:
+        provider.add_span_processor(span_buffer)
 
     # 設定全域 tracer provider
     trace.set_tracer_provider(provider)
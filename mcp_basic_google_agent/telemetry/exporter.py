@@ -1,11 +1,29 @@
 import os
 import json
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
-from rich.console import Console
-from rich.syntax import Syntax
 
-console = Console()
+# 終端輸出模式：off（預設，正式環境）/ plain（每個 span 一行 JSON）/ rich（Rich 高亮，開發用）
+TELEMETRY_CONSOLE = os.getenv("TELEMETRY_CONSOLE", "off").lower()
+# 活動紀錄檔輪替：超過大小（bytes）或存在超過秒數就換檔，保留 backup_count 個舊檔
+TELEMETRY_LOG_MAX_BYTES = int(os.getenv("TELEMETRY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TELEMETRY_LOG_BACKUPS = int(os.getenv("TELEMETRY_LOG_BACKUPS", "5"))
+TELEMETRY_LOG_ROTATE_SECONDS = float(os.getenv("TELEMETRY_LOG_ROTATE_SECONDS", "86400"))
+
+# 🧩 僅關心 MCP 過程（過濾掉初始化、load_servers 等）
+ACTIVITY_KEYS = (
+    "receive_prompt",
+    "tool_call",
+    "send_request",
+    "execute_llm_generation",
+    "format_response",
+    "query_context",
+    "fast_path",
+    "mcpaggregator",
+    "mcp_agentclientsession",
+)
 
 
 def _safe_serialize(obj):
@@ -22,80 +40,161 @@ def _safe_serialize(obj):
             return str(obj)
 
 
+def _level(name: str) -> str:
+    # 🧠 Level 判定
+    if "error" in name:
+        return "ERROR"
+    if "receive" in name:
+        return "INFO"
+    if "call" in name or "send" in name:
+        return "DEBUG"
+    return "INFO"
+
+
+def span_to_record(span) -> dict:
+    """span → 一筆精簡的 JSON 紀錄（一行）。"""
+    ctx = span.context
+    parent = span.parent
+    duration = None
+    if span.start_time is not None and span.end_time is not None:
+        duration = round((span.end_time - span.start_time) / 1e6, 3)
+    ended = span.end_time or time.time_ns()
+    record = {
+        "ts": datetime.fromtimestamp(ended / 1e9, tz=timezone.utc).isoformat(timespec="milliseconds"),
+        "level": _level(span.name.lower()),
+        "name": span.name,
+        "trace_id": f"{ctx.trace_id:032x}" if ctx else None,
+        "span_id": f"{ctx.span_id:016x}" if ctx else None,
+        "parent_id": f"{parent.span_id:016x}" if parent else None,
+        "duration_ms": duration,
+        "status": span.status.status_code.name if span.status else None,
+        "data": _safe_serialize(dict(span.attributes or {})),
+    }
+    if record["status"] == "ERROR":
+        record["level"] = "ERROR"
+    return record
+
+
+class RotatingLineWriter:
+    """
+    持續開著的 append 檔案；超過大小或時間就輪替（path → path.1 → path.2 …）。
+    一次 export 的所有行合併成一次 write + flush，讓 telemetry server 馬上讀得到。
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backup_count: int = 5, rotate_seconds: float = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = max(0, backup_count)
+        self.rotate_seconds = rotate_seconds
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._open()
+
+    def _open(self) -> None:
+        self._fh = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+        self._size = self._fh.tell()
+        self._opened_at = time.time()
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self.max_bytes and self._size and self._size + incoming > self.max_bytes:
+            return True
+        return bool(self.rotate_seconds and self._size and time.time() - self._opened_at >= self.rotate_seconds)
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        if self.backup_count:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def write_lines(self, lines) -> None:
+        if not lines:
+            return
+        data = "".join(line + "\n" for line in lines)
+        size = len(data.encode("utf-8"))
+        with self._lock:
+            if self._fh.closed:
+                return
+            if self._should_rotate(size):
+                self._rotate()
+            self._fh.write(data)
+            self._fh.flush()
+            self._size += size
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+
 class MCPActivityExporter(SpanExporter):
     """
     專為 Job Guardian 設計的 Telemetry Exporter：
     - 只輸出與 MCP 工具互動相關的 spans
-    - 簡化時間欄位（不輸出 start_time / end_time）
-    - 美化顯示格式類似 log stream
-    - 可在 Render 部署環境保持 Rich 高亮輸出
+    - 每個 span 寫成一行 JSON（JSON-lines），檔案持續開著並依大小 / 時間輪替
+    - 終端輸出可選：off / plain / rich（Rich 高亮只建議在本機開發時開啟）
     """
 
-    def __init__(self, filepath="mcp-activity.log"):
+    def __init__(
+        self,
+        filepath="mcp-activity.log",
+        console_mode: str = TELEMETRY_CONSOLE,
+        max_bytes: int = TELEMETRY_LOG_MAX_BYTES,
+        backup_count: int = TELEMETRY_LOG_BACKUPS,
+        rotate_seconds: float = TELEMETRY_LOG_ROTATE_SECONDS,
+    ):
         self.filepath = filepath
-        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
-        console.print(f"[green][otel][/green] Logging MCP activities to [bold]{self.filepath}[/bold]")
+        self.console_mode = console_mode
+        self.writer = RotatingLineWriter(filepath, max_bytes, backup_count, rotate_seconds)
+        self._console = None
+        if console_mode == "rich":
+            # 只有開啟時才載入 rich
+            from rich.console import Console
+
+            self._console = Console()
+        print(f"[otel] Logging MCP activities to {self.filepath} (console: {console_mode})")
 
     def export(self, spans):
-        log_lines = []
+        lines = []
         for span in spans:
             name = span.name.lower()
-
-            # 🧩 僅關心 MCP 過程（過濾掉初始化、load_servers 等）
-            if not any(key in name for key in [
-                "receive_prompt",
-                "tool_call",
-                "send_request",
-                "execute_llm_generation",
-                "format_response",
-                "mcpaggregator",
-                "mcp_agentclientsession"
-            ]):
+            if not any(key in name for key in ACTIVITY_KEYS):
                 continue
+            record = span_to_record(span)
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            if self.console_mode != "off":
+                self._print(record, lines[-1])
+
+        try:
+            self.writer.write_lines(lines)
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
 
-            # 提取基本欄位
-            attrs = _safe_serialize(span.attributes)
-            ctx = span.context
-
-            # 🧠 Level 判定
-            if "error" in name:
-                level = "ERROR"
-            elif "receive" in name:
-                level = "INFO"
-            elif "call" in name or "send" in name:
-                level = "DEBUG"
-            else:
-                level = "INFO"
-
-            # 📦 組出 log prefix
-            prefix = f"[{level}] {datetime.utcnow().isoformat(timespec='seconds')} {span.name}"
-
-            # 🧾 美化 attributes
-            pretty_json = json.dumps(
-                {"data": attrs},
-                indent=2,
-                ensure_ascii=False
-            )
-            syntax = Syntax(pretty_json, "json", theme="ansi_dark", word_wrap=True)
-
-            # ✅ 終端輸出（Render log 也支援 Rich）
-            console.print(prefix)
-            console.print(syntax)
-
-            # ✅ 寫入檔案（純文字方便 iframe 讀取）
-            log_entry = f"{prefix}\n{pretty_json}\n"
-            log_lines.append(log_entry)
-
-        # 附加寫入檔案
-        if log_lines:
-            with open(self.filepath, "a", encoding="utf-8") as f:
-                for line in log_lines:
-                    f.write(line + "\n")
+    def _print(self, record: dict, line: str) -> None:
+        if self._console is None:
+            print(line, flush=False)
+            return
+        from rich.syntax import Syntax
 
-        return SpanExportResult.SUCCESS
+        self._console.print(f"[{record['level']}] {record['ts']} {record['name']}")
+        pretty_json = json.dumps({"data": record["data"]}, indent=2, ensure_ascii=False)
+        self._console.print(Syntax(pretty_json, "json", theme="ansi_dark", word_wrap=True))
+
+    def shutdown(self):
+        self.writer.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        # 每次 export 都已 flush
+        return True
 
 
 def get_exporter():
     """使用自訂的 MCPActivityExporter"""
-    print("[otel] Using MCP Activity Exporter (human-readable logs)")
+    print("[otel] Using MCP Activity Exporter (JSON-lines activity log)")
     return MCPActivityExporter(filepath="telemetry/mcp-activity.log")
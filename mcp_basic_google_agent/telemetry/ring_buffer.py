@@ -0,0 +1,165 @@
+# telemetry/ring_buffer.py
+# 行程內的 span 環狀緩衝區：與 BatchSpanProcessor 並列的 SpanProcessor，
+# 讓 dashboard 直接查記憶體中的最近 spans 與工具延遲分佈，不必讀寫檔案或解析文字。
+# - 依 trace 分組：最多保留 max_traces 個 trace，每個 trace 最多 max_spans_per_trace 個 span（超過丟最舊的）
+# - 工具延遲直方圖：固定桶界（毫秒），累計自啟動以來的所有工具呼叫
+import bisect
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+
+from telemetry.exporter import span_to_record
+
+# 工具名稱所在的 span attribute（mcp_agent semconv）
+TOOL_NAME_ATTRS = ("gen_ai.tool.name", "mcp.tool.name")
+# 只以這些 span 計算工具延遲；Agent.call_tool 與 MCPAggregator.call_tool 是同一次呼叫的兩層
+TOOL_SPAN_NAMES = ("MCPAggregator.call_tool",)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """固定桶界的延遲直方圖；分位數以桶內線性內插估計。"""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # 最後一桶為 > 最大桶界
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return round(lo + (hi - lo) * (rank - seen) / n, 3)
+            seen += n
+        return round(self.max, 3)
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class SpanRingBuffer(SpanProcessor):
+    """
+    provider.add_span_processor(SpanRingBuffer())
+    on_end 在結束 span 的執行緒上執行，只做 dict 轉換與 deque append。
+    """
+
+    def __init__(
+        self,
+        max_traces: int = 200,
+        max_spans_per_trace: int = 256,
+        tool_span_names: Sequence[str] = TOOL_SPAN_NAMES,
+    ):
+        self.max_traces = max(1, max_traces)
+        self.max_spans_per_trace = max(1, max_spans_per_trace)
+        self.tool_span_names = set(tool_span_names)
+        self._traces: "OrderedDict[str, Deque[dict]]" = OrderedDict()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    # ---------- SpanProcessor ----------
+    def on_start(self, span, parent_context=None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        record = span_to_record(span)
+        record["start_ns"] = span.start_time
+        record["end_ns"] = span.end_time
+        trace_id = record["trace_id"]
+        tool = next((span.attributes.get(a) for a in TOOL_NAME_ATTRS if span.attributes and span.attributes.get(a)), None)
+
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            if spans is None:
+                spans = self._traces[trace_id] = deque(maxlen=self.max_spans_per_trace)
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            else:
+                self._traces.move_to_end(trace_id)
+            spans.append(record)
+
+            if tool and span.name in self.tool_span_names and record["duration_ms"] is not None:
+                hist = self._histograms.get(tool)
+                if hist is None:
+                    hist = self._histograms[tool] = LatencyHistogram()
+                hist.observe(record["duration_ms"])
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    # ---------- 查詢 ----------
+    def trace(self, trace_id: str) -> List[dict]:
+        with self._lock:
+            spans = list(self._traces.get(trace_id) or ())
+        return sorted(spans, key=lambda r: r["start_ns"] or 0)
+
+    def traces(self, limit: int = 50) -> List[dict]:
+        """最近的 trace 摘要（新到舊）。"""
+        with self._lock:
+            items = [(tid, list(spans)) for tid, spans in reversed(self._traces.items())][:limit]
+        out = []
+        for tid, spans in items:
+            start = min((r["start_ns"] for r in spans if r["start_ns"]), default=None)
+            end = max((r["end_ns"] for r in spans if r["end_ns"]), default=None)
+            roots = [r["name"] for r in spans if r["parent_id"] is None]
+            out.append({
+                "trace_id": tid,
+                "root": roots[0] if roots else None,
+                "span_count": len(spans),
+                "duration_ms": round((end - start) / 1e6, 3) if start and end else None,
+                "errors": sum(1 for r in spans if r["level"] == "ERROR"),
+                "ts": max((r["ts"] for r in spans), default=None),
+            })
+        return out
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        since_ns: Optional[int] = None,
+        until_ns: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """span 名稱（不分大小寫的子字串）與結束時間範圍；新到舊。"""
+        needle = name.lower() if name else None
+        with self._lock:
+            spans = [r for d in self._traces.values() for r in d]
+        out = [
+            r for r in spans
+            if (needle is None or needle in r["name"].lower())
+            and (since_ns is None or (r["end_ns"] or 0) >= since_ns)
+            and (until_ns is None or (r["end_ns"] or 0) <= until_ns)
+        ]
+        out.sort(key=lambda r: r["end_ns"] or 0, reverse=True)
+        return out[:limit]
+
+    def latency(self) -> Dict[str, dict]:
+        with self._lock:
+            return {tool: h.to_dict() for tool, h in sorted(self._histograms.items())}
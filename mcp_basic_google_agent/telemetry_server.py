@@ -1,42 +1,181 @@
 # telemetry_server.py
-from flask import Flask, Response
+# 單一 tailer 監看活動紀錄檔，新行廣播給所有 SSE 連線：
+# - 不論幾個人在看，只有一個檔案 handle 與一個輪詢迴圈
+# - 每個連線一個有上限的佇列；讀太慢的連線丟掉最舊的行，不拖慢其他人
+# - 紀錄檔輪替（exporter 換檔）時自動改讀新檔
+# - /telemetry/recent 由檔尾往回讀最後幾行，不讀整個檔案
+import asyncio
 import os
-import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Set
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
-app = Flask(__name__)
 LOG_PATH = "telemetry/mcp-activity.log"
+POLL_INTERVAL = float(os.getenv("TELEMETRY_POLL_INTERVAL", "0.5"))
+CLIENT_QUEUE_SIZE = int(os.getenv("TELEMETRY_CLIENT_QUEUE_SIZE", "256"))
+KEEPALIVE_SECONDS = 15.0
+RECENT_LINES = 30
 
-def stream_logs():
-    """持續監看 log 檔，並以 SSE 推送新內容"""
-    if not os.path.exists(LOG_PATH):
-        yield "data: No telemetry data yet.\n\n"
-        return
 
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        # 移到檔案結尾，避免重播舊紀錄
+def tail_lines(path: str, n: int, block_size: int = 8192) -> List[str]:
+    """由檔尾往回一塊一塊讀，直到湊滿 n 行。"""
+    with open(path, "rb") as f:
         f.seek(0, os.SEEK_END)
-        while True:
-            line = f.readline()
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-n:]
+
+
+class TelemetryHub:
+    """一個 tailer 對多個訂閱者。"""
+
+    def __init__(self, path: str, poll_interval: float = 0.5, queue_size: int = 256):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._fh = None
+        self._inode: Optional[int] = None
+        self._partial = b""
+        self.dropped = 0
+
+    # ---------- 訂閱 ----------
+    def subscribe(self) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._subscribers.discard(q)
+
+    def _broadcast(self, line: str) -> None:
+        for q in self._subscribers:
+            if q.full():
+                # 讀太慢的連線：丟掉最舊的一行
+                q.get_nowait()
+                self.dropped += 1
+            q.put_nowait(line)
+
+    # ---------- 監看 ----------
+    def _open(self, from_end: bool) -> None:
+        try:
+            fh = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        if from_end:
+            fh.seek(0, os.SEEK_END)
+        self._fh = fh
+        self._inode = os.fstat(fh.fileno()).st_ino
+        self._partial = b""
+
+    def _drain(self) -> None:
+        chunk = self._fh.read()
+        if not chunk:
+            return
+        *lines, self._partial = (self._partial + chunk).split(b"\n")
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
             if line:
-                # 使用 Server-Sent Events 格式傳送
-                yield f"data: {line}\n\n"
-            else:
-                time.sleep(1)  # 每秒檢查一次新內容
+                self._broadcast(line)
+
+    def _poll(self) -> None:
+        if self._fh is None:
+            # 啟動時已存在的內容不重播（run 一開始就移到檔尾）；之後才出現的檔案從頭讀
+            self._open(from_end=False)
+            if self._fh is None:
+                return
+        self._drain()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._inode or st.st_size < self._fh.tell():
+            # 輪替或被截斷：讀完舊檔剩下的內容後改讀新檔
+            self._drain()
+            self._fh.close()
+            self._fh = None
+            self._open(from_end=False)
+            if self._fh is not None:
+                self._drain()
+
+    async def run(self) -> None:
+        self._open(from_end=True)
+        while True:
+            try:
+                self._poll()
+            except OSError as e:
+                print(f"[telemetry] tail failed: {e}")
+            await asyncio.sleep(self.poll_interval)
 
-@app.route("/telemetry/stream")
-def telemetry_stream():
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "dropped": self.dropped, "path": self.path}
+
+
+hub = TelemetryHub(LOG_PATH, POLL_INTERVAL, CLIENT_QUEUE_SIZE)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    task = asyncio.create_task(hub.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+app = FastAPI(title="Job Guardian Telemetry", lifespan=lifespan)
+
+
+async def stream_logs(request: Request):
+    """訂閱 hub，並以 SSE 推送新內容"""
+    q = hub.subscribe()
+    try:
+        if not os.path.exists(LOG_PATH):
+            yield "data: No telemetry data yet.\n\n"
+        while not await request.is_disconnected():
+            try:
+                line = await asyncio.wait_for(q.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            # 使用 Server-Sent Events 格式傳送
+            yield f"data: {line}\n\n"
+    finally:
+        hub.unsubscribe(q)
+
+
+@app.get("/telemetry/stream")
+async def telemetry_stream(request: Request):
     """SSE 即時串流端點"""
-    return Response(stream_logs(), mimetype="text/event-stream")
+    return StreamingResponse(
+        stream_logs(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@app.route("/telemetry/recent")
-def recent_snapshot():
+
+@app.get("/telemetry/recent")
+async def recent_snapshot():
     """備用靜態模式（iframe 初始載入）"""
     if not os.path.exists(LOG_PATH):
-        return Response("No telemetry data yet.", mimetype="text/plain")
+        return PlainTextResponse("No telemetry data yet.")
+    lines = await asyncio.to_thread(tail_lines, LOG_PATH, RECENT_LINES)
+    return PlainTextResponse("\n".join(lines) + "\n")
+
+
+@app.get("/telemetry/stats")
+async def telemetry_stats():
+    return hub.stats()
 
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    return Response("".join(lines[-30:]), mimetype="text/plain")
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001, threaded=True)
+    uvicorn.run(app, host="0.0.0.0", port=5001, log_level="warning")
@@ -0,0 +1,167 @@
+# job-guardian/mcp_server/aggregates.py
+# 資料集載入時預先算好的「每家公司」彙總，供 company_profile 一次查完。
+# - 違規資料集：每年件數、罰鍰總額、最常違反的法條、最近公告日期
+# - ESG 資料集：最新年度的薪資中位數/平均數、女性主管比例，以及同年度（同產業）百分位
+# 查詢時只需合併命中名稱的彙總，成本與命中名稱數成正比，與資料列數無關。
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from columnar import ColumnarTable
+from company_index import DatasetIndex
+
+
+def parse_number(value: Optional[str]) -> Optional[float]:
+    """'1,234' / '27.03%' → float；無法解析回 None。"""
+    if not value:
+        return None
+    s = value.replace(",", "").replace("%", "").strip()
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+# ------------------------------------------------------------
+# 違規紀錄彙總
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class ViolationSummary:
+    count: int = 0
+    total_fine: int = 0
+    by_year: Dict[int, int] = field(default_factory=dict)
+    articles: Counter = field(default_factory=Counter)
+    latest_date: Optional[int] = None
+
+    def merge(self, other: "ViolationSummary") -> None:
+        self.count += other.count
+        self.total_fine += other.total_fine
+        for y, n in other.by_year.items():
+            self.by_year[y] = self.by_year.get(y, 0) + n
+        self.articles.update(other.articles)
+        if other.latest_date is not None and (self.latest_date is None or other.latest_date > self.latest_date):
+            self.latest_date = other.latest_date
+
+    def to_dict(self, top_articles: int = 5) -> dict:
+        return {
+            "count": self.count,
+            "total_fine": self.total_fine,
+            "count_by_year": {str(y): n for y, n in sorted(self.by_year.items())},
+            "top_articles": [{"法條": a, "count": n} for a, n in self.articles.most_common(top_articles)],
+            "latest_date": str(self.latest_date) if self.latest_date is not None else None,
+        }
+
+
+def build_violation_summaries(
+    table: ColumnarTable,
+    index: DatasetIndex,
+    date_cols: Sequence[str],
+    fine_cols: Sequence[str],
+    article_cols: Sequence[str],
+) -> Dict[int, ViolationSummary]:
+    """name id → ViolationSummary；每列只走訪一次。"""
+    out: Dict[int, ViolationSummary] = {}
+    for nid, row_ids in index.rows_by_name.items():
+        s = ViolationSummary()
+        for i in row_ids:
+            s.count += 1
+            ymd = table.pick_int(i, *date_cols)
+            if ymd is not None:
+                y = ymd // 10000
+                s.by_year[y] = s.by_year.get(y, 0) + 1
+                if s.latest_date is None or ymd > s.latest_date:
+                    s.latest_date = ymd
+            fine = table.pick_int(i, *fine_cols)
+            if fine:
+                s.total_fine += fine
+            article = table.pick(i, *article_cols)
+            if article:
+                s.articles[article] += 1
+        out[nid] = s
+    return out
+
+
+def merge_violations(summaries: Dict[int, ViolationSummary], name_ids: Iterable[int]) -> ViolationSummary:
+    merged = ViolationSummary()
+    for nid in name_ids:
+        s = summaries.get(nid)
+        if s is not None:
+            merged.merge(s)
+    return merged
+
+
+# ------------------------------------------------------------
+# ESG 人力發展彙總
+# ------------------------------------------------------------
+@dataclass(slots=True)
+class EsgSummary:
+    name: str
+    code: Optional[str]
+    year: Optional[int]
+    industry: Optional[str]
+    metrics: Dict[str, Optional[float]]
+    percentiles: Dict[str, Optional[float]] = field(default_factory=dict)
+    peer_count: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "公司名稱": self.name,
+            "公司代號": self.code,
+            "年度": self.year,
+            "產業": self.industry,
+            **self.metrics,
+            # 百分位：同年度（有產業欄位時為同產業）中，數值 <= 本公司的比例
+            "percentile": self.percentiles,
+            "peer_group": self.industry or "全部公司",
+            "peer_count": self.peer_count,
+        }
+
+
+def build_esg_summaries(
+    table: ColumnarTable,
+    index: DatasetIndex,
+    year_cols: Sequence[str],
+    code_cols: Sequence[str],
+    industry_cols: Sequence[str],
+    metric_cols: Dict[str, Sequence[str]],
+) -> Dict[int, EsgSummary]:
+    """name id → 該公司最新年度的 ESG 指標與同儕百分位。"""
+    out: Dict[int, EsgSummary] = {}
+    for nid, row_ids in index.rows_by_name.items():
+        # 取報告年度最大的一列
+        best, best_year = row_ids[-1], None
+        for i in row_ids:
+            y = table.pick_int(i, *year_cols)
+            if y is not None and (best_year is None or y > best_year):
+                best, best_year = i, y
+        out[nid] = EsgSummary(
+            name=index.names.names[nid],
+            code=table.pick(best, *code_cols),
+            year=best_year,
+            industry=table.pick(best, *industry_cols),
+            metrics={m: parse_number(table.pick(best, *cols)) for m, cols in metric_cols.items()},
+        )
+
+    # 同儕分組：(產業, 年度) → 各指標排序後的數值，用 bisect 算百分位
+    peers: Dict[Tuple[Optional[str], Optional[int]], Dict[str, List[float]]] = {}
+    for s in out.values():
+        group = peers.setdefault((s.industry, s.year), {m: [] for m in metric_cols})
+        for m, v in s.metrics.items():
+            if v is not None:
+                group[m].append(v)
+    for group in peers.values():
+        for values in group.values():
+            values.sort()
+    for s in out.values():
+        group = peers[(s.industry, s.year)]
+        s.peer_count = max((len(v) for v in group.values()), default=0)
+        for m, v in s.metrics.items():
+            values = group[m]
+            s.percentiles[m] = (
+                round(100.0 * bisect_right(values, v) / len(values), 1) if v is not None and values else None
+            )
+    return out
@@ -0,0 +1,174 @@
+# job-guardian/mcp_server/columnar.py
+# 欄式（columnar）資料表：取代 list[dict] 的 CSV 記憶體表示。
+# - 字串欄位以字典編碼：每欄一份 interned 的 distinct 值 + array('I') 代碼
+# - 日期/金額/年度等欄位另外保存 array('q') 整數欄，供篩選與彙總
+# - 只有真正回傳的命中列才 materialize 成 dict
+
+from __future__ import annotations
+
+import re
+import sys
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+# 整數欄的缺值
+MISSING = -(2**63)
+
+IntParser = Callable[[str], Optional[int]]
+
+_DATE_PAT = re.compile(r"^(\d{3,4})[-/.](\d{1,2})[-/.](\d{1,2})$")
+
+
+def parse_int(value: str) -> Optional[int]:
+    """'20,000' / '20000元' → 20000；無法解析回 None。"""
+    s = value.replace(",", "").replace("元", "").strip()
+    if not s:
+        return None
+    try:
+        return int(float(s))
+    except ValueError:
+        return None
+
+
+def parse_date(value: str) -> Optional[int]:
+    """
+    日期 → yyyymmdd 整數。
+    支援 20250829、1140829（民國）、2025-08-29、114/08/29 等格式。
+    """
+    s = value.strip()
+    if s.isdigit():
+        if len(s) == 8:
+            return int(s)
+        if len(s) == 7:  # 民國 yyymmdd
+            return (int(s[:3]) + 1911) * 10000 + int(s[3:])
+        return None
+    m = _DATE_PAT.match(s)
+    if not m:
+        return None
+    y, mo, d = (int(x) for x in m.groups())
+    if y < 1000:
+        y += 1911
+    return y * 10000 + mo * 100 + d
+
+
+class Column:
+    """字典編碼的字串欄：values[codes[i]] 為第 i 列的值。"""
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self, values: Optional[List[str]] = None, codes: Optional[array] = None):
+        self.values: List[str] = values if values is not None else [""]
+        self.codes: array = codes if codes is not None else array("I")
+        self._lookup: Optional[Dict[str, int]] = None if codes is not None else {"": 0}
+
+    def seal(self) -> None:
+        """建表完成後丟掉反查表，只留 values + codes。"""
+        self._lookup = None
+
+    def append(self, value: str) -> None:
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self._lookup[value] = code
+        self.codes.append(code)
+
+    def __getitem__(self, i: int) -> str:
+        return self.values[self.codes[i]]
+
+
+class ColumnarTable:
+    """
+    CSV 的欄式表示。
+    - columns[header]：字典編碼字串欄（header 與值皆已 strip）
+    - ints[header]：typed 整數欄（與同名字串欄並存；缺值為 MISSING）
+    """
+
+    def __init__(self, headers: List[str], columns: Dict[str, Column], ints: Dict[str, array], n_rows: int):
+        self.headers = headers
+        self.columns = columns
+        self.ints = ints
+        self.n_rows = n_rows
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def value(self, i: int, header: str) -> str:
+        col = self.columns.get(header)
+        return col[i] if col is not None else ""
+
+    def pick(self, i: int, *candidates: str) -> Optional[str]:
+        """從多個候選欄名中拿第一個非空值。"""
+        for h in candidates:
+            col = self.columns.get(h)
+            if col is not None:
+                v = col[i]
+                if v != "":
+                    return v
+        return None
+
+    def pick_int(self, i: int, *candidates: str) -> Optional[int]:
+        """同 pick，但回傳該欄的 typed 整數值（需該欄有整數欄）。"""
+        for h in candidates:
+            col = self.columns.get(h)
+            if col is not None and col[i] != "":
+                ints = self.ints.get(h)
+                if ints is None or ints[i] == MISSING:
+                    return None
+                return ints[i]
+        return None
+
+    def row(self, i: int) -> Dict[str, str]:
+        """materialize 第 i 列為 dict（只對要回傳的命中列呼叫）。"""
+        return {h: self.columns[h][i] for h in self.headers}
+
+    def rows(self) -> List[Dict[str, str]]:
+        return [self.row(i) for i in range(self.n_rows)]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]], parsers: Optional[Dict[str, IntParser]] = None) -> "ColumnarTable":
+        rows = list(rows)
+        headers: List[str] = []
+        for r in rows[:1]:
+            headers = list(r)
+        builder = TableBuilder(headers, parsers)
+        for r in rows:
+            builder.append([r.get(h, "") for h in headers])
+        return builder.build()
+
+
+def int_column(col: Column, parser: IntParser) -> array:
+    """由字典編碼欄推導整數欄：每個 distinct 值只解析一次。"""
+    parsed = [parser(v) if v else None for v in col.values]
+    lut = [MISSING if p is None else p for p in parsed]
+    return array("q", (lut[c] for c in col.codes))
+
+
+class TableBuilder:
+    """逐列建立 ColumnarTable；parsers 指定哪些欄位另外保存整數欄。"""
+
+    def __init__(self, headers: Sequence[str], parsers: Optional[Dict[str, IntParser]] = None):
+        stripped = [sys.intern((h or "").strip()) for h in headers]
+        # 重複欄名時與 csv.DictReader 一致：後面的欄位覆蓋前面
+        positions = {h: j for j, h in enumerate(stripped)}
+        self.headers = list(positions)
+        self.parsers = parsers or {}
+        self.columns = {h: Column() for h in self.headers}
+        self._cols = [(positions[h], self.columns[h]) for h in self.headers]
+        self.n_rows = 0
+
+    def append(self, values: Sequence[str]) -> None:
+        """values 與原始 headers 對齊；不足補空字串，多出的欄位捨棄。"""
+        n = len(values)
+        for j, col in self._cols:
+            col.append((values[j] or "").strip() if j < n else "")
+        self.n_rows += 1
+
+    def build(self) -> ColumnarTable:
+        for col in self.columns.values():
+            col.seal()
+        ints = {
+            h: int_column(self.columns[h], p) for h, p in self.parsers.items() if h in self.columns
+        }
+        return ColumnarTable(self.headers, self.columns, ints, self.n_rows)
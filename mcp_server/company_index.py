@@ -0,0 +1,249 @@
+# job-guardian/mcp_server/company_index.py
+# 公司名稱索引：資料集載入時建一次，查詢成本只跟命中數有關。
+# - 精確比對：key（大小寫處理後的名稱）/ 正規化名稱 → name ids
+# - 子字串比對：unigram + bigram 倒排索引取候選，再以原條件驗證
+# - 容錯比對：正規化名稱的 trigram 倒排取候選，再以有界編輯距離驗證
+# - NameIndex 跨刷新沿用：只有新出現的公司名稱才需要正規化與切 n-gram
+
+from __future__ import annotations
+
+import heapq
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+Normalizer = Callable[[str], str]
+
+
+def _grams(s: str) -> Set[str]:
+    """字元 unigram + bigram。"""
+    out = set(s)
+    out.update(s[i : i + 2] for i in range(len(s) - 1))
+    return out
+
+
+def _query_grams(s: str) -> Set[str]:
+    """查詢字串只需要 bigram（單字元查詢才用 unigram）。"""
+    if len(s) <= 1:
+        return set(s)
+    return {s[i : i + 2] for i in range(len(s) - 1)}
+
+
+def _trigrams(s: str) -> Set[str]:
+    return {s[i : i + 3] for i in range(len(s) - 2)}
+
+
+def edit_distance(a: str, b: str, max_dist: int, partial: bool = False) -> Optional[int]:
+    """
+    a 與 b 的 Levenshtein 距離；超過 max_dist 時提早結束並回傳 None。
+    partial=True 時 b 的頭尾可免費略過，即 a 與 b 任一子字串的最小距離。
+    """
+    la, lb = len(a), len(b)
+    if not partial and abs(la - lb) > max_dist:
+        return None
+    prev = [0] * (lb + 1) if partial else list(range(lb + 1))
+    for i in range(1, la + 1):
+        ca = a[i - 1]
+        cur = [i] * (lb + 1)
+        for j in range(1, lb + 1):
+            cost = prev[j - 1] + (ca != b[j - 1])
+            if prev[j] + 1 < cost:
+                cost = prev[j] + 1
+            if cur[j - 1] + 1 < cost:
+                cost = cur[j - 1] + 1
+            cur[j] = cost
+        if min(cur) > max_dist:
+            return None
+        prev = cur
+    d = min(prev) if partial else prev[lb]
+    return d if d <= max_dist else None
+
+
+class NameIndex:
+    """
+    distinct 公司名稱的索引，name id 在整個 process 內穩定。
+    刷新後消失的名稱仍留在索引中，但在 DatasetIndex 查無 rows 會被略過；
+    死名稱超過一半時由 DatasetIndex.build 觸發重建。
+    """
+
+    def __init__(self, normalize: Normalizer, case_sensitive: bool = False):
+        self.normalize = normalize
+        self.case_sensitive = case_sensitive
+        self.names: List[str] = []
+        self.keys: List[str] = []  # 大小寫處理後的名稱
+        self.norms: List[str] = []  # key 的正規化名稱
+        self._ids: Dict[str, int] = {}
+        self._by_key: Dict[str, Set[int]] = {}
+        self._by_norm: Dict[str, Set[int]] = {}
+        self._grams: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, array] = {}  # 正規化名稱的 trigram → name ids（遞增）
+        # 背景刷新會在其他 thread 新增名稱；寫入與讀 postings 時互斥
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def key_of(self, value: str) -> str:
+        return value if self.case_sensitive else value.lower()
+
+    def add(self, name: str) -> int:
+        """回傳 name id；新名稱才做正規化與建 n-gram。"""
+        nid = self._ids.get(name)
+        if nid is not None:
+            return nid
+
+        key = self.key_of(name)
+        norm = self.normalize(key)
+        with self._lock:
+            nid = len(self.names)
+            self._ids[name] = nid
+            self.names.append(name)
+            self.keys.append(key)
+            self.norms.append(norm)
+            self._by_key.setdefault(key, set()).add(nid)
+            self._by_norm.setdefault(norm, set()).add(nid)
+            for g in _grams(key) | _grams(norm):
+                self._grams.setdefault(g, set()).add(nid)
+            for g in _trigrams(norm):
+                self._trigrams.setdefault(g, array("I")).append(nid)
+        return nid
+
+    def exact(self, query: str) -> Set[int]:
+        """key 相等或正規化名稱相等。"""
+        key = self.key_of(query)
+        norm = self.normalize(key)
+        with self._lock:
+            return self._by_key.get(key, set()) | self._by_norm.get(norm, set())
+
+    def contains(self, *needles: str) -> Set[int]:
+        """
+        候選集合：名稱（key 或正規化名稱）可能包含任一 needle。
+        回傳的是 superset，呼叫端需再以實際比對條件驗證。
+        """
+        out: Set[int] = set()
+        for needle in needles:
+            if not needle:
+                continue
+            with self._lock:
+                postings = [self._grams.get(g) for g in _query_grams(needle)]
+                if any(p is None for p in postings):
+                    continue
+                postings.sort(key=len)
+                cand = set(postings[0])
+                for p in postings[1:]:
+                    cand &= p
+                    if not cand:
+                        break
+            out |= cand
+        return out
+
+    def spans(self, norm_text: str, max_len: int = 24) -> List[Tuple[int, int, Set[int]]]:
+        """
+        自由文字中出現的名稱：norm_text（已正規化）的子字串與正規化名稱相等者，
+        回傳 [(起點, 終點, name ids)]。
+        """
+        out: List[Tuple[int, int, Set[int]]] = []
+        n = len(norm_text)
+        with self._lock:
+            for i in range(n):
+                for j in range(i + 1, min(n, i + max_len) + 1):
+                    nids = self._by_norm.get(norm_text[i:j])
+                    if nids:
+                        out.append((i, j, set(nids)))
+        return out
+
+    def fuzzy(self, norm: str, max_dist: int, max_candidates: int = 2000) -> List[Tuple[int, int]]:
+        """
+        容錯比對：norm（已正規化的查詢）與正規化名稱任一子字串的編輯距離 <= max_dist。
+        每一次編輯最多破壞 3 個 trigram，共享 trigram 數不足的名稱不必計算距離。
+        回傳 [(name id, 距離)]。
+        """
+        grams = _trigrams(norm)
+        if not grams:
+            return []
+        need = max(1, len(grams) - 3 * max_dist)
+        counts: Dict[int, int] = {}
+        with self._lock:
+            for g in grams:
+                for nid in self._trigrams.get(g, ()):
+                    counts[nid] = counts.get(nid, 0) + 1
+        cands = [nid for nid, c in counts.items() if c >= need]
+        if len(cands) > max_candidates:
+            cands = heapq.nlargest(max_candidates, cands, key=counts.__getitem__)
+        out: List[Tuple[int, int]] = []
+        for nid in cands:
+            d = edit_distance(norm, self.norms[nid], max_dist, partial=True)
+            if d is not None:
+                out.append((nid, d))
+        return out
+
+
+class DatasetIndex:
+    """
+    單一版本資料集的索引：name id → 該名稱出現的 row ids（依原始順序）。
+    """
+
+    def __init__(self, names: NameIndex, rows_by_name: Dict[int, List[int]]):
+        self.names = names
+        self.rows_by_name = rows_by_name
+        self.aliases = None  # ESG 資料集另外掛上 resolver.AliasTable（公司代號 ↔ 名稱）
+
+    @classmethod
+    def build(
+        cls,
+        row_names: Iterable[Optional[str]],
+        normalize: Normalizer,
+        case_sensitive: bool = False,
+        previous: Optional["DatasetIndex"] = None,
+    ) -> "DatasetIndex":
+        """
+        由每列的公司名稱建索引。
+        若有上一版索引則沿用其 NameIndex（增量），死名稱過多時才整個重建。
+        """
+        row_names = list(row_names)
+        names = previous.names if previous is not None else None
+        if names is None or names.case_sensitive != case_sensitive:
+            names = NameIndex(normalize, case_sensitive)
+
+        rows_by_name: Dict[int, List[int]] = {}
+        for i, name in enumerate(row_names):
+            if not name:
+                continue
+            rows_by_name.setdefault(names.add(name), []).append(i)
+
+        if len(names) > 2 * max(len(rows_by_name), 1):
+            # 累積太多已消失的名稱：重建一份乾淨的 NameIndex
+            return cls.build(row_names, normalize, case_sensitive, previous=None)
+        return cls(names, rows_by_name)
+
+    def rows_for(self, name_ids: Iterable[int]) -> List[int]:
+        out: List[int] = []
+        for nid in name_ids:
+            out.extend(self.rows_by_name.get(nid, ()))
+        out.sort()
+        return out
+
+    def match_names(self, query: str, partial: bool) -> List[int]:
+        """
+        esg_hr 的比對語意（依 case_sensitive 處理大小寫），回傳命中的 name ids：
+        - partial=False：key 相等或正規化名稱相等
+        - partial=True ：key 子字串或正規化名稱子字串
+        """
+        names = self.names
+        if not partial:
+            return [nid for nid in names.exact(query) if nid in self.rows_by_name]
+
+        key = names.key_of(query)
+        norm = names.normalize(key)
+        if not key or not norm:
+            # 空字串是任何名稱的子字串
+            return list(self.rows_by_name)
+        return [
+            nid
+            for nid in names.contains(key, norm)
+            if nid in self.rows_by_name and (key in names.keys[nid] or norm in names.norms[nid])
+        ]
+
+    def fuzzy_names(self, norm: str, max_dist: int) -> List[Tuple[int, int]]:
+        """NameIndex.fuzzy，只留本版資料集仍存在的名稱。"""
+        return [(nid, d) for nid, d in self.names.fuzzy(norm, max_dist) if nid in self.rows_by_name]
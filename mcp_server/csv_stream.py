@@ -0,0 +1,174 @@
+# job-guardian/mcp_server/csv_stream.py
+# 串流 CSV 解析：bytes 一塊一塊進來就解碼、切列、寫進 TableBuilder。
+# - 編碼只在開頭判斷一次（BOM 或試解碼），之後用 incremental decoder
+# - 不保留整份 body / 整份文字，記憶體峰值約為一個 chunk + 一筆未完成的紀錄
+# - 紀錄邊界由同一個 csv.reader 決定（引號內的換行、欄位中間的引號都同 csv.reader）；
+#   一筆紀錄還沒收齊就先放回，等下一塊再從該筆開頭重新解析
+# - 無法解析的紀錄（csv.Error）略過並計數，不中斷整份資料
+
+from __future__ import annotations
+
+import codecs
+import csv
+import sys
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional
+
+from columnar import ColumnarTable, IntParser, TableBuilder
+
+# 沒有 BOM 時依序試解碼的編碼（政府開放資料常見 UTF-8 / Big5）
+CANDIDATE_ENCODINGS = ("utf-8", "cp950", "big5")
+FALLBACK_ENCODING = "latin-1"
+
+# 開頭一直是純 ASCII 時，最多暫存這麼多 bytes 就直接當 UTF-8
+MAX_SNIFF_BYTES = 1 << 20
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def sniff_encoding(head: bytes) -> str:
+    """由開頭的 bytes 判斷編碼：先看 BOM，再依序試解碼（容許結尾被切斷的多位元組字元）。"""
+    for bom, enc in _BOMS:
+        if head.startswith(bom):
+            return enc
+    for enc in CANDIDATE_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(enc)().decode(head, final=False)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return FALLBACK_ENCODING
+
+
+class _Feed:
+    """
+    給 csv.reader 的 line iterator（queue 裡只放以換行結尾的完整實體行）。
+    記錄目前這筆紀錄已交出的行，以及是否曾因 queue 見底而中斷；
+    中斷時 csv.reader 回傳的是不完整的紀錄，要把這些行放回 queue 等更多資料。
+    """
+
+    def __init__(self, queue: Deque[str]):
+        self.queue = queue
+        self.taken: List[str] = []
+        self.exhausted = False
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        if not self.queue:
+            self.exhausted = True
+            raise StopIteration
+        line = self.queue.popleft()
+        self.taken.append(line)
+        return line
+
+    def start_record(self) -> None:
+        self.taken = []
+        self.exhausted = False
+
+    def put_back(self) -> None:
+        self.queue.extendleft(reversed(self.taken))
+        self.taken = []
+
+
+class StreamingCsvParser:
+    """
+    parser = StreamingCsvParser(int_parsers)
+    for chunk in chunks: parser.feed(chunk)
+    table = parser.close()
+    """
+
+    def __init__(self, int_parsers: Optional[Dict[str, IntParser]] = None):
+        self.int_parsers = int_parsers
+        self.encoding: Optional[str] = None
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._head = b""  # 判斷編碼前暫存的純 ASCII 開頭
+        self._partial = ""  # 尚未遇到換行的最後一段文字
+        self._feed = _Feed(deque())
+        self._reader = csv.reader(self._feed)
+        self._builder: Optional[TableBuilder] = None
+        self.bad_records = 0  # 因 csv.Error 略過的紀錄數
+
+    # ---------- 對外 API ----------
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if self._decoder is None:
+            # 純 ASCII 的開頭無法區分 UTF-8 / Big5，先暫存到出現非 ASCII byte 為止；
+            # 可能是 BOM 的前半段時也先等下一塊
+            self._head += chunk
+            head = self._head
+            if len(head) < MAX_SNIFF_BYTES and (
+                head.isascii() or any(bom.startswith(head) for bom, _ in _BOMS)
+            ):
+                return
+            chunk, self._head = self._head, b""
+            self._start(sniff_encoding(chunk))
+        self._push_text(self._decoder.decode(chunk))
+
+    def close(self) -> ColumnarTable:
+        if self._decoder is None:
+            self._start(sniff_encoding(self._head) if self._head else "utf-8")
+            self._push_text(self._decoder.decode(self._head))
+            self._head = b""
+        self._push_text(self._decoder.decode(b"", final=True))
+        if self._partial:
+            self._feed.queue.append(self._partial)
+            self._partial = ""
+        # 檔尾引號未閉合：同 csv.reader，剩下的內容當成最後一筆
+        self._drain(final=True)
+        if self.bad_records:
+            print(f"[WARN] 略過 {self.bad_records} 筆無法解析的 CSV 紀錄", file=sys.stderr)
+        if self._builder is None:
+            self._builder = TableBuilder([], self.int_parsers)
+        return self._builder.build()
+
+    # ---------- 內部 ----------
+    def _start(self, encoding: str) -> None:
+        self.encoding = encoding
+        # 開頭判斷之後若仍有壞掉的 byte，以替代字元處理，不中斷整份資料
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def _push_text(self, text: str) -> None:
+        if not text:
+            return
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if lines:
+            self._feed.queue.extend(line + "\n" for line in lines)
+            self._drain()
+
+    def _drain(self, final: bool = False) -> None:
+        feed, reader = self._feed, self._reader
+        while feed.queue:
+            feed.start_record()
+            try:
+                values = next(reader)
+            except StopIteration:
+                break
+            except csv.Error:
+                # 例如引號內的欄位超過 csv.field_size_limit、欄位中間出現 \r；已讀的行一併丟棄
+                self.bad_records += 1
+                continue
+            if feed.exhausted and not final:
+                # 紀錄跨到還沒收到的資料（引號內換行）：等下一塊再解析
+                feed.put_back()
+                break
+            if self._builder is None:
+                self._builder = TableBuilder(values, self.int_parsers)
+            elif values:  # 同 csv.DictReader：略過空白列
+                self._builder.append(values)
+
+
+def parse_csv_bytes(content: bytes, int_parsers: Optional[Dict[str, IntParser]] = None, chunk_size: int = 1 << 16) -> ColumnarTable:
+    """一次拿到整份 body 時（例如 requests fallback）也走同一條串流路徑。"""
+    parser = StreamingCsvParser(int_parsers)
+    view = memoryview(content)
+    for start in range(0, len(content), chunk_size):
+        parser.feed(bytes(view[start : start + chunk_size]))
+    return parser.close()
@@ -0,0 +1,384 @@
+# job-guardian/mcp_server/dataset_cache.py
+# 資料集快取層：以來源 URL 為 key，將解析後的欄式資料表保存在記憶體與磁碟。
+# - TTL 過期後於背景以 ETag / Last-Modified 發條件式請求刷新
+# - 刷新期間繼續回傳舊資料（stale-while-revalidate），同 URL 的併發下載合併為一次
+# - 磁碟端為版本化快照（snapshot_store），冷啟動直接 mmap 最新一版，來源網站掛掉也能啟動
+# - 每個 tool 回應可透過 CacheEntry.age_info() 暴露快取年齡與快照版本
+# - 多個行程共用同一個快照目錄時，刷新前先看磁碟上是否已有其他行程抓好的新版，有就直接 mmap 採用；
+#   真的要下載時取得跨行程刷新鎖，同一資料集每台主機只下載一次
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from columnar import ColumnarTable, IntParser
+from snapshot_store import SnapshotState, SnapshotStore, table_digest
+
+# 冷啟動時另一個行程持有刷新鎖（正在下載同一份資料集）：每隔這麼多秒再試，等它寫好快照
+LOCK_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class FetchResult:
+    """一次下載的結果；not_modified=True 代表伺服器回 304，table 為 None。"""
+
+    table: Optional[ColumnarTable]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+# await fetcher(url, etag, last_modified) -> FetchResult
+Fetcher = Callable[[str, Optional[str], Optional[str]], Awaitable[FetchResult]]
+
+# indexer(url, table, previous_index) -> index；每次載入/刷新後建一次
+Indexer = Callable[[str, ColumnarTable, Any], Any]
+
+# aggregator(url, table, index) -> aggregates；在索引建好後預先計算彙總
+Aggregator = Callable[[str, ColumnarTable, Any], Any]
+
+
+class Dataset(NamedTuple):
+    """同一版本的資料表、索引與彙總；整組一次替換，讀取端不會拿到不一致的組合。"""
+
+    table: ColumnarTable
+    index: Any = None
+    aggregates: Any = None
+    digest: Optional[str] = None  # 內容雜湊；未啟用磁碟快取時代替快照版本 id 標示這一版資料
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    data: Dataset
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0  # 最近一次下載、304 驗證成功或因其他行程持鎖而略過刷新的時間（epoch 秒）
+    refreshing: bool = False
+    last_error: Optional[str] = None
+    version: Optional[str] = None  # 對應的快照版本 id（未啟用磁碟快取時為 None）
+
+    @property
+    def table(self) -> ColumnarTable:
+        return self.data.table
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+    def age_info(self, ttl: float) -> dict:
+        """給 tool 回應 meta 使用的快取狀態摘要。"""
+        age = self.age()
+        return {
+            "age_seconds": round(age, 1),
+            "ttl_seconds": ttl,
+            "stale": age > ttl,
+            "refreshing": self.refreshing,
+            "validated_at": time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.fetched_at)
+            ),
+            "last_error": self.last_error,
+            "snapshot": self.version,
+        }
+
+
+def _or_empty(table: Optional[ColumnarTable]) -> ColumnarTable:
+    return table if table is not None else ColumnarTable.from_rows([])
+
+
+class SingleFlight:
+    """
+    同一 key 同時只跑一個 coroutine，其餘呼叫端等同一個結果。
+    例：50 個 tool call 同時要冷啟動同一份資料集 → 只下載/解析/建索引一次。
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._calls.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._calls[key] = fut
+            fut.add_done_callback(lambda _: self._calls.pop(key, None))
+        # shield：單一呼叫端被取消時，不影響其他等待者與背後的下載
+        return await asyncio.shield(fut)
+
+
+class DatasetCache:
+    """
+    以 URL 為 key 的 CSV 資料集快取。
+    - 第一次取用：先讀磁碟快取，沒有才下載（同 URL 的併發請求合併為一次）
+    - 超過 TTL：立即回傳舊資料，並啟動背景 task 做條件式刷新
+    - 刷新失敗：保留舊資料，錯誤記在 last_error
+    - 解析、建索引、讀寫磁碟都丟到 thread，不阻塞 event loop
+    - get(url, snapshot=...)：載入指定的歷史快照（最近用過的 snapshot_memory 版保留在記憶體）
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        ttl: float = 3600.0,
+        cache_dir: Optional[str] = None,
+        indexer: Optional[Indexer] = None,
+        int_parsers: Optional[Dict[str, IntParser]] = None,
+        aggregator: Optional[Aggregator] = None,
+        snapshot_keep: int = 10,
+        snapshot_memory: int = 4,
+    ):
+        self.fetcher = fetcher
+        self.indexer = indexer
+        self.aggregator = aggregator
+        self.int_parsers = int_parsers or {}
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.store = SnapshotStore(cache_dir, keep=snapshot_keep) if cache_dir else None
+        self.snapshot_memory = snapshot_memory
+        self._entries: Dict[str, CacheEntry] = {}
+        self._history: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._flights = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+
+    # ---------- 對外 API ----------
+    async def get(self, url: str, snapshot: Optional[str] = None) -> CacheEntry:
+        """
+        取得資料集；過期時觸發背景刷新但不阻塞呼叫端。
+        snapshot 為版本 id 或日期時改取該歷史快照（不刷新）。
+        """
+        if snapshot:
+            return await self.get_snapshot(url, snapshot)
+
+        entry = self._entries.get(url)
+        if entry is None:
+            entry = await self._flights.do(url, lambda: self._load_initial(url))
+
+        if entry.age() > self.ttl:
+            self._schedule_refresh(entry)
+        return entry
+
+    async def get_snapshot(self, url: str, spec: str) -> CacheEntry:
+        """載入 spec（版本 id / 前綴 / 日期）對應的歷史快照；找不到時丟出 ValueError。"""
+        if self.store is None:
+            raise ValueError("未啟用磁碟快取（CACHE_DIR），沒有可查詢的快照")
+        version = await asyncio.to_thread(self.store.resolve, url, spec)
+        if version is None:
+            raise ValueError(f"找不到符合 {spec!r} 的快照：{url}")
+
+        current = self._entries.get(url)
+        if current is not None and current.version == version:
+            return current
+
+        key = f"{url}#{version}"
+        entry = self._history.get(key)
+        if entry is None:
+            entry = await self._flights.do(key, lambda: asyncio.to_thread(self._load_snapshot, url, version))
+            self._history[key] = entry
+            while len(self._history) > self.snapshot_memory:
+                self._history.popitem(last=False)
+        self._history.move_to_end(key)
+        return entry
+
+    def snapshots(self, url: str) -> List[str]:
+        """磁碟上保存的快照版本（由舊到新）。"""
+        return self.store.versions(url) if self.store is not None else []
+
+    async def prime(self, url: str) -> Optional[str]:
+        """
+        只確保磁碟上有未過期的快照（必要時下載），不解析成索引、不放進記憶體；回傳最新的快照版本。
+        共用模式的主行程在啟動 worker 前呼叫，worker 啟動後直接 mmap。
+        """
+        if self.store is None:
+            raise ValueError("未啟用磁碟快取（CACHE_DIR），無法預先建立快照")
+        state = await asyncio.to_thread(self.store.state, url)
+        if state is not None and state.version not in await asyncio.to_thread(self.store.versions, url):
+            state = None  # 快照檔已不在：不能用條件式請求
+        if state is not None and time.time() - state.fetched_at <= self.ttl:
+            return state.version
+
+        with self.store.refresh_lock(url) as acquired:
+            if not acquired:
+                return state.version if state is not None else None
+            result = await self.fetcher(
+                url, state.etag if state else None, state.last_modified if state else None
+            )
+            if result.not_modified and state is not None:
+                await asyncio.to_thread(self.store.touch, url, result.etag, result.last_modified, time.time())
+                return state.version
+            return await asyncio.to_thread(
+                self.store.save, url, _or_empty(result.table), result.etag, result.last_modified, time.time()
+            )
+
+    # ---------- 內部 ----------
+    async def _load_initial(self, url: str) -> CacheEntry:
+        entry = self._entries.get(url)
+        if entry is not None:
+            return entry
+
+        entry = await asyncio.to_thread(self._read_disk, url)
+        if entry is None:
+            entry = await self._load_locked(url)
+        self._entries[url] = entry
+        return entry
+
+    async def _load_locked(self, url: str) -> CacheEntry:
+        """
+        冷啟動且沒有磁碟快取：只能等下載完成。
+        先取得跨行程刷新鎖，拿到後再看一次磁碟（其他行程可能剛寫好快照），仍沒有才下載；
+        鎖在別的行程手上時等它釋放，不重複下載同一份資料集。
+        """
+        if self.store is None:
+            return await self._download(url)
+        while True:
+            with self.store.refresh_lock(url) as acquired:
+                if acquired:
+                    entry = await asyncio.to_thread(self._read_disk, url)
+                    return entry if entry is not None else await self._download(url)
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+    async def _download(self, url: str) -> CacheEntry:
+        result = await self.fetcher(url, None, None)
+        data = await asyncio.to_thread(self._build, url, _or_empty(result.table), None)
+        entry = CacheEntry(
+            url=url,
+            data=data,
+            etag=result.etag,
+            last_modified=result.last_modified,
+            fetched_at=time.time(),
+        )
+        await asyncio.to_thread(self._write_disk, entry, True)
+        return entry
+
+    def _schedule_refresh(self, entry: CacheEntry) -> None:
+        if entry.refreshing:
+            return
+        entry.refreshing = True
+        task = asyncio.create_task(self._flights.do(f"refresh:{entry.url}", lambda: self._refresh(entry)))
+        # 保留 task 參考，避免背景刷新被 GC
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, entry: CacheEntry) -> None:
+        entry.refreshing = True
+        try:
+            if self.store is None:
+                await self._fetch(entry)
+            elif not await self._adopt_disk(entry):
+                with self.store.refresh_lock(entry.url) as acquired:
+                    if not acquired:
+                        # 其他行程正在下載：先繼續回傳舊資料，並把這次嘗試記成驗證時間，
+                        # 下一輪 TTL 前不再排刷新；之後的刷新會採用它寫好的快照（其 fetched_at 較新）
+                        entry.fetched_at = time.time()
+                    elif not await self._adopt_disk(entry):
+                        await self._fetch(entry)
+            entry.last_error = None
+        except Exception as e:
+            entry.last_error = str(e)
+            print(f"[WARN] 資料集背景刷新失敗 {entry.url}: {e}", file=sys.stderr)
+        finally:
+            entry.refreshing = False
+
+    async def _fetch(self, entry: CacheEntry) -> None:
+        """條件式請求來源網站並替換成新版資料（304 時只更新驗證時間）。"""
+        result = await self.fetcher(entry.url, entry.etag, entry.last_modified)
+        changed = not result.not_modified
+        if result.not_modified:
+            entry.fetched_at = time.time()
+        else:
+            # 先建好新版索引再一次替換，讀取端永遠看到完整的一版資料
+            entry.data = await asyncio.to_thread(
+                self._build, entry.url, _or_empty(result.table), entry.data.index
+            )
+            entry.etag = result.etag
+            entry.last_modified = result.last_modified
+            entry.fetched_at = time.time()
+        await asyncio.to_thread(self._write_disk, entry, changed)
+
+    async def _adopt_disk(self, entry: CacheEntry) -> bool:
+        """磁碟上有其他行程驗證過、且未過期的較新快照時直接採用；回傳是否已採用。"""
+        update = await asyncio.to_thread(self._disk_update, entry)
+        if update is None:
+            return False
+        state, data = update
+        if data is not None:
+            entry.data = data
+            entry.version = state.version
+        entry.etag = state.etag
+        entry.last_modified = state.last_modified
+        entry.fetched_at = state.fetched_at
+        return True
+
+    def _disk_update(self, entry: CacheEntry) -> Optional[Tuple[SnapshotState, Optional[Dataset]]]:
+        """(最新 state, 新版資料)；版本沒變時資料為 None（只需更新驗證時間），不需採用時回傳 None。"""
+        try:
+            state = self.store.state(entry.url)
+        except Exception:
+            return None
+        if state is None or state.fetched_at <= entry.fetched_at or time.time() - state.fetched_at > self.ttl:
+            return None
+        if state.version == entry.version:
+            return state, None
+        table, _ = self.store.load(entry.url, state.version, self.int_parsers)
+        return state, self._build(entry.url, table, entry.data.index)
+
+    def _build(self, url: str, table: ColumnarTable, previous_index: Any) -> Dataset:
+        index = self.indexer(url, table, previous_index) if self.indexer else None
+        aggregates = self.aggregator(url, table, index) if self.aggregator else None
+        # 有磁碟快取時由快照版本 id 標示版本；沒有時以內容雜湊代替，多個行程各自載入同一份資料也會一致
+        digest = table_digest(table) if self.store is None else None
+        return Dataset(table, index, aggregates, digest)
+
+    def _load_snapshot(self, url: str, version: str) -> CacheEntry:
+        table, header = self.store.load(url, version, self.int_parsers)
+        return CacheEntry(
+            url=url,
+            data=self._build(url, table, None),
+            etag=header.get("etag"),
+            last_modified=header.get("last_modified"),
+            fetched_at=float(header.get("fetched_at", 0)),
+            version=version,
+        )
+
+    def _read_disk(self, url: str) -> Optional[CacheEntry]:
+        """冷啟動：mmap 最新一版快照；該版損毀時往前找仍可讀的版本。"""
+        if self.store is None:
+            return None
+        try:
+            state = self.store.state(url)
+            versions = self.store.versions(url)
+        except Exception as e:
+            print(f"[WARN] 讀取快照狀態失敗 {url}: {e}", file=sys.stderr)
+            return None
+        if state is not None and state.version in versions:
+            versions.remove(state.version)
+            versions.append(state.version)
+        for version in reversed(versions):
+            try:
+                entry = self._load_snapshot(url, version)
+            except Exception as e:
+                print(f"[WARN] 載入快照失敗 {url} @ {version}: {e}", file=sys.stderr)
+                continue
+            if state is not None and state.version == version:
+                # 最新一版另以 state 的驗證資訊為準（304 之後只更新 state）
+                entry.etag = state.etag
+                entry.last_modified = state.last_modified
+                entry.fetched_at = state.fetched_at
+            return entry
+        return None
+
+    def _write_disk(self, entry: CacheEntry, changed: bool) -> None:
+        """changed=True 時存一版新快照；304 時只更新最新一版的驗證資訊。"""
+        if self.store is None:
+            return
+        try:
+            if changed or entry.version is None:
+                entry.version = self.store.save(
+                    entry.url, entry.table, entry.etag, entry.last_modified, entry.fetched_at
+                )
+            else:
+                self.store.touch(entry.url, entry.etag, entry.last_modified, entry.fetched_at)
+        except Exception as e:
+            print(f"[WARN] 寫入快照失敗 {entry.url}: {e}", file=sys.stderr)
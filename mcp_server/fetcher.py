@@ -0,0 +1,69 @@
+# job-guardian/mcp_server/fetcher.py
+# 非同步 HTTP 下載：整個 server 共用一個 httpx.AsyncClient 連線池。
+# - keep-alive：同一主機（MOL / TWSE）的連線重複使用，省掉 TCP/TLS 握手
+# - 可選 HTTP/2 多工（httpx 不支援 HTTP/1.1 pipelining）
+# - client 延遲到第一次使用才建立，確保綁定在 FastMCP 的 event loop 上
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+
+class HttpPool:
+    """共用的 httpx.AsyncClient；所有資料集下載都經過這裡。"""
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+        local_address: Optional[str] = "0.0.0.0",  # 綁 IPv4，同 requests 端的 _force_ipv4
+    ):
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.local_address = local_address
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                headers=self.headers,
+                limits=self.limits,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=self.http2,
+                    limits=self.limits,
+                    local_address=self.local_address,
+                    retries=1,
+                ),
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncIterator[httpx.Response]:
+        """
+        串流 GET：body 尚未讀取，由呼叫端以 resp.aiter_bytes() 逐塊消化。
+        非 2xx/304 時丟出 httpx.HTTPStatusError。
+        """
+        async with self.client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code != 304:
+                resp.raise_for_status()
+            yield resp
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,72 @@
+# job-guardian/mcp_server/payload.py
+# 工具回應瘦身與分頁：減少 MCP 傳輸量與 LLM context token。
+# - verbosity：compact（預設，只留有值的萃取欄位）/ standard（全部萃取欄位）/ full（另附原始資料列）
+# - fields：只回傳指定欄位，可用萃取欄名（如 罰鍰金額）或 CSV 原始欄名（如 處分字號）
+# - cursor：不透明字串，記錄資料版本與命中列清單中的位置；翻頁時沿用同一版資料，
+#   該版資料已不在（未啟用快照時資料已更新、或快照已被清掉）就回 CURSOR_EXPIRED，不會默默翻到另一版
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from typing import Optional, Sequence, Tuple
+
+from columnar import ColumnarTable
+
+VERBOSITY_LEVELS = ("compact", "standard", "full")
+RAW_KEY = "資料列原始"
+CURSOR_EXPIRED = "cursor 已過期：資料已更新（或該版快照已刪除），請不帶 cursor 重新查詢"
+
+
+class View:
+    """單筆命中列要輸出哪些欄位。"""
+
+    __slots__ = ("verbosity", "fields")
+
+    def __init__(self, verbosity: str = "compact", fields: Optional[Sequence[str]] = None):
+        if verbosity not in VERBOSITY_LEVELS:
+            raise ValueError(f"verbosity 必須是 {' / '.join(VERBOSITY_LEVELS)} 之一，收到 {verbosity!r}")
+        self.verbosity = verbosity
+        self.fields = tuple(f for f in fields if f) if fields else None
+
+    def shape(self, item: dict, table: ColumnarTable, i: int) -> dict:
+        """item 為萃取後的欄位；原始資料列只在需要時才 materialize。"""
+        if self.fields is not None:
+            out = {}
+            for f in self.fields:
+                if f == RAW_KEY:
+                    out[f] = table.row(i)
+                elif f in item:
+                    out[f] = item[f]
+                elif f in table.columns:
+                    out[f] = table.value(i, f)
+            return out
+        if self.verbosity == "compact":
+            return {k: v for k, v in item.items() if v is not None and v != ""}
+        if self.verbosity == "full":
+            return {**item, RAW_KEY: table.row(i)}
+        return item
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+
+
+def encode_cursor(version: Optional[str], offset: int, key: str) -> str:
+    """version 為第一頁所讀資料的版本標記；key 為查詢條件（工具 + 參數），避免 cursor 被拿去翻另一個查詢。"""
+    raw = json.dumps([version, offset, _digest(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str) -> Tuple[Optional[str], int]:
+    """cursor → (資料版本, 命中列清單中的位置)；格式錯誤或查詢條件不符時丟出 ValueError。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, offset, digest = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(offset)
+    except Exception:
+        raise ValueError(f"無效的 cursor: {cursor!r}")
+    if digest != _digest(key) or offset < 0:
+        raise ValueError("cursor 與目前的查詢條件不符，請不帶 cursor 重新查詢")
+    return version, offset
@@ -0,0 +1,276 @@
+# job-guardian/mcp_server/resolver.py
+# 公司名稱解析：精確/子字串比對查無結果時，找出「使用者其實指的是哪家公司」。
+# - 簡繁/異體字折疊：併入 normalize_company_name，索引與查詢兩端一致
+# - 別名表：公司代號 ↔ 中文名稱 ↔ 英文名稱（由 ESG 資料集的公司代號建立，可再合併外部別名檔）
+# - 容錯：trigram 倒排 + 有界編輯距離（見 company_index.NameIndex.fuzzy）
+# - 回傳依分數排序的候選清單，呼叫端決定是否採用
+
+from __future__ import annotations
+
+import csv
+import os
+import re
+import sys
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from columnar import ColumnarTable
+from company_index import DatasetIndex
+
+# 簡體 / 異體 → 公司名稱常見的繁體寫法（每組「原字 目標字」）
+_VARIANT_PAIRS = """
+臺台 湾灣 积積 电電 业業 银銀 国國 华華 发發 达達 联聯 车車 机機 钢鋼 铁鐵 药藥
+际際 实實 设設 计計 讯訊 网網 络絡 软軟 开開 贸貿 资資 产產 务務 东東 会會 广廣
+厂廠 长長 门門 马馬 龙龍 丰豐 宝寶 兴興 乐樂 云雲 众眾 优優 传傳 体體 关關 农農
+军軍 医醫 区區 协協 卫衛 压壓 县縣 团團 园園 图圖 圣聖 场場 坚堅 声聲 处處 备備
+复復 头頭 学學 宁寧 对對 导導 层層 岛島 币幣 师師 带帶 库庫 应應 张張 强強 归歸
+录錄 总總 恒恆 战戰 护護 报報 择擇 损損 数數 时時 显顯 术術 杂雜 权權 条條 来來
+极極 构構 标標 树樹 样樣 桥橋 检檢 楼樓 欧歐 气氣 汇匯 汉漢 沟溝 泽澤 洁潔 测測
+润潤 温溫 满滿 滨濱 灯燈 热熱 爱愛 环環 现現 画畫 疗療 盐鹽 监監 盘盤 矿礦 码碼
+础礎 确確 礼禮 种種 称稱 稳穩 竞競 笔筆 筑築 签簽 简簡 类類 粮糧 纺紡 织織 纸紙
+线線 组組 细細 终終 经經 结結 给給 绝絕 统統 绩績 续續 维維 综綜 绿綠 编編 罗羅
+职職 肤膚 脑腦 艺藝 节節 苏蘇 荣榮 营營 蓝藍 补補 装裝 观觀 规規 视視 览覽 订訂
+认認 训訓 议議 记記 讲講 论論 访訪 证證 评評 识識 诊診 试試 询詢 语語 说說 读讀
+课課 调調 谊誼 负負 财財 责責 货貨 质質 购購 贵貴 费費 赛賽 运運 还還 进進 远遠
+违違 连連 选選 递遞 邮郵 钟鐘 钱錢 铜銅 铝鋁 链鏈 销銷 锁鎖 锋鋒 锡錫 锦錦 键鍵
+镇鎮 闻聞 队隊 阳陽 阶階 陆陸 陈陳 险險 随隨 难難 顺順 顾顧 预預 领領 频頻 额額
+风風 飞飛 饮飲 馆館 驱驅 验驗 鱼魚 鲜鮮 鸟鳥 鸡雞 鸿鴻 麦麥 黄黃 齐齊 亚亞 仪儀
+价價 纳納 圆圓 硅矽
+"""
+_VARIANTS = {ord(p[0]): p[1] for p in _VARIANT_PAIRS.split()}
+
+
+def fold_variants(s: str) -> str:
+    """簡體 / 異體字折疊成同一寫法（臺 → 台、积电 → 積電）。"""
+    return s.translate(_VARIANTS)
+
+
+def default_max_distance(length: int) -> int:
+    """依查詢長度決定可容忍的編輯次數；太短的查詢不做容錯。"""
+    if length < 3:
+        return 0
+    if length <= 5:
+        return 1
+    if length <= 10:
+        return 2
+    return 3
+
+
+# ------------------------------------------------------------
+# 別名表：公司代號 ↔ 中文名稱 ↔ 英文名稱
+# ------------------------------------------------------------
+class AliasTable:
+    """
+    以公司代號為中心的別名群組。
+    任何別名（代號、中文名、英文名，皆先正規化）都能查回代號，再展開成同組的其他名稱。
+    """
+
+    def __init__(self, normalize: Callable[[str], str]):
+        self.normalize = normalize
+        self._code_by_key: Dict[str, str] = {}
+        self._names_by_code: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names_by_code)
+
+    def key_of(self, value: str) -> str:
+        return self.normalize(value).lower()
+
+    def add(self, code: Optional[str], *names: Optional[str]) -> None:
+        code = (code or "").strip()
+        if not code:
+            return
+        group = self._names_by_code.setdefault(code, [])
+        self._code_by_key.setdefault(code.lower(), code)
+        for name in names:
+            name = (name or "").strip()
+            if not name or name in group:
+                continue
+            group.append(name)
+            key = self.key_of(name)
+            if key:
+                self._code_by_key.setdefault(key, code)
+
+    def code_of(self, query: str) -> Optional[str]:
+        q = (query or "").strip()
+        return self._code_by_key.get(q.lower()) or self._code_by_key.get(self.key_of(q))
+
+    def names_of(self, code: Optional[str]) -> List[str]:
+        return list(self._names_by_code.get(code or "", ()))
+
+    def expand(self, query: str) -> List[str]:
+        """query 所屬別名群組的其他名稱（不含 query 本身）。"""
+        key = self.key_of(query)
+        return [n for n in self.names_of(self.code_of(query)) if self.key_of(n) != key]
+
+    @classmethod
+    def build(
+        cls,
+        table: ColumnarTable,
+        normalize: Callable[[str], str],
+        code_cols: Sequence[str],
+        name_cols: Sequence[str],
+        english_cols: Sequence[str] = (),
+        extra: Iterable[Tuple[str, ...]] = (),
+    ) -> "AliasTable":
+        """由資料集的公司代號欄建立；extra 為外部別名檔的 (代號, 名稱...) 列。"""
+        aliases = cls(normalize)
+        for i in range(len(table)):
+            aliases.add(
+                table.pick(i, *code_cols),
+                table.pick(i, *name_cols),
+                table.pick(i, *english_cols),
+            )
+        for row in extra:
+            aliases.add(*row)
+        return aliases
+
+
+def load_alias_file(path: str) -> List[Tuple[str, ...]]:
+    """
+    讀外部別名檔（UTF-8 CSV，第一欄公司代號，其餘欄為任意別名，例如全名、英文名）。
+    檔案不存在或讀取失敗時回傳空清單。
+    """
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # 標題列
+            return [tuple(row) for row in reader if row and row[0].strip()]
+    except Exception as e:
+        print(f"[WARN] 讀取別名檔失敗 {path}: {e}", file=sys.stderr)
+        return []
+
+
+# ------------------------------------------------------------
+# 候選排序
+# ------------------------------------------------------------
+@dataclass
+class Candidate:
+    name_id: int
+    name: str
+    score: float  # 0 ~ 1；1 為精確或別名命中
+    match: str  # exact / alias / substring / fuzzy
+    distance: int = 0
+    via: Optional[str] = None  # 經別名展開時，實際用來比對的名稱
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "score": self.score,
+            "match": self.match,
+            "distance": self.distance,
+            "via": self.via,
+        }
+
+
+def _coverage(norm: str, name_norm: str) -> float:
+    """查詢佔名稱的比例：同樣包含查詢字串時，較短（較接近）的名稱排前面。"""
+    return 0.5 + 0.4 * min(1.0, len(norm) / max(len(name_norm), 1))
+
+
+def resolve(
+    index: DatasetIndex,
+    query: str,
+    aliases: Optional[AliasTable] = None,
+    limit: int = 10,
+    max_dist: Optional[int] = None,
+) -> List[Candidate]:
+    """
+    在單一資料集的名稱索引中找 query 最可能指的公司，依分數由高到低回傳。
+    依序嘗試：原查詢與別名展開 → 精確 → 子字串 → trigram + 編輯距離容錯。
+    """
+    names = index.names
+    best: Dict[int, Candidate] = {}
+
+    def offer(nid: int, score: float, match: str, distance: int = 0, via: Optional[str] = None) -> None:
+        c = best.get(nid)
+        if c is None or score > c.score:
+            best[nid] = Candidate(nid, names.names[nid], round(score, 3), match, distance, via)
+
+    queries: List[Tuple[str, Optional[str]]] = [(query, None)]
+    if aliases is not None:
+        queries += [(alias, alias) for alias in aliases.expand(query)]
+
+    for q, via in queries:
+        for nid in index.match_names(q, partial=False):
+            offer(nid, 1.0, "alias" if via else "exact", via=via)
+
+        norm = names.normalize(names.key_of(q))
+        if not norm:
+            continue
+        for nid in index.match_names(q, partial=True):
+            offer(nid, _coverage(norm, names.norms[nid]), "substring", via=via)
+
+        k = default_max_distance(len(norm)) if max_dist is None else max_dist
+        if k <= 0:
+            continue
+        seen: Set[int] = set(best)
+        for nid, d in index.fuzzy_names(norm, k):
+            if d == 0 and nid in seen:
+                continue
+            score = (1.0 - d / len(norm)) * _coverage(norm, names.norms[nid])
+            offer(nid, score, "fuzzy" if d else "substring", d, via)
+
+    ranked = sorted(best.values(), key=lambda c: (-c.score, len(c.name), c.name))
+    return ranked[:limit]
+
+
+# ------------------------------------------------------------
+# 自由文字中的公司名稱
+# ------------------------------------------------------------
+_CODE_PAT = re.compile(r"(?<![A-Za-z0-9])[A-Za-z0-9]{4,6}(?![A-Za-z0-9])")
+# 西元年份與同範圍的股票代號（如 2002 中鋼）寫法相同：這類數字要有代號語境才當成代號
+_YEAR_LIKE_PAT = re.compile(r"(19|20)\d{2}")
+_CODE_CONTEXT_PAT = re.compile(r"(代號|代碼|股號|股票|ticker|code)\s*[:#]?\s*$", re.IGNORECASE)
+
+
+def find_companies(index: DatasetIndex, text: str, min_len: int = 2) -> List[int]:
+    """
+    在一段問題文字中找出資料集裡的公司名稱（正規化後整段相等），回傳 name ids。
+    重疊時保留較長的名稱（例如「中華電信」優先於「中華」）。
+    """
+    names = index.names
+    norm_text = names.normalize(names.key_of(text or ""))
+    spans = [
+        (i, j, nids & index.rows_by_name.keys())
+        for i, j, nids in names.spans(norm_text)
+        if j - i >= min_len
+    ]
+    taken = [False] * len(norm_text)
+    out: List[int] = []
+    for i, j, nids in sorted(spans, key=lambda t: (t[0] - t[1], t[0])):
+        if not nids or any(taken[i:j]):
+            continue
+        taken[i:j] = [True] * (j - i)
+        out.extend(sorted(nids))
+    return out
+
+
+def _code_tokens(text: str) -> List[str]:
+    """
+    可能是公司代號的片段。年份形式的數字（2023、2024 年）只在有代號語境時保留：
+    前面緊接「股票代號」「代碼」等字樣，或寫成 (2002)、2002.TW。
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    out: List[str] = []
+    for m in _CODE_PAT.finditer(text):
+        tok = m.group()
+        if _YEAR_LIKE_PAT.fullmatch(tok):
+            before, after = text[: m.start()], text[m.end() :]
+            bracketed = before.endswith("(") and after.startswith(")")
+            listed = after[:3].upper() == ".TW"  # 2002.TW / 2002.TWO
+            if not (bracketed or listed or _CODE_CONTEXT_PAT.search(before[-12:])):
+                continue
+        out.append(tok)
+    return out
+
+
+def find_codes(aliases: Optional[AliasTable], text: str) -> List[str]:
+    """問題文字中出現的公司代號（需存在於別名表；年份形式的數字見 _code_tokens）。"""
+    if aliases is None:
+        return []
+    codes = (aliases.code_of(tok) for tok in _code_tokens(text))
+    return sorted({c for c in codes if c})
@@ -1,24 +1,37 @@
 # job-guardian/mcp_server/server.py
 # MCP server: tools = esg_hr, labor_violations, ge_work_equality_violations
-# 每次 tool call 直接從官方 URL 下載最新 CSV，於工具內做 ETL/篩選/回傳。
+# 資料集經 DatasetCache 快取（記憶體 + 版本化磁碟快照），TTL 過期後背景以條件式請求刷新；
+# 各 tool 的 snapshot= 參數可查詢歷史快照；
+# 下載走共用的 httpx.AsyncClient 連線池，tools 皆為 async，不阻塞 FastMCP event loop。
+# 預設以 STDIO 由 agent 啟動；--transport http 為多 worker 共用模式（見檔案最後的「共用模式」）。
 # 參考 mcp-agent 的 asyncio/fastmcp 範例（@mcp.tool）
 
 from __future__ import annotations
 
 import argparse
-import csv
-import io
+import asyncio
 import json
 import os
 import re
+import sys
 import time
 import unicodedata
-from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 import socket
+
+from aggregates import build_esg_summaries, build_violation_summaries, merge_violations
+from columnar import ColumnarTable, parse_date, parse_int
+from company_index import DatasetIndex
+from csv_stream import StreamingCsvParser, parse_csv_bytes
+from dataset_cache import CacheEntry, Dataset, DatasetCache, FetchResult
+from fetcher import HttpPool
+from payload import CURSOR_EXPIRED, View, decode_cursor, encode_cursor
+from resolver import AliasTable, find_codes, find_companies, fold_variants, load_alias_file, resolve
 import requests.packages.urllib3.util.connection as urllib3_cn
 
 
@@ -54,10 +67,33 @@ GE_VIO_URL = os.getenv(
 ).strip()
 
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+HTTP2 = os.getenv("HTTP2", "false").lower() == "true"  # True: 同主機以 HTTP/2 多工
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(64 * 1024)))  # 串流解析每塊 bytes
+PARSE_BATCH_SIZE = int(os.getenv("PARSE_BATCH_SIZE", str(1024 * 1024)))  # 累積這麼多 bytes 才交給 thread 解析一次
 CASE_SENSITIVE = os.getenv("CASE_SENSITIVE", "false").lower() == "true"
 PARTIAL_MATCH = os.getenv(
     "PARTIAL_MATCH", "false").lower() == "true"  # True: 子字串/模糊包含
 
+# 資料集快取：TTL 秒數（過期後背景刷新）與磁碟快取目錄（空字串 = 只用記憶體）
+DATASET_TTL = float(os.getenv("DATASET_TTL", "3600"))
+CACHE_DIR = os.getenv(
+    "CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+).strip()
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "10"))  # 每個資料集保留的快照版本數
+SNAPSHOT_MEMORY = int(os.getenv("SNAPSHOT_MEMORY", "4"))  # 同時載入記憶體的歷史快照數
+
+# 公司名稱解析：精確/子字串查無結果時的容錯（代號、英文名、錯字、簡繁）
+RESOLVE_MIN_SCORE = float(os.getenv("RESOLVE_MIN_SCORE", "0.5"))  # 低於此分數的相近候選不列出
+# 只有這些比對方式會自動採用；子字串/錯字容錯的候選只列出，等使用者確認（中華電視 ≠ 中華電信）
+RESOLVE_AUTO_MATCHES = ("exact", "alias")
+RESOLVE_LIMIT = int(os.getenv("RESOLVE_LIMIT", "5"))  # 回應中附帶的候選數
+ALIAS_FILE = os.getenv("ALIAS_FILE", "").strip()  # 外部別名檔（代號, 別名...）
+
+# 回應瘦身：compact（只留有值的萃取欄位）/ standard / full（附原始資料列）
+DEFAULT_VERBOSITY = os.getenv("DEFAULT_VERBOSITY", "compact").strip()
+
 # ------------------------------------------------------------
 # 公用：時間/名稱正規化/CSV下載與解析
 # ------------------------------------------------------------
@@ -71,218 +107,364 @@ SUFFIX_PAT = re.compile(r"(股份有?限公司|有限?公司|公司|Co\.?,?Ltd\.
 
 
 def normalize_company_name(name: str) -> str:
-    """去括號/空白/常見尾綴；NFKC 正規化。"""
+    """去括號/空白/常見尾綴；NFKC 正規化與簡繁/異體字折疊。"""
     if not name:
         return ""
     s = unicodedata.normalize("NFKC", str(name)).strip()
+    s = fold_variants(s)  # 簡體/異體 → 同一寫法
     s = re.sub(r"（.*?）|\(.*?\)", "", s)
     s = re.sub(r"\s+", "", s)
     s = SUFFIX_PAT.sub("", s)
     return s
 
 
-def _fetch_csv_rows(url: str) -> List[Dict[str, str]]:
+# 需要另存整數欄的欄位（日期 → yyyymmdd；年度/金額 → int）
+INT_COLUMNS = {
+    "公告日期": parse_date,
+    "公布日期": parse_date,
+    "處分日期": parse_date,
+    "罰鍰金額": parse_int,
+    "處分金額": parse_int,
+    "報告年度": parse_int,
+    "申報年度": parse_int,
+    "年度": parse_int,
+}
+
+
+HTTP_HEADERS = {
+    "User-Agent": "curl/8.5.0",
+    "Accept": "text/csv,*/*;q=0.8",
+}
+
+# 整個 server 共用的 keep-alive 連線池
+http_pool = HttpPool(
+    timeout=HTTP_TIMEOUT,
+    headers=HTTP_HEADERS,
+    max_connections=HTTP_MAX_CONNECTIONS,
+    http2=HTTP2,
+)
+
+
+def _feed_batch(parser: StreamingCsvParser, chunks: List[bytes]) -> None:
+    for chunk in chunks:
+        parser.feed(chunk)
+
+
+async def _download(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
     """
-    下載 CSV → DictReader。
-    先嘗試 requests (UA 模擬 curl)，若失敗再 fallback httpx。
+    下載 CSV（可帶 ETag / Last-Modified 做條件式請求）。
+    先用共用的 httpx.AsyncClient 串流下載，邊收 bytes 邊解碼/解析成欄式資料表
+    （解析在 thread 執行，每累積 PARSE_BATCH_SIZE 交一批，不佔住 event loop）；
+    失敗再 fallback requests（在 thread 執行）。伺服器回 304 時回傳 not_modified=True。
     """
-    import httpx
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
 
-    # 嘗試多種解碼
-    def _decode_content(content: bytes) -> str:
-        for enc in ("utf-8", "cp950", "big5", "latin-1"):
-            try:
-                return content.decode(enc)
-            except UnicodeDecodeError:
-                continue
-        # 全部失敗就回傳 binary
-        return content.decode("utf-8", errors="ignore")
+    def _not_modified() -> FetchResult:
+        return FetchResult(table=None, etag=etag, last_modified=last_modified, not_modified=True)
 
-    # ---------- 1. 先用 requests ----------
+    # ---------- 1. 先用共用的 httpx.AsyncClient（串流） ----------
     try:
-        resp = requests.get(
-            url,
-            timeout=HTTP_TIMEOUT,
-            headers={
-                "User-Agent": "curl/8.5.0",
-                "Accept": "text/csv,*/*;q=0.8",
-            },
-        )
+        async with http_pool.stream(url, headers=headers) as resp:
+            if resp.status_code == 304:
+                return _not_modified()
+            parser = StreamingCsvParser(INT_COLUMNS)
+            batch: List[bytes] = []
+            pending = 0
+            async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+                batch.append(chunk)
+                pending += len(chunk)
+                if pending >= PARSE_BATCH_SIZE:
+                    # 一次只有一批在解析（await 完才收下一批），parser 不會被並行使用
+                    await asyncio.to_thread(_feed_batch, parser, batch)
+                    batch, pending = [], 0
+            await asyncio.to_thread(_feed_batch, parser, batch)
+            return FetchResult(
+                table=await asyncio.to_thread(parser.close),
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+
+    except Exception as e_httpx:
+        print(f"[WARN] httpx 抓取失敗，改用 requests: {e_httpx}", file=sys.stderr)
+
+    # ---------- 2. fallback requests ----------
+    def _requests_get() -> FetchResult:
+        resp = requests.get(url, timeout=HTTP_TIMEOUT, headers={**HTTP_HEADERS, **headers})
         resp.raise_for_status()
-        text = _decode_content(resp.content)
-        rows = list(csv.DictReader(io.StringIO(text)))
-        return [{(k or "").strip(): (v or "").strip() for k, v in row.items()} for row in rows]
+        if resp.status_code == 304:
+            return _not_modified()
+        return FetchResult(
+            table=parse_csv_bytes(resp.content, INT_COLUMNS, STREAM_CHUNK_SIZE),
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+
+    try:
+        return await asyncio.to_thread(_requests_get)
 
     except Exception as e_req:
-        print(f"[WARN] requests 抓取失敗，改用 httpx: {e_req}")
+        raise RuntimeError(f"httpx + requests 都無法抓取 {url}: {e_req}")
 
-    # ---------- 2. fallback httpx ----------
-    try:
-        with httpx.Client(
-            http2=False,
-            timeout=HTTP_TIMEOUT,
-            headers={
-                "User-Agent": "curl/8.5.0",
-                "Accept": "text/csv,*/*;q=0.8",
-            },
-            transport=httpx.HTTPTransport(local_address="0.0.0.0")
-        ) as client:
-            resp = client.get(url)
-            resp.raise_for_status()
-            text = _decode_content(resp.content)
-            rows = list(csv.DictReader(io.StringIO(text)))
-            return [{(k or "").strip(): (v or "").strip() for k, v in row.items()} for row in rows]
 
-    except Exception as e_httpx:
-        raise RuntimeError(f"requests + httpx 都無法抓取 {url}: {e_httpx}")
+# 各資料集的欄位候選（不同年版欄名略有差異，取第一個有值的）
+ESG_NAME_COLS = ("公司名稱", "公司", "公司名稱(中)", "company", "CompanyName")
+ESG_YEAR_COLS = ("申報年度", "年度", "Year", "year", "報告年度")
+ESG_CODE_COLS = ("公司代號", "股票代號", "StockCode")
+ESG_INDUSTRY_COLS = ("產業別", "產業類別", "產業", "Industry", "industry")
+ESG_METRIC_COLS = {
+    "員工薪資中位數": (
+        "員工薪資中位數",
+        "薪資中位數",
+        "MedianSalary",
+        "薪資中位",
+        "非擔任主管之全時員工薪資中位數(仟元/人)",
+    ),
+    "員工薪資平均數": (
+        "員工薪資平均數",
+        "薪資平均數",
+        "AverageSalary",
+        "薪資平均",
+        "員工薪資平均數(仟元/人)",
+    ),
+    "女性主管比例": (
+        "女性主管比例",
+        "女性主管比",
+        "FemaleManagerRatio",
+        "管理職女性主管佔比",
+    ),
+}
+ESG_EN_NAME_COLS = ("英文簡稱", "公司英文簡稱", "英文名稱", "EnglishName")
+VIO_NAME_COLS = ("事業單位名稱或負責人", "事業單位名稱", "雇主名稱", "公司名稱", "name")
+VIO_DATE_COLS = ("公告日期", "公布日期", "處分日期", "date", "公告日")
+VIO_FINE_COLS = ("罰鍰金額", "處分金額", "金額")
+VIO_ARTICLE_COLS = ("違法法規法條", "違反法條", "法條")
 
 
-def _match_company(row_value: str, user_input: str) -> bool:
-    """依環境變數設定做精確/包含比對，並處理大小寫與名稱正規化。"""
-    if not CASE_SENSITIVE:
-        row_value = row_value.lower()
-        user_value = user_input.lower()
-    else:
-        user_value = user_input
+def _build_index(url: str, table: ColumnarTable, previous: Optional[DatasetIndex]) -> DatasetIndex:
+    """
+    資料集載入/刷新時建公司名稱索引（沿用上一版的名稱正規化結果）。
+    ESG 資料集另外建別名表（公司代號 ↔ 名稱），供三個資料集的名稱解析共用。
+    """
+    cols = ESG_NAME_COLS if url == ESG_URL else VIO_NAME_COLS
+    index = DatasetIndex.build(
+        (table.pick(i, *cols) for i in range(len(table))),
+        normalize_company_name,
+        case_sensitive=CASE_SENSITIVE,
+        previous=previous,
+    )
+    if url == ESG_URL:
+        index.aliases = AliasTable.build(
+            table,
+            normalize_company_name,
+            ESG_CODE_COLS,
+            ESG_NAME_COLS,
+            ESG_EN_NAME_COLS,
+            extra=load_alias_file(ALIAS_FILE),
+        )
+    return index
 
-    # 也跑一次正規化（中英文公司尾綴/空白）
-    row_norm = normalize_company_name(row_value)
-    user_norm = normalize_company_name(user_value)
 
-    if PARTIAL_MATCH:
-        return (user_value in row_value) or (user_norm in row_norm)
-    else:
-        return (row_value == user_value) or (row_norm == user_norm)
+def _build_aggregates(url: str, table: ColumnarTable, index: DatasetIndex) -> dict:
+    """資料集載入/刷新時預先算好每家公司的彙總（name id → summary）。"""
+    if url == ESG_URL:
+        return build_esg_summaries(
+            table, index, ESG_YEAR_COLS, ESG_CODE_COLS, ESG_INDUSTRY_COLS, ESG_METRIC_COLS
+        )
+    return build_violation_summaries(table, index, VIO_DATE_COLS, VIO_FINE_COLS, VIO_ARTICLE_COLS)
+
 
+# 以 URL 為 key 的資料集快取（記憶體 + 磁碟快照），每一版資料附帶公司名稱索引與彙總
+dataset_cache = DatasetCache(
+    _download,
+    ttl=DATASET_TTL,
+    cache_dir=CACHE_DIR or None,
+    indexer=_build_index,
+    int_parsers=INT_COLUMNS,
+    aggregator=_build_aggregates,
+    snapshot_keep=SNAPSHOT_KEEP,
+    snapshot_memory=SNAPSHOT_MEMORY,
+)
 
-def _pick(d: Dict[str, str], *candidates: str) -> Optional[str]:
-    """從多個候選欄名中拿第一個存在的值。"""
-    for k in candidates:
-        if k in d and d[k] != "":
-            return d[k]
-    return None
+
+async def _aliases() -> Optional[AliasTable]:
+    """ESG 資料集的別名表；ESG 資料暫時取不到時不影響其他資料集的查詢。"""
+    try:
+        entry = await dataset_cache.get(ESG_URL)
+    except Exception as e:
+        print(f"[WARN] 無法載入公司別名表: {e}", file=sys.stderr)
+        return None
+    return entry.data.index.aliases
 
 
 # ------------------------------------------------------------
-# Tool 1: esg_hr（ESG 人力發展）
-#   來源：t187ap46_O_5.csv
-#   常見欄位（可能因年版不同略有差異）：
-#   - 公司代號, 公司名稱, 申報年度/年度
-#   - 員工薪資中位數/薪資中位數, 員工薪資平均數/薪資平均數
-#   - 女性主管比例/女性主管比, 福利（視資料而定）
+# 查詢核心：對單一版本資料集（Dataset = table + index）做查詢
+#   單筆 tool 與批次 tool 共用；不做 I/O，命中列才 materialize
 # ------------------------------------------------------------
-@mcp.tool()
-def esg_hr(company: str, year: Optional[int] = None, limit: int = 50) -> dict:
+def _match(ds: Dataset, company: str, partial: bool, aliases: Optional[AliasTable]) -> tuple:
     """
-    查 ESG 人力發展（薪資/福利/女性主管比等）。會即時抓取 CSV，於工具內 ETL 後回傳。
-    Args:
-      company: 公司名稱（可含股份有限公司等尾綴）
-      year: 指定年度（可省略）
-      limit: 最多回傳筆數
-    Returns: dict(items=[...], source_url, fetched_at, meta)
+    名稱比對 → (name ids, resolved)。
+    先走原本的精確/子字串比對；查無結果才交給 resolver（代號、英文名、錯字、簡繁）。
+    只自動採用精確或別名（代號 ↔ 中英文名）命中的候選；子字串/錯字容錯的候選
+    （分數 >= RESOLVE_MIN_SCORE）只列在 resolved.candidates，查詢結果為空，由使用者確認後再查。
     """
-    rows = _fetch_csv_rows(ESG_URL)
+    index = ds.index
+    name_ids = index.match_names(company, partial)
+    if name_ids or not company:
+        return name_ids, None
+
+    candidates = resolve(index, company, aliases, limit=RESOLVE_LIMIT)
+    chosen = [c for c in candidates if c.match in RESOLVE_AUTO_MATCHES]
+    suggested = [c for c in candidates if c.match in RESOLVE_AUTO_MATCHES or c.score >= RESOLVE_MIN_SCORE]
+    return [c.name_id for c in chosen], {
+        "resolved_to": [c.name for c in chosen],
+        "needs_confirmation": not chosen and bool(suggested),
+        "candidates": [c.to_dict() for c in suggested],
+    }
+
+
+def _with_resolved(result: dict, resolved: Optional[dict]) -> dict:
+    if resolved is not None:
+        result["resolved"] = resolved
+    return result
+
+
+def _page_result(out: List[dict], hits: List[int], last_pos: Optional[int], limit: int) -> Tuple[dict, Optional[int]]:
+    """收滿 limit 筆且命中列還沒走完時，下一頁從 last_pos + 1 開始。"""
+    next_offset = None
+    if len(out) >= limit and last_pos is not None and last_pos + 1 < len(hits):
+        next_offset = last_pos + 1
+    return {"items": out, "count": len(out), "total_hits": len(hits), "has_more": next_offset is not None}, next_offset
+
+
+def _query_esg(
+    ds: Dataset,
+    company: str,
+    year: Optional[int],
+    limit: int,
+    aliases: Optional[AliasTable] = None,
+    view: Optional[View] = None,
+    offset: int = 0,
+) -> Tuple[dict, Optional[int]]:
+    """回傳 (結果, 下一頁在命中列清單中的起點；沒有下一頁為 None)。"""
+    table, index = ds.table, ds.index
+    view = view or View(DEFAULT_VERBOSITY)
     out: List[Dict[str, str | float | int]] = []
 
-    for r in rows:
-        comp = _pick(r, "公司名稱", "公司", "公司名稱(中)", "company", "CompanyName")
-        if not comp:
-            continue
-        if not _match_company(comp, company):
-            continue
+    # 索引直接給出命中的列（依原始順序），不再逐列比對
+    name_ids, resolved = _match(ds, company, PARTIAL_MATCH, aliases)
+    hits = index.rows_for(name_ids)
+    pos = None
+    for pos in range(offset, len(hits)):
+        i = hits[pos]
+        comp = table.pick(i, *ESG_NAME_COLS)
 
-        y = _pick(r, "申報年度", "年度", "Year", "year", "報告年度")
+        y = table.pick(i, *ESG_YEAR_COLS)
         if year is not None and (str(year) != str(y)):
             continue
 
         item = {
-            "公司代號": _pick(r, "公司代號", "股票代號", "StockCode"),
+            "公司代號": table.pick(i, *ESG_CODE_COLS),
             "公司名稱": comp,
             "年度": y,
-            "員工薪資中位數": _pick(
-                r,
-                "員工薪資中位數",
-                "薪資中位數",
-                "MedianSalary",
-                "薪資中位",
-                "非擔任主管之全時員工薪資中位數(仟元/人)",
-            ),
-            "員工薪資平均數": _pick(
-                r,
-                "員工薪資平均數",
-                "薪資平均數",
-                "AverageSalary",
-                "薪資平均",
-                "員工薪資平均數(仟元/人)",
-            ),
-            "女性主管比例": _pick(
-                r,
-                "女性主管比例",
-                "女性主管比",
-                "FemaleManagerRatio",
-                "管理職女性主管佔比",
-            ),
-            "資料列原始": r,
+            **{m: table.pick(i, *cols) for m, cols in ESG_METRIC_COLS.items()},
         }
-        out.append(item)
+        out.append(view.shape(item, table, i))  # 只有 full / fields 指定時才 materialize 原始列
         if len(out) >= limit:
             break
 
+    result, next_offset = _page_result(out, hits, pos, limit)
+    return _with_resolved(result, resolved), next_offset
+
+
+def _violation_item(table: ColumnarTable, i: int, comp: Optional[str], date: Optional[str]) -> dict:
     return {
-        "items": out,
-        "count": len(out),
-        "source_url": ESG_URL,
-        "fetched_at": _iso_now(),
-        "meta": {"query": company, "year": year, "partial_match": PARTIAL_MATCH},
+        "事業單位名稱": comp,
+        "公告日期": date,
+        "裁處機關": table.pick(i, "主管機關", "裁處機關", "機關"),
+        "違反法條": table.pick(i, *VIO_ARTICLE_COLS),
+        "違反法條內容": table.pick(i, "違反法規內容", "違反法條內容", "違規內容", "事實摘要"),
+        "罰鍰金額": table.pick(i, *VIO_FINE_COLS),
     }
 
 
-# ------------------------------------------------------------
-# Tool 2: labor_violations（違反勞基法）
-#   來源：A17000000J-030225-svj
-#   推測欄位：
-#   - 事業單位名稱, 所在縣市, 違反法條, 違反法條內容, 公告日期, 裁處機關, 罰鍰金額
-# ------------------------------------------------------------
-@mcp.tool()
-def labor_violations(company: str, since_year: Optional[int] = None, limit: int = 50) -> dict:
-    """
-    查勞動部違反勞基法紀錄（官方彙總）。
-    Args:
-      company: 事業單位名稱（可用部分關鍵字）
-      since_year: 公告日期的年份 >= since_year 才算
-      limit: 最多回傳筆數
-    """
-    rows = _fetch_csv_rows(LAB_VIO_URL)
+def _query_labor(
+    ds: Dataset,
+    company: str,
+    since_year: Optional[int],
+    limit: int,
+    aliases: Optional[AliasTable] = None,
+    view: Optional[View] = None,
+    offset: int = 0,
+) -> Tuple[dict, Optional[int]]:
+    table, index = ds.table, ds.index
+    view = view or View(DEFAULT_VERBOSITY)
     out: List[Dict[str, str]] = []
     by_year: Dict[str, int] = {}
 
-    for r in rows:
-        comp = _pick(r, "事業單位名稱或負責人", "事業單位名稱", "雇主名稱", "公司名稱", "name")
-        if not comp:
-            continue
+    # 支援部分關鍵字比對（正規化後的公司名包含即可），由 n-gram 索引取命中列
+    name_ids, resolved = _match(ds, company, True, aliases)
+    hits = index.rows_for(name_ids)
+    pos = None
+    for pos in range(offset, len(hits)):
+        i = hits[pos]
+        comp = table.pick(i, *VIO_NAME_COLS)
 
-        # 支援部分關鍵字比對（公司名包含即可）
-        if company not in comp:
+        # 公告日期（字串供回傳，整數欄 yyyymmdd 供年份過濾）
+        date = table.pick(i, *VIO_DATE_COLS)
+        ymd = table.pick_int(i, *VIO_DATE_COLS)
+        y = str(ymd // 10000) if ymd is not None else (date or "")[:4]
+
+        # 年份過濾
+        if since_year is not None and (not y.isdigit() or int(y) < int(since_year)):
             continue
 
-        # 公告日期
-        date = _pick(r, "公告日期", "公布日期", "處分日期", "date", "公告日")
+        out.append(view.shape(_violation_item(table, i, comp, date), table, i))
+
+        if y:
+            by_year[y] = by_year.get(y, 0) + 1
+
+        if len(out) >= limit:
+            break
+
+    result, next_offset = _page_result(out, hits, pos, limit)
+    result["stats"] = {"count_by_year": by_year}
+    return _with_resolved(result, resolved), next_offset
+
+
+def _query_ge(
+    ds: Dataset,
+    company: str,
+    since_year: Optional[int],
+    limit: int,
+    aliases: Optional[AliasTable] = None,
+    view: Optional[View] = None,
+    offset: int = 0,
+) -> Tuple[dict, Optional[int]]:
+    table, index = ds.table, ds.index
+    view = view or View(DEFAULT_VERBOSITY)
+    out: List[Dict[str, str]] = []
+    by_year: Dict[str, int] = {}
+
+    # ⚡ 模糊比對（正規化後子字串），由 n-gram 索引取命中列
+    name_ids, resolved = _match(ds, company, True, aliases)
+    hits = index.rows_for(name_ids)
+    pos = None
+    for pos in range(offset, len(hits)):
+        i = hits[pos]
+        comp = table.pick(i, *VIO_NAME_COLS)
+
+        date = table.pick(i, "公告日期", "公布日期", "處分日期", "date")
         y = (date or "")[:4]
 
-        # 年份過濾
-        if since_year is not None and (not y.isdigit() or int(y) < int(since_year)):
+        # ⚡ 改為「字串包含」模式
+        if since_year is not None and str(since_year) not in (date or ""):
             continue
 
-        item = {
-            "事業單位名稱": comp,
-            "公告日期": date,
-            "裁處機關": _pick(r, "主管機關", "裁處機關", "機關"),
-            "違反法條": _pick(r, "違法法規法條", "違反法條", "法條"),
-            "違反法條內容": _pick(r, "違反法規內容", "違反法條內容", "違規內容", "事實摘要"),
-            "罰鍰金額": _pick(r, "罰鍰金額", "處分金額", "金額"),
-            "資料列原始": r,
-        }
-        out.append(item)
+        out.append(view.shape(_violation_item(table, i, comp, date), table, i))
 
         if y:
             by_year[y] = by_year.get(y, 0) + 1
@@ -290,13 +472,159 @@ def labor_violations(company: str, since_year: Optional[int] = None, limit: int
         if len(out) >= limit:
             break
 
+    result, next_offset = _page_result(out, hits, pos, limit)
+    result["stats"] = {"count_by_year": by_year}
+    return _with_resolved(result, resolved), next_offset
+
+
+def _version_tag(entry: CacheEntry) -> str:
+    # 沒有磁碟快照時以內容雜湊代替：連線池裡的多個 stdio server 行程各自載入同一份資料，標記也相同
+    return entry.version or entry.data.digest or entry.etag or ""
+
+
+def _cursor_start(tool: str, cursor: Optional[str], *params) -> Tuple[str, Optional[str], int]:
+    """
+    解析 cursor → (cursor key, 第一頁所讀資料的版本標記, 起點)；沒有 cursor 時從頭開始。
+    版本標記交給 _cursor_entry 取回同一版資料，不受中途刷新影響。
+    params 要包含所有影響結果的參數（含 snapshot / fields / verbosity）：
+    翻頁時改了任一個（例如另指定 snapshot）就與 cursor 不符而直接報錯，不會被默默忽略。
+    """
+    key = json.dumps([tool, *params], ensure_ascii=False, default=str)
+    if not cursor:
+        return key, None, 0
+    version, offset = decode_cursor(cursor, key)
+    return key, version, offset
+
+
+async def _cursor_entry(url: str, version: Optional[str], snapshot: Optional[str]) -> CacheEntry:
+    """
+    取得這一頁要讀的資料：沒有 cursor 時同 dataset_cache.get(url, snapshot)。
+    有 cursor 時目前資料仍是同一版就直接用，否則改讀同版本的磁碟快照；
+    該版已不在（未啟用 CACHE_DIR 時資料已更新、或快照已被清掉）時丟出「cursor 已過期」。
+    """
+    if version is None:
+        return await dataset_cache.get(url, snapshot)
+    entry = await dataset_cache.get(url)
+    if _version_tag(entry) == version:
+        return entry
+    if dataset_cache.store is not None:
+        try:
+            return await dataset_cache.get(url, version)
+        except ValueError:
+            pass
+    raise ValueError(CURSOR_EXPIRED)
+
+
+def _next_cursor(entry: CacheEntry, next_offset: Optional[int], key: str) -> Optional[str]:
+    return encode_cursor(_version_tag(entry), next_offset, key) if next_offset is not None else None
+
+
+def _dedupe(companies: List[str]) -> List[str]:
+    """去掉空白與重複的公司名稱，保留原順序。"""
+    seen = set()
+    out = []
+    for c in companies:
+        c = (c or "").strip()
+        if c and c not in seen:
+            seen.add(c)
+            out.append(c)
+    return out
+
+
+# ------------------------------------------------------------
+# Tool 1: esg_hr（ESG 人力發展）
+#   來源：t187ap46_O_5.csv
+#   常見欄位（可能因年版不同略有差異）：
+#   - 公司代號, 公司名稱, 申報年度/年度
+#   - 員工薪資中位數/薪資中位數, 員工薪資平均數/薪資平均數
+#   - 女性主管比例/女性主管比, 福利（視資料而定）
+# ------------------------------------------------------------
+@mcp.tool()
+async def esg_hr(
+    company: str,
+    year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
+    """
+    查 ESG 人力發展（薪資/福利/女性主管比等）。資料來自快取的官方 CSV，於工具內 ETL 後回傳。
+    Args:
+      company: 公司名稱（可含股份有限公司等尾綴）
+      year: 指定年度（可省略）
+      limit: 最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      cursor: 上一頁回傳的 next_cursor（翻頁用；省略 = 第一頁；其他參數須與第一頁相同；該版資料已不在時回報 cursor 已過期）
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
+    Returns: dict(items=[...], source_url, fetched_at, meta)
+    """
+    key, version, offset = _cursor_start("esg_hr", cursor, company, year, snapshot, fields, verbosity)
+    entry = await _cursor_entry(ESG_URL, version, snapshot)
+    result, next_offset = _query_esg(
+        entry.data, company, year, limit, entry.data.index.aliases, View(verbosity, fields), offset
+    )
     return {
-        "items": out,
-        "count": len(out),
-        "stats": {"count_by_year": by_year},
+        **result,
+        "next_cursor": _next_cursor(entry, next_offset, key),
+        "source_url": ESG_URL,
+        "fetched_at": _iso_now(),
+        "meta": {
+            "query": company,
+            "year": year,
+            "partial_match": PARTIAL_MATCH,
+            "cache": entry.age_info(DATASET_TTL),
+        },
+    }
+
+
+# ------------------------------------------------------------
+# Tool 2: labor_violations（違反勞基法）
+#   來源：A17000000J-030225-svj
+#   推測欄位：
+#   - 事業單位名稱, 所在縣市, 違反法條, 違反法條內容, 公告日期, 裁處機關, 罰鍰金額
+# ------------------------------------------------------------
+@mcp.tool()
+async def labor_violations(
+    company: str,
+    since_year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
+    """
+    查勞動部違反勞基法紀錄（官方彙總）。
+    Args:
+      company: 事業單位名稱（可用部分關鍵字）
+      since_year: 公告日期的年份 >= since_year 才算
+      limit: 最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      cursor: 上一頁回傳的 next_cursor（翻頁用；省略 = 第一頁；其他參數須與第一頁相同；該版資料已不在時回報 cursor 已過期）
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
+    """
+    key, version, offset = _cursor_start(
+        "labor_violations", cursor, company, since_year, snapshot, fields, verbosity
+    )
+    entry, aliases = await asyncio.gather(_cursor_entry(LAB_VIO_URL, version, snapshot), _aliases())
+    result, next_offset = _query_labor(
+        entry.data, company, since_year, limit, aliases, View(verbosity, fields), offset
+    )
+    return {
+        **result,
+        "next_cursor": _next_cursor(entry, next_offset, key),
         "source_url": LAB_VIO_URL,
         "fetched_at": _iso_now(),
-        "meta": {"query": company, "since_year": since_year, "partial_match": True},
+        "meta": {
+            "query": company,
+            "since_year": since_year,
+            "partial_match": True,
+            "cache": entry.age_info(DATASET_TTL),
+        },
     }
 
 
@@ -307,92 +635,494 @@ def labor_violations(company: str, since_year: Optional[int] = None, limit: int
 #   - 事業單位名稱, 違反法條, 違反法條內容, 公告日期, 裁處機關
 # ------------------------------------------------------------
 @mcp.tool()
-def ge_work_equality_violations(
-    company: str, since_year: Optional[int] = None, limit: int = 50) -> dict:
+async def ge_work_equality_violations(
+    company: str,
+    since_year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
     """
     查性平工作法違規紀錄（官方彙總）。
     Args:
       company: 公司名稱或關鍵字
       since_year: 公告日期包含該年份字串 (ex: 2025)
       limit: 最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      cursor: 上一頁回傳的 next_cursor（翻頁用；省略 = 第一頁；其他參數須與第一頁相同；該版資料已不在時回報 cursor 已過期）
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
     """
-    rows = _fetch_csv_rows(GE_VIO_URL)
-    out: List[Dict[str, str]] = []
-    by_year: Dict[str, int] = {}
+    key, version, offset = _cursor_start(
+        "ge_work_equality_violations", cursor, company, since_year, snapshot, fields, verbosity
+    )
+    entry, aliases = await asyncio.gather(_cursor_entry(GE_VIO_URL, version, snapshot), _aliases())
+    result, next_offset = _query_ge(
+        entry.data, company, since_year, limit, aliases, View(verbosity, fields), offset
+    )
+    return {
+        **result,
+        "next_cursor": _next_cursor(entry, next_offset, key),
+        "source_url": GE_VIO_URL,
+        "fetched_at": _iso_now(),
+        "meta": {
+            "query": company,
+            "since_year": since_year,
+            "partial_match": True,
+            "cache": entry.age_info(DATASET_TTL),
+        },
+    }
 
-    for r in rows:
-        # ⚡ 修正公司欄位
-        comp = _pick(r, "事業單位名稱或負責人", "事業單位名稱", "雇主名稱", "公司名稱", "name")
-        if not comp:
-            continue
 
-        # ⚡ 改用模糊比對
-        if company not in comp:
-            continue
+# ------------------------------------------------------------
+# 批次工具：一次查多家公司（例如比較多個 offer）
+#   每個資料集只取一次快取/索引，所有公司在同一次呼叫內解析完
+# ------------------------------------------------------------
+@mcp.tool()
+async def esg_hr_many(
+    companies: List[str],
+    year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
+    """
+    一次查多家公司的 ESG 人力發展資料（同 esg_hr，逐家回傳）。
+    Args:
+      companies: 公司名稱清單
+      year: 指定年度（可省略）
+      limit: 每家公司最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
+    Returns: dict(results={公司: {items, count}}, source_url, fetched_at, meta)
+    """
+    entry = await dataset_cache.get(ESG_URL, snapshot)
+    view = View(verbosity, fields)
+    names = _dedupe(companies)
+    return {
+        "results": {c: _query_esg(entry.data, c, year, limit, entry.data.index.aliases, view)[0] for c in names},
+        "source_url": ESG_URL,
+        "fetched_at": _iso_now(),
+        "meta": {
+            "queries": names,
+            "year": year,
+            "partial_match": PARTIAL_MATCH,
+            "cache": entry.age_info(DATASET_TTL),
+        },
+    }
 
-        date = _pick(r, "公告日期", "公布日期", "處分日期", "date")
-        y = (date or "")[:4]
 
-        # ⚡ 改為「字串包含」模式
-        if since_year is not None and str(since_year) not in (date or ""):
-            continue
+@mcp.tool()
+async def labor_violations_many(
+    companies: List[str],
+    since_year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
+    """
+    一次查多家公司的違反勞基法紀錄（同 labor_violations，逐家回傳）。
+    Args:
+      companies: 事業單位名稱或關鍵字清單
+      since_year: 公告日期的年份 >= since_year 才算
+      limit: 每家公司最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
+    """
+    entry, aliases = await asyncio.gather(dataset_cache.get(LAB_VIO_URL, snapshot), _aliases())
+    view = View(verbosity, fields)
+    names = _dedupe(companies)
+    return {
+        "results": {c: _query_labor(entry.data, c, since_year, limit, aliases, view)[0] for c in names},
+        "source_url": LAB_VIO_URL,
+        "fetched_at": _iso_now(),
+        "meta": {
+            "queries": names,
+            "since_year": since_year,
+            "partial_match": True,
+            "cache": entry.age_info(DATASET_TTL),
+        },
+    }
 
-        item = {
-            "事業單位名稱": comp,
-            "公告日期": date,
-            "裁處機關": _pick(r, "主管機關", "裁處機關", "機關"),
-            "違反法條": _pick(r, "違法法規法條", "違反法條", "法條"),
-            "違反法條內容": _pick(r, "違反法規內容", "違反法條內容", "違規內容", "事實摘要"),
-            "罰鍰金額": _pick(r, "罰鍰金額", "處分金額", "金額"),
-            "資料列原始": r,
+
+@mcp.tool()
+async def ge_work_equality_violations_many(
+    companies: List[str],
+    since_year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
+    """
+    一次查多家公司的性平工作法違規紀錄（同 ge_work_equality_violations，逐家回傳）。
+    Args:
+      companies: 公司名稱或關鍵字清單
+      since_year: 公告日期包含該年份字串 (ex: 2025)
+      limit: 每家公司最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
+    """
+    entry, aliases = await asyncio.gather(dataset_cache.get(GE_VIO_URL, snapshot), _aliases())
+    view = View(verbosity, fields)
+    names = _dedupe(companies)
+    return {
+        "results": {c: _query_ge(entry.data, c, since_year, limit, aliases, view)[0] for c in names},
+        "source_url": GE_VIO_URL,
+        "fetched_at": _iso_now(),
+        "meta": {
+            "queries": names,
+            "since_year": since_year,
+            "partial_match": True,
+            "cache": entry.age_info(DATASET_TTL),
+        },
+    }
+
+
+@mcp.tool()
+async def batch_company_report(
+    companies: List[str],
+    since_year: Optional[int] = None,
+    limit: int = 20,
+    snapshot: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    verbosity: str = DEFAULT_VERBOSITY,
+) -> dict:
+    """
+    一次查多家公司的 ESG 人力發展 + 違反勞基法 + 違反性平工作法紀錄。
+    適合比較多個工作機會時使用，取代對每家公司分別呼叫三個工具。
+    Args:
+      companies: 公司名稱清單
+      since_year: 違規紀錄的年份過濾，語意同各單一工具：勞基法為公告年份 >= since_year，
+                  性平工作法為公告日期包含該年份（ESG 不受影響，回傳所有年度）
+      limit: 每家公司每個資料集最多回傳筆數
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+      fields: 只回傳這些欄位（萃取欄名或 CSV 原始欄名；"資料列原始" = 整列原始資料）
+      verbosity: compact（預設，省略空值）/ standard / full（附原始資料列）
+    Returns: dict(companies={公司: {esg_hr, labor_violations, ge_work_equality_violations}}, sources, fetched_at, meta)
+    """
+    esg, lab, ge = await asyncio.gather(
+        dataset_cache.get(ESG_URL, snapshot),
+        dataset_cache.get(LAB_VIO_URL, snapshot),
+        dataset_cache.get(GE_VIO_URL, snapshot),
+    )
+    names = _dedupe(companies)
+    aliases = esg.data.index.aliases
+    view = View(verbosity, fields)
+    report = {}
+    for c in names:
+        report[c] = {
+            "esg_hr": _query_esg(esg.data, c, None, limit, aliases, view)[0],
+            "labor_violations": _query_labor(lab.data, c, since_year, limit, aliases, view)[0],
+            "ge_work_equality_violations": _query_ge(ge.data, c, since_year, limit, aliases, view)[0],
         }
-        out.append(item)
 
-        if y:
-            by_year[y] = by_year.get(y, 0) + 1
+    return {
+        "companies": report,
+        "sources": {
+            "esg_hr": ESG_URL,
+            "labor_violations": LAB_VIO_URL,
+            "ge_work_equality_violations": GE_VIO_URL,
+        },
+        "fetched_at": _iso_now(),
+        "meta": {
+            "queries": names,
+            "since_year": since_year,
+            "partial_match": PARTIAL_MATCH,
+            "cache": {
+                "esg_hr": esg.age_info(DATASET_TTL),
+                "labor_violations": lab.age_info(DATASET_TTL),
+                "ge_work_equality_violations": ge.age_info(DATASET_TTL),
+            },
+        },
+    }
+
+# ------------------------------------------------------------
+# 綜合工具：company_profile（公司風險概況）
+#   直接讀資料集載入時預先算好的彙總，不掃描資料列；
+#   取代對同一家公司依序呼叫三個工具再請 LLM 彙整
+# ------------------------------------------------------------
+def _violation_profile(ds: Dataset, company: str, max_names: int, aliases: Optional[AliasTable]) -> dict:
+    name_ids, resolved = _match(ds, company, True, aliases)
+    names = ds.index.names.names
+    return _with_resolved({
+        **merge_violations(ds.aggregates, name_ids).to_dict(),
+        "matched_names": [names[nid] for nid in name_ids[:max_names]],
+        "matched_name_count": len(name_ids),
+    }, resolved)
 
-        if len(out) >= limit:
-            break
+
+@mcp.tool()
+async def company_profile(
+    company: str, max_names: int = 10, snapshot: Optional[str] = None) -> dict:
+    """
+    查一家公司的綜合風險概況（一次涵蓋三個資料集）：
+    - ESG：最新年度員工薪資中位數/平均數、女性主管比例，及同年度（同產業）百分位
+    - 違反勞基法 / 性平工作法：每年件數、罰鍰總額、最常違反的法條、最近公告日期
+    Args:
+      company: 公司名稱或關鍵字
+      max_names: 每個資料集最多列出幾個命中的公司名稱
+      snapshot: 歷史快照版本 id 或日期（YYYY-MM-DD，取當天以前最新一版）；省略 = 最新資料
+    """
+    esg, lab, ge = await asyncio.gather(
+        dataset_cache.get(ESG_URL, snapshot),
+        dataset_cache.get(LAB_VIO_URL, snapshot),
+        dataset_cache.get(GE_VIO_URL, snapshot),
+    )
+    aliases = esg.data.index.aliases
+    esg_ids, esg_resolved = _match(esg.data, company, PARTIAL_MATCH, aliases)
 
     return {
-        "items": out,
-        "count": len(out),
-        "stats": {"count_by_year": by_year},
-        "source_url": GE_VIO_URL,
+        "company": company,
+        "esg_hr": [esg.data.aggregates[nid].to_dict() for nid in esg_ids[:max_names]],
+        "esg_resolved": esg_resolved,
+        "labor_violations": _violation_profile(lab.data, company, max_names, aliases),
+        "ge_work_equality_violations": _violation_profile(ge.data, company, max_names, aliases),
+        "sources": {
+            "esg_hr": ESG_URL,
+            "labor_violations": LAB_VIO_URL,
+            "ge_work_equality_violations": GE_VIO_URL,
+        },
+        "fetched_at": _iso_now(),
+        "meta": {
+            "query": company,
+            "partial_match": PARTIAL_MATCH,
+            "cache": {
+                "esg_hr": esg.age_info(DATASET_TTL),
+                "labor_violations": lab.age_info(DATASET_TTL),
+                "ge_work_equality_violations": ge.age_info(DATASET_TTL),
+            },
+        },
+    }
+
+# ------------------------------------------------------------
+# 名稱解析工具：resolve_company
+#   使用者給的是股票代號、英文名、錯字或簡體字時，先確認指的是哪家公司
+# ------------------------------------------------------------
+@mcp.tool()
+async def resolve_company(company: str, limit: int = 10) -> dict:
+    """
+    將公司代號 / 英文名 / 簡稱 / 可能有錯字的名稱，解析成各資料集中實際的公司名稱候選（依分數排序）。
+    Args:
+      company: 公司代號（如 2330）、中英文名稱或關鍵字
+      limit: 每個資料集最多回傳幾個候選
+    Returns: dict(code, aliases, candidates={資料集: [{name, score, match, distance, via}]}, meta)
+    """
+    esg, lab, ge = await asyncio.gather(
+        dataset_cache.get(ESG_URL),
+        dataset_cache.get(LAB_VIO_URL),
+        dataset_cache.get(GE_VIO_URL),
+    )
+    aliases = esg.data.index.aliases
+    code = aliases.code_of(company) if aliases is not None else None
+    return {
+        "company": company,
+        "code": code,
+        "aliases": aliases.names_of(code) if aliases is not None else [],
+        "candidates": {
+            key: [c.to_dict() for c in resolve(entry.data.index, company, aliases, limit=limit)]
+            for key, entry in (("esg_hr", esg), ("labor_violations", lab), ("ge_work_equality_violations", ge))
+        },
         "fetched_at": _iso_now(),
-        "meta": {"query": company, "since_year": since_year, "partial_match": True},
+        "meta": {
+            "query": company,
+            "min_score": RESOLVE_MIN_SCORE,
+            "cache": {
+                "esg_hr": esg.age_info(DATASET_TTL),
+                "labor_violations": lab.age_info(DATASET_TTL),
+                "ge_work_equality_violations": ge.age_info(DATASET_TTL),
+            },
+        },
     }
 
+# ------------------------------------------------------------
+# 後端輔助工具：query_context
+#   給 /query 的回應快取用：問題提到哪些公司 + 目前資料版本（_version_tag），
+#   兩者相同的問題才可能共用同一個答案；資料版本變了快取就失效
+# ------------------------------------------------------------
+@mcp.tool()
+async def query_context(text: str) -> dict:
+    """
+    從一段使用者問題中找出提到的公司（以公司代號統一不同寫法），並回傳三個資料集目前的快照版本。
+    Args:
+      text: 使用者的原始問題
+    Returns: dict(entities=[...], companies=[...], snapshots={資料集: 版本})
+    """
+    esg, lab, ge = await asyncio.gather(
+        dataset_cache.get(ESG_URL),
+        dataset_cache.get(LAB_VIO_URL),
+        dataset_cache.get(GE_VIO_URL),
+    )
+    aliases = esg.data.index.aliases
+    companies = set()
+    for entry in (esg, lab, ge):
+        index = entry.data.index
+        companies.update(index.names.names[nid] for nid in find_companies(index, text))
+    codes = find_codes(aliases, text)
+    companies.update(n for code in codes for n in aliases.names_of(code))
+
+    entities = {(aliases.code_of(n) if aliases is not None else None) or n for n in companies}
+    return {
+        "entities": sorted(entities | set(codes)),
+        "companies": sorted(companies),
+        "snapshots": {
+            "esg_hr": _version_tag(esg),
+            "labor_violations": _version_tag(lab),
+            "ge_work_equality_violations": _version_tag(ge),
+        },
+    }
+
+
+# ------------------------------------------------------------
+# 後端輔助工具：prefetch_datasets
+#   後端啟動暖機時呼叫：三個資料集一次下載 / 載入並建好索引與彙總，
+#   第一個使用者查詢不必再等
+# ------------------------------------------------------------
+@mcp.tool()
+async def prefetch_datasets() -> dict:
+    """
+    （後端暖機用）平行載入三個資料集（快照或下載）並建立索引與彙總。
+    Returns: dict(datasets={資料集: {rows, version, cache} 或 {error}}, elapsed)
+    """
+    start = time.time()
+    keys = ("esg_hr", "labor_violations", "ge_work_equality_violations")
+    entries = await asyncio.gather(
+        dataset_cache.get(ESG_URL),
+        dataset_cache.get(LAB_VIO_URL),
+        dataset_cache.get(GE_VIO_URL),
+        return_exceptions=True,
+    )
+    datasets = {}
+    for key, entry in zip(keys, entries):
+        if isinstance(entry, BaseException):
+            datasets[key] = {"error": str(entry)}
+        else:
+            datasets[key] = {
+                "rows": len(entry.data.table),
+                "version": _version_tag(entry),
+                "cache": entry.age_info(DATASET_TTL),
+            }
+    return {"datasets": datasets, "elapsed": round(time.time() - start, 3)}
+
+
+# ------------------------------------------------------------
+# 快照工具：list_snapshots
+#   列出磁碟上保存的歷史版本，供其他工具的 snapshot= 參數使用
+# ------------------------------------------------------------
+@mcp.tool()
+async def list_snapshots() -> dict:
+    """
+    列出三個資料集保存的離線快照版本（由舊到新，版本 id = 抓取時間 UTC + 內容雜湊）。
+    其他工具的 snapshot= 可帶版本 id 或日期（YYYY-MM-DD）查詢歷史資料。
+    """
+    sources = (
+        ("esg_hr", ESG_URL),
+        ("labor_violations", LAB_VIO_URL),
+        ("ge_work_equality_violations", GE_VIO_URL),
+    )
+    versions = await asyncio.gather(*(asyncio.to_thread(dataset_cache.snapshots, url) for _, url in sources))
+    return {
+        "snapshots": {key: v for (key, _), v in zip(sources, versions)},
+        "keep": SNAPSHOT_KEEP,
+        "fetched_at": _iso_now(),
+    }
+
+# ------------------------------------------------------------
+# 共用模式：streamable HTTP + 多個 worker 行程
+#   python server.py --transport http --http 0.0.0.0:7332 --workers 4
+#   一台主機只跑一個 server，多個後端以 JOB_GUARDIAN_MCP_URL=http://host:7332/mcp 連線：
+#   - 主行程先把三個資料集下載成磁碟快照（CACHE_DIR），worker 啟動後直接 mmap，同一份快照共用 page cache
+#   - stateless：請求不綁定 session，任一 worker 都能處理同一個 client 的下一個請求
+#   - TTL 到期時只有拿到刷新鎖的 worker 下載，其餘 worker 採用它寫好的新快照
+# ------------------------------------------------------------
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+
+
+def http_app():
+    """共用模式的 ASGI app（uvicorn factory；每個 worker 各建一次）。"""
+    mcp.settings.stateless_http = True
+    mcp.settings.json_response = True
+    app = mcp.streamable_http_app()
+    serve = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with serve(app) as state:
+            # worker 一啟動就 mmap 快照並建索引，第一個請求不用等
+            warmup = asyncio.create_task(prefetch_datasets())
+            yield state
+            warmup.cancel()
+            await http_pool.aclose()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+async def _prime_snapshots() -> None:
+    urls = (ESG_URL, LAB_VIO_URL, GE_VIO_URL)
+    try:
+        results = await asyncio.gather(*(dataset_cache.prime(url) for url in urls), return_exceptions=True)
+    finally:
+        await http_pool.aclose()
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            print(f"[WARN] 預先建立快照失敗 {url}: {result}", file=sys.stderr)
+        else:
+            print(f"Snapshot ready: {url} @ {result}", file=sys.stderr)
+
+
+def serve_shared(host: str, port: int, workers: int) -> None:
+    import uvicorn
+
+    if CACHE_DIR:
+        asyncio.run(_prime_snapshots())
+    elif workers > 1:
+        print("[WARN] 未設定 CACHE_DIR：各 worker 會各自下載資料集，無法共用快照", file=sys.stderr)
+    print(f"Running on streamable HTTP at http://{host}:{port}{mcp.settings.streamable_http_path} "
+          f"({workers} workers)", file=sys.stderr)
+    uvicorn.run(
+        "server:http_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        log_level="warning",
+    )
+
+
 # ------------------------------------------------------------
 # Server Entrypoint
 # ------------------------------------------------------------
 if __name__ == "__main__":
-    import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--http", type=str, default=None,
                         help="Run HTTP/SSE. Example: 127.0.0.1:7332")
     parser.add_argument("--transport", type=str, default=None,
                         choices=["stdio", "http", "sse"],
                         help="Override transport explicitly")
+    parser.add_argument("--workers", type=int, default=MCP_WORKERS,
+                        help="Worker processes for the http transport")
     args = parser.parse_args()
 
-    # 優先用 --transport；其次，如果有 --http，就用 http
-    if args.transport:
-        if args.transport == "stdio":
-            # STDIO 不需要 host/port
-            print("Running on STDIO")
-            mcp.run(transport="stdio")
-
-        elif args.transport in ("http", "sse"):
-            host, port = (args.http or "127.0.0.1:7332").split(":")
-            print(f"Running on {args.transport} at http://{host}:{port}")
-            mcp.run(transport=args.transport, host=host, port=int(port))
-
-    elif args.http:
-        host, port = args.http.split(":")
-        print(f"Running on HTTP at http://{host}:{port}")
-        mcp.run(transport="http", host=host, port=int(port))
-    else:
-        # 預設走 STDIO
-        print("Running on STDIO")
+    # 優先用 --transport；其次，如果有 --http，就用 http；預設走 STDIO
+    # 啟動訊息一律寫到 stderr：STDIO 模式下 stdout 是 MCP 協定通道
+    transport = args.transport or ("http" if args.http else "stdio")
+    if transport == "stdio":
+        print("Running on STDIO", file=sys.stderr)
         mcp.run()  # 等同 mcp.run(transport="stdio")
+    else:
+        host, port = (args.http or "127.0.0.1:7332").rsplit(":", 1)
+        if transport == "sse":
+            mcp.settings.host, mcp.settings.port = host, int(port)
+            print(f"Running on sse at http://{host}:{port}", file=sys.stderr)
+            mcp.run(transport="sse")
+        else:
+            serve_shared(host, int(port), max(1, args.workers))
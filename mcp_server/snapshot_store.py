@@ -0,0 +1,283 @@
+# job-guardian/mcp_server/snapshot_store.py
+# 離線快照庫：每次成功抓到的資料集都存成一個版本化的二進位檔，啟動時直接 mmap 載入。
+# - 版本 id = 抓取時間（UTC）+ 內容雜湊前綴；內容沒變時不另存新版
+# - 檔案格式：magic + JSON 標頭 + 各欄字典值（JSON）/ 代碼陣列 / 整數欄，區段 8 bytes 對齊，
+#   代碼與整數欄以 memoryview 直接指向 mmap，不複製
+# - 每個資料集另有 state.json 記錄最新版本與 ETag / Last-Modified / 驗證時間（304 時只更新這個檔）
+# - 來源網站掛掉時仍可由最新快照冷啟動；保留最近 keep 個版本供 snapshot= 歷史查詢
+# - 多個行程共用同一個目錄時（共用模式的 worker），以 refresh_lock 確保同一資料集同時只有一個行程下載
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows：沒有 flock，不做跨行程互斥
+    fcntl = None
+
+from columnar import Column, ColumnarTable, IntParser, int_column
+
+MAGIC = b"JGSNAP01"
+_ALIGN = 8
+_STATE_FILE = "state.json"
+_LOCK_FILE = "refresh.lock"
+_SUFFIX = ".snap"
+_VERSION_PAT = re.compile(r"^\d{8}T\d{6}Z-[0-9a-f]{8}$")
+
+
+@dataclass
+class SnapshotState:
+    """某資料集最新一版快照的指標與 HTTP 驗證資訊。"""
+
+    version: str
+    sha1: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+def _code_type(n_values: int) -> str:
+    """依字典大小選最小的代碼寬度。"""
+    if n_values <= 1 << 8:
+        return "B"
+    if n_values <= 1 << 16:
+        return "H"
+    return "I"
+
+
+def _typecode(buf) -> str:
+    # array 有 typecode；由快照載入的 memoryview 只有 format
+    return getattr(buf, "typecode", None) or buf.format
+
+
+def _encode(table: ColumnarTable) -> Tuple[dict, List[bytes]]:
+    """ColumnarTable → (標頭, 各區段 bytes)；區段位移相對於資料起點，且 8 bytes 對齊。"""
+    chunks: List[bytes] = []
+    offset = 0
+
+    def add(buf: bytes) -> List[int]:
+        nonlocal offset
+        pad = (-offset) % _ALIGN
+        if pad:
+            chunks.append(b"\0" * pad)
+            offset += pad
+        chunks.append(buf)
+        start = offset
+        offset += len(buf)
+        return [start, len(buf)]
+
+    columns = {}
+    for h, col in table.columns.items():
+        t = _code_type(len(col.values))
+        codes = col.codes if _typecode(col.codes) == t else array(t, col.codes)
+        columns[h] = {
+            "values": add(json.dumps(col.values, ensure_ascii=False).encode("utf-8")),
+            "codes": add(bytes(codes)),
+            "type": t,
+        }
+    ints = {h: add(bytes(a)) for h, a in table.ints.items()}
+    header = {
+        "format": 1,
+        "byteorder": sys.byteorder,
+        "headers": table.headers,
+        "n_rows": table.n_rows,
+        "columns": columns,
+        "ints": ints,
+    }
+    return header, chunks
+
+
+def _sha1(header: dict, chunks: List[bytes]) -> str:
+    digest = hashlib.sha1()
+    digest.update(json.dumps(header, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    for c in chunks:
+        digest.update(c)
+    return digest.hexdigest()
+
+
+def table_digest(table: ColumnarTable) -> str:
+    """資料表內容的雜湊（同快照版本 id 的雜湊）；同一份內容在任何行程都得到同一個值。"""
+    return _sha1(*_encode(table))
+
+
+class SnapshotStore:
+    """
+    root/<url 雜湊>/<版本>.snap + state.json。
+    寫入一律先寫 .tmp 再 os.replace，讀取端不會看到寫一半的檔案。
+    """
+
+    def __init__(self, root: str, keep: int = 10):
+        self.root = root
+        self.keep = max(1, keep)
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- 版本查詢 ----------
+    def _dir(self, url: str) -> str:
+        return os.path.join(self.root, hashlib.sha1(url.encode("utf-8")).hexdigest()[:16])
+
+    def _path(self, url: str, version: str) -> str:
+        return os.path.join(self._dir(url), version + _SUFFIX)
+
+    def versions(self, url: str) -> List[str]:
+        """由舊到新的版本 id。"""
+        d = self._dir(url)
+        if not os.path.isdir(d):
+            return []
+        out = [f[: -len(_SUFFIX)] for f in os.listdir(d) if f.endswith(_SUFFIX)]
+        return sorted(v for v in out if _VERSION_PAT.match(v))
+
+    def state(self, url: str) -> Optional[SnapshotState]:
+        path = os.path.join(self._dir(url), _STATE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return SnapshotState(**json.load(f))
+
+    def resolve(self, url: str, spec: str) -> Optional[str]:
+        """
+        spec 可為完整版本 id、版本 id 前綴，或日期（2025-09-01 / 20250901）；
+        日期時回傳當天（含）以前最新的一版。
+        """
+        versions = self.versions(url)
+        spec = (spec or "").strip()
+        if spec in versions:
+            return spec
+        prefixed = [v for v in versions if v.startswith(spec)]
+        if spec and prefixed:
+            return prefixed[-1]
+        day = re.sub(r"\D", "", spec)[:8]
+        if len(day) != 8:
+            return None
+        earlier = [v for v in versions if v[:8] <= day]
+        return earlier[-1] if earlier else None
+
+    @contextmanager
+    def refresh_lock(self, url: str) -> Iterator[bool]:
+        """
+        跨行程的刷新鎖（不等待）：yield True 表示取得鎖，False 表示另一個行程正在刷新同一資料集。
+        同一行程內的併發刷新由 DatasetCache 的 SingleFlight 合併，不經過這裡。
+        """
+        if fcntl is None:
+            yield True
+            return
+        os.makedirs(self._dir(url), exist_ok=True)
+        with open(os.path.join(self._dir(url), _LOCK_FILE), "a+b") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # ---------- 讀取 ----------
+    def load(self, url: str, version: str, parsers: Optional[Dict[str, IntParser]] = None) -> Tuple[ColumnarTable, dict]:
+        """mmap 一個版本的快照；回傳 (資料表, 標頭)。代碼與整數欄直接引用 mmap。"""
+        parsers = parsers or {}
+        with open(self._path(url, version), "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"不是有效的快照檔: {version}")
+        pos = len(MAGIC)
+        header_len = int.from_bytes(mm[pos : pos + 4], "little")
+        pos += 4
+        header = json.loads(mm[pos : pos + header_len].decode("utf-8"))
+        base = pos + header_len
+        base += (-base) % _ALIGN
+
+        view = memoryview(mm)
+        native = header.get("byteorder") == sys.byteorder
+
+        def section(span: List[int], typecode: str):
+            start, length = span
+            buf = view[base + start : base + start + length]
+            if native:
+                return buf.cast(typecode)
+            # 不同 byte order 的機器寫出的快照：複製一份再轉換
+            arr = array(typecode)
+            arr.frombytes(buf)
+            arr.byteswap()
+            return arr
+
+        columns: Dict[str, Column] = {}
+        for h, spec in header["columns"].items():
+            start, length = spec["values"]
+            values = json.loads(bytes(view[base + start : base + start + length]).decode("utf-8"))
+            columns[h] = Column([sys.intern(v) for v in values], section(spec["codes"], spec["type"]))
+
+        ints = {h: section(span, "q") for h, span in header["ints"].items() if h in parsers and h in columns}
+        for h, parser in parsers.items():
+            if h in columns and h not in ints:
+                ints[h] = int_column(columns[h], parser)
+        return ColumnarTable(list(header["headers"]), columns, ints, int(header["n_rows"])), header
+
+    # ---------- 寫入 ----------
+    def save(
+        self,
+        url: str,
+        table: ColumnarTable,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> str:
+        """存一版快照並回傳版本 id；內容與最新一版相同時只更新 state。"""
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        header, chunks = _encode(table)
+        sha1 = _sha1(header, chunks)
+
+        current = self.state(url)
+        if current is not None and current.sha1 == sha1 and os.path.exists(self._path(url, current.version)):
+            self._write_state(url, SnapshotState(current.version, sha1, etag, last_modified, fetched_at))
+            return current.version
+
+        version = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(fetched_at)) + "-" + sha1[:8]
+        header.update(url=url, version=version, etag=etag, last_modified=last_modified, fetched_at=fetched_at)
+        raw_header = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        head = MAGIC + len(raw_header).to_bytes(4, "little") + raw_header
+        head += b"\0" * ((-len(head)) % _ALIGN)
+
+        os.makedirs(self._dir(url), exist_ok=True)
+        path = self._path(url, version)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(head)
+            for c in chunks:
+                f.write(c)
+        os.replace(tmp, path)
+        self._write_state(url, SnapshotState(version, sha1, etag, last_modified, fetched_at))
+        self._prune(url)
+        return version
+
+    def touch(self, url: str, etag: Optional[str], last_modified: Optional[str], fetched_at: float) -> None:
+        """304：內容沒變，只更新最新一版的驗證資訊。"""
+        current = self.state(url)
+        if current is not None:
+            self._write_state(url, SnapshotState(current.version, current.sha1, etag, last_modified, fetched_at))
+
+    def _write_state(self, url: str, state: SnapshotState) -> None:
+        path = os.path.join(self._dir(url), _STATE_FILE)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(state), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _prune(self, url: str) -> None:
+        for version in self.versions(url)[: -self.keep]:
+            try:
+                os.remove(self._path(url, version))
+            except OSError:
+                # Windows 上仍被 mmap 的檔案無法刪除，下次再清
+                pass
@@ -58,6 +58,21 @@ logger = get_logger(__name__)
 
 HUMAN_INPUT_TOOL_NAME = "__human_input__"
 
+# Maximum number of memoized list_tools views (distinct server_name/tool_filter combinations)
+TOOL_VIEW_CACHE_SIZE = 64
+
+
+def _freeze_tool_filter(
+    tool_filter: Dict[str, Set[str]] | None,
+) -> frozenset | None:
+    """Hashable form of a tool_filter, used as a list_tools cache key."""
+    if tool_filter is None:
+        return None
+    return frozenset(
+        (server_name, frozenset(tool_names))
+        for server_name, tool_names in tool_filter.items()
+    )
+
 
 class Agent(BaseModel):
     """
@@ -143,6 +158,12 @@ class Agent(BaseModel):
         default_factory=dict
     )
 
+    # Memoized list_tools results,
+    # maps (server_name, frozen tool_filter, has human input) -> (tools, filtered_out_tools)
+    _tool_views: Dict[tuple, tuple[List[Tool], List[tuple[str, str]]]] = PrivateAttr(
+        default_factory=dict
+    )
+
     _agent_tasks: "AgentTasks" = PrivateAttr(default=None)
     _init_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
 
@@ -329,6 +350,8 @@ class Agent(BaseModel):
                 self._server_to_resource_map.clear()
                 self._server_to_resource_map.update(result.server_to_resource_map)
 
+                self._tool_views.clear()
+
                 self.initialized = result.initialized
                 span.add_event("initialize_complete")
                 logger.debug(f"Agent {self.name} initialized.")
@@ -517,126 +540,26 @@ class Agent(BaseModel):
             span.set_attribute(
                 "human_input_callback", self.human_input_callback is not None
             )
-
-            # Track filtered tools for debugging and telemetry
-            filtered_out_tools = []  # List of (tool_name, reason) tuples
-
             if server_name:
                 span.set_attribute("server_name", server_name)
-                # Get tools for specific server
-                server_tools = self._server_to_tool_map.get(server_name, [])
-
-                # Check if we should apply filtering for this specific server
-                if tool_filter is not None and server_name in tool_filter:
-                    # Server is explicitly in filter dict - apply its filter rules
-                    # If tool_filter[server_name] is empty set, no tools will pass
-                    # If tool_filter[server_name] has tools, only those will pass
-                    allowed_tools = tool_filter[server_name]
-                    result_tools = []
-                    for namespaced_tool in server_tools:
-                        if namespaced_tool.tool.name in allowed_tools:
-                            result_tools.append(
-                                namespaced_tool.tool.model_copy(
-                                    update={
-                                        "name": namespaced_tool.namespaced_tool_name
-                                    }
-                                )
-                            )
-                        else:
-                            filtered_out_tools.append(
-                                (
-                                    namespaced_tool.namespaced_tool_name,
-                                    f"Not in tool_filter[{server_name}]",
-                                )
-                            )
-                    result = ListToolsResult(tools=result_tools)
-                else:
-                    # Either no filter at all (tool_filter is None) or
-                    # this server is not in the filter dict (no filtering for this server)
-                    # Include all tools from this server
-                    result = ListToolsResult(
-                        tools=[
-                            namespaced_tool.tool.model_copy(
-                                update={"name": namespaced_tool.namespaced_tool_name}
-                            )
-                            for namespaced_tool in server_tools
-                        ]
-                    )
-            else:
-                # No specific server requested - get tools from all servers
-                if tool_filter is not None:
-                    # Filter is active - check each tool's server against filter rules
-                    filtered_tools = []
-                    for (
-                        namespaced_tool_name,
-                        namespaced_tool,
-                    ) in self._namespaced_tool_map.items():
-                        should_include = False
-
-                        # Priority 1: Check if tool's server has explicit filter rules
-                        if namespaced_tool.server_name in tool_filter:
-                            # Server has explicit filter - tool must be in the allowed set
-                            if (
-                                namespaced_tool.tool.name
-                                in tool_filter[namespaced_tool.server_name]
-                            ):
-                                should_include = True
-                            else:
-                                filtered_out_tools.append(
-                                    (
-                                        namespaced_tool_name,
-                                        f"Not in tool_filter[{namespaced_tool.server_name}]",
-                                    )
-                                )
-                        # Priority 2: If no server-specific filter, check wildcard
-                        elif "*" in tool_filter:
-                            # Wildcard filter applies to servers without explicit filters
-                            if namespaced_tool.tool.name in tool_filter["*"]:
-                                should_include = True
-                            else:
-                                filtered_out_tools.append(
-                                    (namespaced_tool_name, "Not in tool_filter[*]")
-                                )
-                        else:
-                            # No explicit filter for this server and no wildcard
-                            # Default behavior: include the tool (no filtering)
-                            should_include = True
-
-                        if should_include:
-                            filtered_tools.append(
-                                namespaced_tool.tool.model_copy(
-                                    update={"name": namespaced_tool_name}
-                                )
-                            )
-                    result = ListToolsResult(tools=filtered_tools)
-                else:
-                    # No filter at all - include everything
-                    result = ListToolsResult(
-                        tools=[
-                            namespaced_tool.tool.model_copy(
-                                update={"name": namespaced_tool_name}
-                            )
-                            for namespaced_tool_name, namespaced_tool in self._namespaced_tool_map.items()
-                        ]
-                    )
-
-            # Add function tools (non-namespaced) with filtering
-            # These use the special "non_namespaced_tools" key in tool_filter
-            for tool in self._function_tool_map.values():
-                should_include, filter_reason = (
-                    self._should_include_non_namespaced_tool(tool.name, tool_filter)
-                )
 
-                if should_include:
-                    result.tools.append(
-                        Tool(
-                            name=tool.name,
-                            description=tool.description,
-                            inputSchema=tool.parameters,
-                        )
-                    )
-                elif filter_reason:
-                    filtered_out_tools.append((tool.name, filter_reason))
+            # The filtered tool list only changes when the agent's tools do, so reuse it
+            view_key = (
+                server_name,
+                _freeze_tool_filter(tool_filter),
+                self.human_input_callback is not None,
+            )
+            view = self._tool_views.get(view_key)
+            if view is None:
+                view = self._build_tool_view(server_name, tool_filter)
+                if len(self._tool_views) >= TOOL_VIEW_CACHE_SIZE:
+                    self._tool_views.clear()
+                self._tool_views[view_key] = view
+
+            tools, filtered_out_tools = view
+            # The Tool objects are shared; only the list is copied, so callers may still add
+            # or remove tools from the result
+            result = ListToolsResult.model_construct(tools=list(tools))
 
             def _annotate_span_for_tools_result(result: ListToolsResult):
                 if not self.context.tracing_enabled:
@@ -662,31 +585,6 @@ class Agent(BaseModel):
                                     f"tool.{tool.name}.annotations.{attr}", value
                                 )
 
-            # Add human_input_callback tool (non-namespaced) with filtering
-            # This uses the special "non_namespaced_tools" key in tool_filter
-            if self.human_input_callback:
-                should_include, filter_reason = (
-                    self._should_include_non_namespaced_tool(
-                        HUMAN_INPUT_TOOL_NAME, tool_filter
-                    )
-                )
-
-                if should_include:
-                    human_input_tool: FastTool = FastTool.from_function(
-                        self.request_human_input
-                    )
-                    result.tools.append(
-                        Tool(
-                            name=HUMAN_INPUT_TOOL_NAME,
-                            description=human_input_tool.description,
-                            inputSchema=human_input_tool.parameters,
-                        )
-                    )
-                elif filter_reason:
-                    filtered_out_tools.append((HUMAN_INPUT_TOOL_NAME, filter_reason))
-            else:
-                logger.debug("Human input callback not set")
-
             # Log and track filtering metrics if filter was applied
             if tool_filter is not None:
                 span.set_attribute("tool_filter_applied", True)
@@ -722,6 +620,141 @@ class Agent(BaseModel):
 
             return result
 
+    def _build_tool_view(
+        self,
+        server_name: str | None,
+        tool_filter: Dict[str, Set[str]] | None,
+    ) -> tuple[List[Tool], List[tuple[str, str]]]:
+        """
+        Compute the tools list_tools returns for a server name and tool filter.
+
+        Returns:
+            (tools, filtered_out_tools), where filtered_out_tools is a list of
+            (tool_name, reason) tuples for debugging and telemetry
+        """
+        # Track filtered tools for debugging and telemetry
+        filtered_out_tools = []  # List of (tool_name, reason) tuples
+
+        if server_name:
+            # Get tools for specific server
+            server_tools = self._server_to_tool_map.get(server_name, [])
+
+            # Check if we should apply filtering for this specific server
+            if tool_filter is not None and server_name in tool_filter:
+                # Server is explicitly in filter dict - apply its filter rules
+                # If tool_filter[server_name] is empty set, no tools will pass
+                # If tool_filter[server_name] has tools, only those will pass
+                allowed_tools = tool_filter[server_name]
+                tools = []
+                for namespaced_tool in server_tools:
+                    if namespaced_tool.tool.name in allowed_tools:
+                        tools.append(namespaced_tool.namespaced_tool)
+                    else:
+                        filtered_out_tools.append(
+                            (
+                                namespaced_tool.namespaced_tool_name,
+                                f"Not in tool_filter[{server_name}]",
+                            )
+                        )
+            else:
+                # Either no filter at all (tool_filter is None) or
+                # this server is not in the filter dict (no filtering for this server)
+                # Include all tools from this server
+                tools = [
+                    namespaced_tool.namespaced_tool for namespaced_tool in server_tools
+                ]
+        else:
+            # No specific server requested - get tools from all servers
+            if tool_filter is not None:
+                # Filter is active - check each tool's server against filter rules
+                tools = []
+                for (
+                    namespaced_tool_name,
+                    namespaced_tool,
+                ) in self._namespaced_tool_map.items():
+                    should_include = False
+
+                    # Priority 1: Check if tool's server has explicit filter rules
+                    if namespaced_tool.server_name in tool_filter:
+                        # Server has explicit filter - tool must be in the allowed set
+                        if (
+                            namespaced_tool.tool.name
+                            in tool_filter[namespaced_tool.server_name]
+                        ):
+                            should_include = True
+                        else:
+                            filtered_out_tools.append(
+                                (
+                                    namespaced_tool_name,
+                                    f"Not in tool_filter[{namespaced_tool.server_name}]",
+                                )
+                            )
+                    # Priority 2: If no server-specific filter, check wildcard
+                    elif "*" in tool_filter:
+                        # Wildcard filter applies to servers without explicit filters
+                        if namespaced_tool.tool.name in tool_filter["*"]:
+                            should_include = True
+                        else:
+                            filtered_out_tools.append(
+                                (namespaced_tool_name, "Not in tool_filter[*]")
+                            )
+                    else:
+                        # No explicit filter for this server and no wildcard
+                        # Default behavior: include the tool (no filtering)
+                        should_include = True
+
+                    if should_include:
+                        tools.append(namespaced_tool.namespaced_tool)
+            else:
+                # No filter at all - include everything
+                tools = [
+                    namespaced_tool.namespaced_tool
+                    for namespaced_tool in self._namespaced_tool_map.values()
+                ]
+
+        # Add function tools (non-namespaced) with filtering
+        # These use the special "non_namespaced_tools" key in tool_filter
+        for tool in self._function_tool_map.values():
+            should_include, filter_reason = self._should_include_non_namespaced_tool(
+                tool.name, tool_filter
+            )
+
+            if should_include:
+                tools.append(
+                    Tool(
+                        name=tool.name,
+                        description=tool.description,
+                        inputSchema=tool.parameters,
+                    )
+                )
+            elif filter_reason:
+                filtered_out_tools.append((tool.name, filter_reason))
+
+        # Add human_input_callback tool (non-namespaced) with filtering
+        # This uses the special "non_namespaced_tools" key in tool_filter
+        if self.human_input_callback:
+            should_include, filter_reason = self._should_include_non_namespaced_tool(
+                HUMAN_INPUT_TOOL_NAME, tool_filter
+            )
+
+            if should_include:
+                human_input_tool: FastTool = FastTool.from_function(
+                    self.request_human_input
+                )
+                tools.append(
+                    Tool(
+                        name=HUMAN_INPUT_TOOL_NAME,
+                        description=human_input_tool.description,
+                        inputSchema=human_input_tool.parameters,
+                    )
+                )
+            elif filter_reason:
+                filtered_out_tools.append((HUMAN_INPUT_TOOL_NAME, filter_reason))
+        else:
+            logger.debug("Human input callback not set")
+
+        return tools, filtered_out_tools
+
     async def list_resources(
         self, server_name: str | None = None
     ) -> ListResourcesResult:
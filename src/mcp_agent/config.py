@@ -110,6 +110,20 @@ class MCPServerSettings(BaseModel):
     """Set of tool names to allow from this server. If specified, only these tools will be exposed to agents. 
     Tool names should match exactly. [WARNING] Empty list will result LLM have no access to tools."""
 
+    pool_min_size: int = 1
+    """
+    Minimum number of pooled connections kept open to this server. Only applies when
+    pool_max_size is greater than 1; the extra connections are started by the first
+    lease() on the server (the first pooled tool call), not when get_server first connects.
+    """
+
+    pool_max_size: int = 1
+    """
+    Maximum number of pooled connections (stdio processes or HTTP sessions) to this server.
+    When greater than 1, concurrent tool calls are dispatched to the connection with the
+    fewest outstanding requests, and the pool grows on demand up to this size.
+    """
+
     model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True)
 
 
@@ -117,6 +131,16 @@ class MCPSettings(BaseModel):
     """Configuration for all MCP servers."""
 
     servers: Dict[str, MCPServerSettings] = Field(default_factory=dict)
+
+    capability_cache: bool = True
+    """
+    Cache the tools, prompts and resources each server advertises, shared by all agents in the app.
+    Entries are invalidated when the server config or reported version changes, or on list_changed notifications.
+    """
+
+    capability_cache_path: str | None = None
+    """Optional JSON file to persist the capability cache to, so restarts can skip listing capabilities."""
+
     model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True)
 
     @field_validator("servers", mode="before")
@@ -341,6 +365,14 @@ class GoogleSettings(BaseSettings, VertexAIMixin):
         ),
     )
 
+    base_url: str | None = Field(
+        default=None,
+        validation_alias=AliasChoices(
+            "base_url", "GOOGLE_GEMINI_BASE_URL", "google__base_url"
+        ),
+    )
+    """Override the Gemini API endpoint (e.g. a local stand-in for benchmarks)"""
+
     model_config = SettingsConfigDict(
         env_prefix="GOOGLE_",
         extra="allow",
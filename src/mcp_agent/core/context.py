@@ -28,6 +28,7 @@ from mcp_agent.executor.task_registry import ActivityRegistry
 from mcp_agent.logging.events import EventFilter
 from mcp_agent.logging.logger import LoggingConfig
 from mcp_agent.logging.transport import create_transport
+from mcp_agent.mcp.capability_cache import CapabilityCache
 from mcp_agent.mcp.mcp_server_registry import ServerRegistry
 from mcp_agent.tracing.tracer import TracingConfig
 from mcp_agent.workflows.llm.llm_selector import ModelSelector
@@ -80,6 +81,9 @@ class Context(BaseModel):
     decorator_registry: Optional[DecoratorRegistry] = None
     workflow_registry: Optional["WorkflowRegistry"] = None
 
+    # Server capabilities (tools/prompts/resources) shared across aggregators
+    capability_cache: Optional[CapabilityCache] = None
+
     tracer: Optional[trace.Tracer] = None
     # Use this flag to conditionally serialize expensive data for tracing
     tracing_enabled: bool = False
@@ -151,6 +155,18 @@ async def configure_usage_telemetry(_config: "Settings"):
     pass
 
 
+def configure_capability_cache(config: "Settings") -> CapabilityCache:
+    """
+    Configure the server capability cache based on the application config.
+    """
+    if config.mcp is None:
+        return CapabilityCache()
+    # Created even when caching is disabled, since it also relays list_changed notifications
+    return CapabilityCache(
+        path=config.mcp.capability_cache_path, enabled=config.mcp.capability_cache
+    )
+
+
 async def configure_executor(config: "Settings"):
     """
     Configure the executor based on the application config.
@@ -202,6 +218,7 @@ async def initialize_context(
     context = Context()
     context.config = config
     context.server_registry = ServerRegistry(config=config)
+    context.capability_cache = configure_capability_cache(config)
 
     # Configure the executor
     context.executor = await configure_executor(config)
@@ -0,0 +1,245 @@
+"""
+A cache of the tools, prompts and resources advertised by each MCP server.
+
+The cache lives on the Context so it is shared by every MCPAggregator (and therefore every
+Agent) in the application, and can optionally be persisted to a JSON file so that a
+restarted process does not have to list capabilities again.
+
+Entries are keyed by a fingerprint of the server's launch configuration (including the
+size and modification time of local files a stdio server is started from) and validated
+against the version the server reports in its initialize result. They are dropped when the
+server sends a tools/prompts/resources list_changed notification.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from mcp.types import Prompt, Resource, ServerCapabilities, Tool
+
+from mcp_agent.config import MCPServerSettings
+from mcp_agent.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Notifications that mean a server's advertised capabilities have changed
+LIST_CHANGED_NOTIFICATIONS = frozenset(
+    {
+        "notifications/tools/list_changed",
+        "notifications/prompts/list_changed",
+        "notifications/resources/list_changed",
+    }
+)
+
+# Server settings that determine which server process/endpoint we talk to (and hence what
+# it advertises). Client-side settings such as allowed_tools, timeouts and pool sizes are
+# deliberately excluded so that changing them doesn't invalidate the cache.
+_FINGERPRINT_FIELDS = {
+    "name",
+    "transport",
+    "command",
+    "args",
+    "url",
+    "headers",
+    "auth",
+    "roots",
+    "env",
+}
+
+
+def _local_files(config: MCPServerSettings) -> Dict[str, List[int]]:
+    """
+    Size and mtime of the local files a stdio server is launched from (the command itself
+    and script arguments such as `python server.py`). Servers built on FastMCP report the
+    SDK version as serverInfo.version, so editing the script doesn't change the version and
+    would otherwise keep serving the old tool list.
+    """
+    if config.transport != "stdio":
+        return {}
+
+    files = {}
+    for value in [config.command, *config.args]:
+        if not value:
+            continue
+        try:
+            if os.path.isfile(value):
+                stat = os.stat(value)
+                files[value] = [stat.st_size, stat.st_mtime_ns]
+        except (OSError, ValueError):
+            continue
+    return files
+
+
+def config_fingerprint(config: MCPServerSettings | None) -> str:
+    """Return a stable hash of the parts of a server config that affect its capabilities."""
+    if config is None:
+        return ""
+    data = config.model_dump(mode="json", include=_FINGERPRINT_FIELDS)
+    data["local_files"] = _local_files(config)
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CapabilitySnapshot(BaseModel):
+    """The capabilities a server advertised at the time it was last listed."""
+
+    config_hash: str
+    """Fingerprint of the server config the snapshot was taken with."""
+
+    server_version: str | None = None
+    """serverInfo.version reported by the server, if known."""
+
+    capabilities: ServerCapabilities | None = None
+    tools: List[Tool] = Field(default_factory=list)
+    prompts: List[Prompt] = Field(default_factory=list)
+    resources: List[Resource] = Field(default_factory=list)
+
+
+class CapabilityCache:
+    """
+    Maps server_name -> CapabilitySnapshot.
+
+    A lookup hits when the config fingerprint matches and, if the caller knows the version
+    the server is currently reporting (e.g. from a live persistent connection), the version
+    matches as well. When the version isn't known (non-persistent connections, where
+    learning it would require starting the server) a fingerprint match is enough; rely on
+    list_changed notifications, or disable the cache, for servers whose capabilities change
+    without a config or version change.
+    """
+
+    def __init__(self, path: str | None = None, enabled: bool = True):
+        """
+        :param path: Optional JSON file to load the cache from and write it back to.
+        :param enabled: If False nothing is cached, but invalidations are still relayed to listeners.
+        """
+        self.path = path if enabled else None
+        self.enabled = enabled
+        self._entries: Dict[str, CapabilitySnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._listeners: List[Callable[[str | None], None]] = []
+        # Notifications may arrive on the connection manager's event loop thread
+        self._mutex = threading.Lock()
+
+        if self.path:
+            self._load()
+
+    def add_listener(self, listener: Callable[[str | None], None]) -> None:
+        """
+        Register a callback invoked with the server name (None for all servers) whenever
+        cached capabilities are invalidated. It may be called from another thread.
+        """
+        with self._mutex:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str | None], None]) -> None:
+        with self._mutex:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def lock(self, server_name: str) -> asyncio.Lock:
+        """
+        Per-server lock, so that concurrent aggregators starting up together list a
+        server's capabilities once instead of once each.
+        """
+        with self._mutex:
+            lock = self._locks.get(server_name)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._locks[server_name] = lock
+            return lock
+
+    def get(
+        self,
+        server_name: str,
+        config_hash: str,
+        server_version: str | None = None,
+    ) -> Optional[CapabilitySnapshot]:
+        """Return the cached snapshot for a server, or None if missing or stale."""
+        if not self.enabled:
+            return None
+        with self._mutex:
+            entry = self._entries.get(server_name)
+        if entry is None or entry.config_hash != config_hash:
+            return None
+        if server_version is not None and entry.server_version != server_version:
+            return None
+        return entry
+
+    def put(self, server_name: str, snapshot: CapabilitySnapshot) -> None:
+        """Store a server's snapshot (and persist the cache if a path is configured)."""
+        if not self.enabled:
+            return
+        with self._mutex:
+            self._entries[server_name] = snapshot
+        self._save()
+
+    def invalidate(self, server_name: str | None = None) -> None:
+        """Drop the snapshot for one server, or for all servers if server_name is None."""
+        with self._mutex:
+            if server_name is None:
+                changed = bool(self._entries)
+                self._entries.clear()
+            else:
+                changed = self._entries.pop(server_name, None) is not None
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(server_name)
+            except Exception as e:
+                logger.warning(f"Capability cache listener failed: {e}")
+
+        if changed:
+            logger.debug(
+                "Invalidated cached capabilities",
+                data={"server_name": server_name},
+            )
+            self._save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable capability cache '{self.path}': {e}")
+            return
+
+        for server_name, data in (raw or {}).items():
+            try:
+                self._entries[server_name] = CapabilitySnapshot.model_validate(data)
+            except Exception as e:
+                logger.warning(
+                    f"Ignoring invalid capability cache entry for '{server_name}': {e}"
+                )
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+
+        with self._mutex:
+            data = {
+                server_name: snapshot.model_dump(
+                    mode="json", by_alias=True, exclude_none=True
+                )
+                for server_name, snapshot in self._entries.items()
+            }
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write capability cache '{self.path}': {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
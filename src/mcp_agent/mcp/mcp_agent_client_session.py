@@ -38,6 +38,7 @@ from mcp.types import (
     GetPromptRequestParams,
     ErrorData,
     Implementation,
+    InitializeResult,
     JSONRPCMessage,
     ServerRequest,
     ListRootsResult,
@@ -51,6 +52,7 @@ from mcp.types import (
 )
 
 from mcp_agent.config import MCPServerSettings
+from mcp_agent.mcp.capability_cache import LIST_CHANGED_NOTIFICATIONS
 from mcp_agent.core.context_dependent import ContextDependent
 from mcp_agent.logging.logger import get_logger
 from mcp_agent.tracing.semconv import (
@@ -117,6 +119,8 @@ class MCPAgentClientSession(ClientSession, ContextDependent):
         )
 
         self.server_config: Optional[MCPServerSettings] = None
+        # Result of the initialize handshake (server info, version and capabilities)
+        self.initialize_result: Optional[InitializeResult] = None
         self._sampling_handler = SamplingHandler(context=self.context)
 
         # Session ID handling for Streamable HTTP transport
@@ -146,6 +150,11 @@ class MCPAgentClientSession(ClientSession, ContextDependent):
             return session_id
         return None
 
+    async def initialize(self) -> InitializeResult:
+        result = await super().initialize()
+        self.initialize_result = result
+        return result
+
     async def send_request(
         self,
         request: ClientRequest,
@@ -292,6 +301,17 @@ class MCPAgentClientSession(ClientSession, ContextDependent):
             "_received_notification: notification=",
             data=notification.model_dump(),
         )
+
+        # The server's tools/prompts/resources changed, so its cached capabilities are stale
+        if (
+            getattr(notification.root, "method", None) in LIST_CHANGED_NOTIFICATIONS
+            and self.server_config is not None
+            and self.server_config.name
+        ):
+            capability_cache = getattr(self.context, "capability_cache", None)
+            if capability_cache is not None:
+                capability_cache.invalidate(self.server_config.name)
+
         return await super()._received_notification(notification)
 
     async def send_progress_notification(
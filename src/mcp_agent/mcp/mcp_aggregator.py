@@ -1,8 +1,8 @@
 import asyncio
-from typing import List, Literal, Dict, Optional, TypeVar, TYPE_CHECKING
+from typing import List, Literal, Dict, Optional, Set, TypeVar, TYPE_CHECKING
 
 from opentelemetry import trace
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from mcp.client.session import ClientSession
 from mcp.server.lowlevel.server import Server
 from mcp.server.stdio import stdio_server
@@ -31,8 +31,13 @@ from mcp_agent.tracing.telemetry import (
 from mcp_agent.mcp.gen_client import gen_client
 
 from mcp_agent.core.context_dependent import ContextDependent
+from mcp_agent.mcp.capability_cache import (
+    CapabilityCache,
+    CapabilitySnapshot,
+    config_fingerprint,
+)
 from mcp_agent.mcp.mcp_agent_client_session import MCPAgentClientSession
-from mcp_agent.mcp.mcp_connection_manager import MCPConnectionManager
+from mcp_agent.mcp.mcp_connection_manager import MCPConnectionManager, ServerConnection
 
 if TYPE_CHECKING:
     from mcp_agent.core.context import Context
@@ -44,11 +49,21 @@ logger = get_logger(
 
 SEP = "_"
 
+CAPABILITY_TYPES = ("tool", "prompt", "resource")
+
 # Define type variables for the generalized method
 T = TypeVar("T")
 R = TypeVar("R")
 
 
+class FrozenTool(Tool):
+    """
+    A Tool that is shared between list_tools results, so it can't be modified in place.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+
 class NamespacedTool(BaseModel):
     """
     A tool that is namespaced by server name.
@@ -58,6 +73,20 @@ class NamespacedTool(BaseModel):
     server_name: str
     namespaced_tool_name: str
 
+    _namespaced_tool: FrozenTool | None = PrivateAttr(default=None)
+
+    @property
+    def namespaced_tool(self) -> FrozenTool:
+        """
+        The tool renamed to its namespaced name. Built on first use and then shared by every
+        list_tools call, so that listing tools doesn't copy each tool every time.
+        """
+        if self._namespaced_tool is None:
+            data = self.tool.model_dump(by_alias=True, exclude_unset=True)
+            data["name"] = self.namespaced_tool_name
+            self._namespaced_tool = FrozenTool.model_validate(data)
+        return self._namespaced_tool
+
 
 class NamespacedPrompt(BaseModel):
     """
@@ -134,6 +163,9 @@ class MCPAggregator(ContextDependent):
         # Maps server_name -> list of tools
         self._server_to_tool_map: Dict[str, List[NamespacedTool]] = {}
         self._tool_map_lock = asyncio.Lock()
+        # list_tools results, maps server_name (None for all servers) -> namespaced tools.
+        # Cleared whenever the tool maps change.
+        self._tool_views: Dict[str | None, List[Tool]] = {}
 
         # Maps namespaced_prompt_name -> namespaced prompt info
         self._namespaced_prompt_map: Dict[str, NamespacedPrompt] = {}
@@ -147,6 +179,23 @@ class MCPAggregator(ContextDependent):
         self._server_to_resource_map: Dict[str, List[NamespacedResource]] = {}
         self._resource_map_lock = asyncio.Lock()
 
+        # Lookup indexes for _parse_capability_name, kept up to date by load_server so that
+        # resolving a name needs neither a lock nor a scan of every server's capabilities.
+        # capability -> namespaced name -> (server_name, local_name)
+        self._namespaced_index: Dict[str, Dict[str, tuple[str, str]]] = {
+            capability: {} for capability in CAPABILITY_TYPES
+        }
+        # capability -> bare name (URI for resources) -> servers providing it, in server_names order
+        self._bare_index: Dict[str, Dict[str, List[str]]] = {
+            capability: {} for capability in CAPABILITY_TYPES
+        }
+        self._server_order: Dict[str, int] = {
+            srv_name: idx for idx, srv_name in enumerate(server_names)
+        }
+
+        # Servers that reported a list_changed notification and need to be reloaded
+        self._stale_servers: Set[str] = set()
+
     async def initialize(self, force: bool = False):
         """Initialize the application."""
         tracer = get_tracer(self.context)
@@ -191,6 +240,10 @@ class MCPAggregator(ContextDependent):
 
                     self._persistent_connection_manager = connection_manager
 
+            capability_cache = getattr(self.context, "capability_cache", None)
+            if capability_cache is not None:
+                capability_cache.add_listener(self._on_capabilities_changed)
+
             await self.load_servers()
             span.add_event("initialized")
             self.initialized = True
@@ -205,6 +258,10 @@ class MCPAggregator(ContextDependent):
             span.set_attribute("connection_persistence", self.connection_persistence)
             span.set_attribute(GEN_AI_AGENT_NAME, self.agent_name)
 
+            capability_cache = getattr(self.context, "capability_cache", None)
+            if capability_cache is not None:
+                capability_cache.remove_listener(self._on_capabilities_changed)
+
             # TODO: saqadri (FA1) - Verify implementation
             if (
                 not self.connection_persistence
@@ -335,7 +392,11 @@ class MCPAggregator(ContextDependent):
 
             # Process tools
             async with self._tool_map_lock:
+                self._unindex_capabilities(
+                    "tool", server_name, self._server_to_tool_map.get(server_name, [])
+                )
                 self._server_to_tool_map[server_name] = []
+                self._tool_views.clear()
 
                 # Get server configuration to check for tool filtering
                 allowed_tools = None
@@ -377,8 +438,15 @@ class MCPAggregator(ContextDependent):
                     self._namespaced_tool_map[namespaced_tool_name] = namespaced_tool
                     self._server_to_tool_map[server_name].append(namespaced_tool)
 
+                self._index_capabilities(
+                    "tool", server_name, self._server_to_tool_map[server_name]
+                )
+
             # Process prompts
             async with self._prompt_map_lock:
+                self._unindex_capabilities(
+                    "prompt", server_name, self._server_to_prompt_map.get(server_name, [])
+                )
                 self._server_to_prompt_map[server_name] = []
                 for prompt in prompts:
                     namespaced_prompt_name = f"{server_name}{SEP}{prompt.name}"
@@ -393,8 +461,17 @@ class MCPAggregator(ContextDependent):
                     )
                     self._server_to_prompt_map[server_name].append(namespaced_prompt)
 
+                self._index_capabilities(
+                    "prompt", server_name, self._server_to_prompt_map[server_name]
+                )
+
             # Process resources
             async with self._resource_map_lock:
+                self._unindex_capabilities(
+                    "resource",
+                    server_name,
+                    self._server_to_resource_map.get(server_name, []),
+                )
                 self._server_to_resource_map[server_name] = []
                 for resource in resources:
                     namespaced_resource_name = f"{server_name}{SEP}{resource.name}"
@@ -411,6 +488,10 @@ class MCPAggregator(ContextDependent):
                         namespaced_resource
                     )
 
+                self._index_capabilities(
+                    "resource", server_name, self._server_to_resource_map[server_name]
+                )
+
             event_metadata = {
                 "server_name": server_name,
                 "agent_name": self.agent_name,
@@ -469,14 +550,27 @@ class MCPAggregator(ContextDependent):
             async with self._tool_map_lock:
                 self._namespaced_tool_map.clear()
                 self._server_to_tool_map.clear()
+                self._namespaced_index["tool"].clear()
+                self._bare_index["tool"].clear()
+                self._tool_views.clear()
 
             async with self._prompt_map_lock:
                 self._namespaced_prompt_map.clear()
                 self._server_to_prompt_map.clear()
+                self._namespaced_index["prompt"].clear()
+                self._bare_index["prompt"].clear()
 
             async with self._resource_map_lock:
                 self._namespaced_resource_map.clear()
                 self._server_to_resource_map.clear()
+                self._namespaced_index["resource"].clear()
+                self._bare_index["resource"].clear()
+
+            # server_names may have been changed since the aggregator was created
+            self._server_order = {
+                srv_name: idx for idx, srv_name in enumerate(self.server_names)
+            }
+            self._stale_servers.clear()
 
             # TODO: saqadri (FA1) - Verify that this can be removed
             # if self.connection_persistence:
@@ -645,29 +739,28 @@ class MCPAggregator(ContextDependent):
             span.set_attribute("initialized", self.initialized)
             if not self.initialized:
                 await self.load_servers()
+            elif self._stale_servers:
+                await self._reload_stale_servers()
 
             if server_name:
                 span.set_attribute("server_name", server_name)
-                result = ListToolsResult(
-                    tools=[
-                        namespaced_tool.tool.model_copy(
-                            update={"name": namespaced_tool.namespaced_tool_name}
-                        )
-                        for namespaced_tool in self._server_to_tool_map.get(
-                            server_name, []
-                        )
-                    ]
-                )
-            else:
+
+            tools = self._tool_views.get(server_name)
+            if tools is None:
                 async with self._tool_map_lock:
-                    result = ListToolsResult(
-                        tools=[
-                            namespaced_tool.tool.model_copy(
-                                update={"name": namespaced_tool_name}
-                            )
-                            for namespaced_tool_name, namespaced_tool in self._namespaced_tool_map.items()
-                        ]
-                    )
+                    if server_name:
+                        namespaced_tools = self._server_to_tool_map.get(server_name, [])
+                    else:
+                        namespaced_tools = self._namespaced_tool_map.values()
+                    tools = [
+                        namespaced_tool.namespaced_tool
+                        for namespaced_tool in namespaced_tools
+                    ]
+                    self._tool_views[server_name] = tools
+
+            # The Tool objects are shared (and frozen); only the list is copied, so callers
+            # may still add or remove tools from the result
+            result = ListToolsResult.model_construct(tools=list(tools))
 
             if self.context.tracing_enabled:
                 span.set_attribute("tool_count", len(result.tools))
@@ -690,6 +783,8 @@ class MCPAggregator(ContextDependent):
             span.set_attribute("initialized", self.initialized)
             if not self.initialized:
                 await self.load_servers()
+            elif self._stale_servers:
+                await self._reload_stale_servers()
 
             if server_name:
                 span.set_attribute("server_name", server_name)
@@ -891,14 +986,20 @@ class MCPAggregator(ContextDependent):
                     return
                 annotate_span_for_call_tool_result(span, result)
 
-            async def try_call_tool(client: ClientSession):
+            async def try_call_tool(
+                client: ClientSession, server_connection: ServerConnection | None = None
+            ):
                 try:
                     res = await client.call_tool(
                         name=local_tool_name, arguments=arguments
                     )
+                    if server_connection is not None:
+                        server_connection.record_success()
                     _annotate_span_for_result(res)
                     return res
                 except Exception as e:
+                    if server_connection is not None:
+                        server_connection.record_failure()
                     span.set_status(trace.Status(trace.StatusCode.ERROR))
                     span.record_exception(e)
                     return CallToolResult(
@@ -912,12 +1013,13 @@ class MCPAggregator(ContextDependent):
                     )
 
             if self.connection_persistence:
-                server_connection = (
-                    await self._persistent_connection_manager.get_server(
-                        server_name, client_session_factory=MCPAgentClientSession
+                # Pooled servers (pool_max_size > 1) spread concurrent calls across connections
+                async with self._persistent_connection_manager.lease(
+                    server_name, client_session_factory=MCPAgentClientSession
+                ) as server_connection:
+                    res = await try_call_tool(
+                        server_connection.session, server_connection
                     )
-                )
-                res = await try_call_tool(server_connection.session)
                 _annotate_span_for_result(res)
                 return res
             else:
@@ -967,6 +1069,8 @@ class MCPAggregator(ContextDependent):
             span.set_attribute("initialized", self.initialized)
             if not self.initialized:
                 await self.load_servers()
+            elif self._stale_servers:
+                await self._reload_stale_servers()
 
             if server_name:
                 span.set_attribute("server_name", server_name)
@@ -1179,49 +1283,127 @@ class MCPAggregator(ContextDependent):
         Returns:
             Tuple of (server_name, local_name)
         """
+        if capability not in CAPABILITY_TYPES:
+            raise ValueError(f"Unsupported capability: {capability}")
 
-        # First check if this is a namespaced name with a valid server prefix
-        if SEP in name:
-            parts = name.split(SEP)
+        if self._stale_servers:
+            await self._reload_stale_servers()
 
-            # Try matching from longest possible prefix to shortest
-            for i in range(len(parts) - 1, 0, -1):
-                prefix = SEP.join(parts[:i])
-                if prefix in self.server_names:
-                    return prefix, SEP.join(parts[i:])
+        # Namespaced name of a loaded capability
+        match = self._namespaced_index[capability].get(name)
+        if match is not None:
+            return match
 
-        # If no server name prefix is found, search all servers for a capability with this exact name
-        if capability == "tool":
-            lock = self._tool_map_lock
-            capability_map = self._server_to_tool_map
+        # Otherwise check if this is a namespaced name with a valid server prefix
+        match = self._split_server_prefix(name)
+        if match is not None:
+            return match
 
-            def getter(item: NamespacedTool):
-                return item.tool.name
-        elif capability == "prompt":
-            lock = self._prompt_map_lock
-            capability_map = self._server_to_prompt_map
+        # If no server name prefix is found, use the first server (in the order of
+        # self.server_names) that has a capability with this exact name
+        servers = self._bare_index[capability].get(name)
+        if servers:
+            return servers[0], name
+
+        # No match found
+        return None, None
+
+    def _split_server_prefix(self, name: str) -> tuple[str, str] | None:
+        """
+        Split a namespaced name on the longest prefix that is one of our server names.
+        """
+        if SEP not in name:
+            return None
 
-            def getter(item: NamespacedPrompt):
-                return item.prompt.name
-        elif capability == "resource":
-            lock = self._resource_map_lock
-            capability_map = self._server_to_resource_map
+        parts = name.split(SEP)
 
-            def getter(item: NamespacedResource):
-                return str(item.resource.uri)
+        # Try matching from longest possible prefix to shortest
+        for i in range(len(parts) - 1, 0, -1):
+            prefix = SEP.join(parts[:i])
+            if prefix in self._server_order:
+                return prefix, SEP.join(parts[i:])
+
+        return None
+
+    @staticmethod
+    def _capability_keys(
+        capability: str,
+        item: NamespacedTool | NamespacedPrompt | NamespacedResource,
+    ) -> tuple[str, str, str]:
+        """Return the (namespaced name, local name, bare lookup key) of a capability."""
+        if capability == "tool":
+            return item.namespaced_tool_name, item.tool.name, item.tool.name
+        elif capability == "prompt":
+            return item.namespaced_prompt_name, item.prompt.name, item.prompt.name
         else:
-            raise ValueError(f"Unsupported capability: {capability}")
+            return (
+                item.namespaced_resource_name,
+                item.resource.name,
+                str(item.resource.uri),
+            )
 
-        # Search servers in the order of self.server_names
-        async with lock:
-            for srv_name in self.server_names:
-                items = capability_map.get(srv_name, [])
-                for item in items:
-                    if getter(item) == name:
-                        return srv_name, name
+    def _index_capabilities(self, capability: str, server_name: str, items) -> None:
+        """Add a server's capabilities to the lookup indexes. Call with the capability's lock held."""
+        namespaced_index = self._namespaced_index[capability]
+        bare_index = self._bare_index[capability]
+        order = self._server_order
 
-        # No match found
-        return None, None
+        for item in items:
+            namespaced_name, local_name, key = self._capability_keys(capability, item)
+
+            # Only index names that resolve to this server by prefix, so an index hit always
+            # agrees with the longest-prefix rule (e.g. servers 'a' and 'a_b' both
+            # producing 'a_b_c' resolve to 'a_b')
+            if self._split_server_prefix(namespaced_name) == (server_name, local_name):
+                namespaced_index[namespaced_name] = (server_name, local_name)
+
+            servers = bare_index.setdefault(key, [])
+            if server_name not in servers:
+                servers.append(server_name)
+                servers.sort(key=lambda srv: order.get(srv, len(order)))
+
+    def _unindex_capabilities(self, capability: str, server_name: str, items) -> None:
+        """Remove a server's capabilities from the lookup indexes. Call with the capability's lock held."""
+        namespaced_index = self._namespaced_index[capability]
+        bare_index = self._bare_index[capability]
+
+        for item in items:
+            namespaced_name, _, key = self._capability_keys(capability, item)
+
+            if namespaced_index.get(namespaced_name, (None,))[0] == server_name:
+                del namespaced_index[namespaced_name]
+
+            servers = bare_index.get(key)
+            if servers and server_name in servers:
+                servers.remove(server_name)
+                if not servers:
+                    del bare_index[key]
+
+    def _on_capabilities_changed(self, server_name: str | None) -> None:
+        """
+        Capability cache listener: a server reported list_changed (or the cache was cleared).
+        May be called from the connection manager's thread, so only mark the server as stale;
+        it is reloaded on the next lookup.
+        """
+        if server_name is None:
+            self._stale_servers.update(self.server_names)
+        elif server_name in self._server_order:
+            self._stale_servers.add(server_name)
+
+    async def _reload_stale_servers(self) -> None:
+        while self._stale_servers:
+            try:
+                server_name = self._stale_servers.pop()
+            except KeyError:
+                return
+
+            logger.debug(f"Reloading capabilities for server '{server_name}'")
+            try:
+                await self.load_server(server_name)
+            except Exception as e:
+                logger.warning(
+                    f"Error reloading capabilities for server '{server_name}': {e}"
+                )
 
     async def _start_server(self, server_name: str):
         if self.connection_persistence:
@@ -1254,9 +1436,16 @@ class MCPAggregator(ContextDependent):
             ) as client:
                 return client
 
-    async def _fetch_tools(self, client: ClientSession, server_name: str) -> List[Tool]:
+    async def _fetch_tools(
+        self,
+        client: ClientSession,
+        server_name: str,
+        capabilities: ServerCapabilities | None = None,
+        errors: List[BaseException] | None = None,
+    ) -> List[Tool]:
         # Only fetch tools if the server supports them
-        capabilities = await self.get_capabilities(server_name)
+        if capabilities is None:
+            capabilities = await self.get_capabilities(server_name)
         if not capabilities or not capabilities.tools:
             logger.debug(f"Server '{server_name}' does not support tools")
             return []
@@ -1281,13 +1470,20 @@ class MCPAggregator(ContextDependent):
             return tools
         except Exception as e:
             logger.error(f"Error loading tools from server '{server_name}'", data=e)
+            if errors is not None:
+                errors.append(e)
             return tools
 
     async def _fetch_prompts(
-        self, client: ClientSession, server_name: str
+        self,
+        client: ClientSession,
+        server_name: str,
+        capabilities: ServerCapabilities | None = None,
+        errors: List[BaseException] | None = None,
     ) -> List[Prompt]:
         # Only fetch prompts if the server supports them
-        capabilities = await self.get_capabilities(server_name)
+        if capabilities is None:
+            capabilities = await self.get_capabilities(server_name)
         if not capabilities or not capabilities.prompts:
             logger.debug(f"Server '{server_name}' does not support prompts")
             return []
@@ -1313,13 +1509,20 @@ class MCPAggregator(ContextDependent):
             return prompts
         except Exception as e:
             logger.error(f"Error loading prompts from server '{server_name}': {e}")
+            if errors is not None:
+                errors.append(e)
             return prompts
 
     async def _fetch_resources(
-        self, client: ClientSession, server_name: str
+        self,
+        client: ClientSession,
+        server_name: str,
+        capabilities: ServerCapabilities | None = None,
+        errors: List[BaseException] | None = None,
     ) -> list[Resource]:
         # Only fetch resources if the server supports them
-        capabilities = await self.get_capabilities(server_name)
+        if capabilities is None:
+            capabilities = await self.get_capabilities(server_name)
         if not capabilities or not getattr(capabilities, "resources", None):
             logger.debug(f"Server '{server_name}' does not support resources")
             return []
@@ -1345,31 +1548,126 @@ class MCPAggregator(ContextDependent):
             return resources
         except Exception as e:
             logger.error(f"Error loading resources from server '{server_name}': {e}")
+            if errors is not None:
+                errors.append(e)
             return resources
 
     async def _fetch_capabilities(self, server_name: str):
-        tools: List[Tool] = []
-        prompts: List[Prompt] = []
-        resources: List[Resource] = []
+        """
+        Fetch the tools, prompts and resources of a server. If the context has a capability cache
+        with an up-to-date snapshot of the server, it is used instead of listing them again.
+        """
+        capability_cache: CapabilityCache | None = getattr(
+            self.context, "capability_cache", None
+        )
+        server_config = None
+        if self.context.server_registry is not None and hasattr(
+            self.context.server_registry, "get_server_config"
+        ):
+            server_config = self.context.server_registry.get_server_config(server_name)
+
+        if (
+            capability_cache is None
+            or not capability_cache.enabled
+            or server_config is None
+        ):
+            snapshot, _ = await self._list_capabilities(server_name)
+            return server_name, snapshot.tools, snapshot.prompts, snapshot.resources
+
+        config_hash = config_fingerprint(server_config)
+
+        # Serialize per server so aggregators initializing together list it only once
+        async with capability_cache.lock(server_name):
+            server_connection: ServerConnection | None = None
+            server_version: str | None = None
+            if self.connection_persistence:
+                # The persistent connection is already initialized, so the version the
+                # server reports is known without an extra round-trip
+                server_connection = (
+                    await self._persistent_connection_manager.get_server(
+                        server_name, client_session_factory=MCPAgentClientSession
+                    )
+                )
+                if server_connection.server_info is not None:
+                    server_version = server_connection.server_info.version
+
+            snapshot = capability_cache.get(server_name, config_hash, server_version)
+            if snapshot is not None:
+                logger.debug(
+                    f"Using cached capabilities for server '{server_name}'",
+                    data={
+                        "server_name": server_name,
+                        "server_version": snapshot.server_version,
+                    },
+                )
+            else:
+                snapshot, errors = await self._list_capabilities(
+                    server_name, server_connection
+                )
+                snapshot.config_hash = config_hash
+                # Don't cache a partial listing
+                if not errors:
+                    capability_cache.put(server_name, snapshot)
+
+        return server_name, snapshot.tools, snapshot.prompts, snapshot.resources
+
+    async def _list_capabilities(
+        self,
+        server_name: str,
+        server_connection: ServerConnection | None = None,
+    ) -> tuple[CapabilitySnapshot, List[BaseException]]:
+        """
+        List the tools, prompts and resources of a server, using the capabilities it returned
+        from initialize (rather than starting another session to ask for them).
+        Returns the snapshot and any errors encountered while listing.
+        """
+        errors: List[BaseException] = []
 
         if self.connection_persistence:
-            server_connection = await self._persistent_connection_manager.get_server(
-                server_name, client_session_factory=MCPAgentClientSession
+            if server_connection is None:
+                server_connection = (
+                    await self._persistent_connection_manager.get_server(
+                        server_name, client_session_factory=MCPAgentClientSession
+                    )
+                )
+            session = server_connection.session
+            capabilities = server_connection.server_capabilities
+            server_info = server_connection.server_info
+
+            tools = await self._fetch_tools(session, server_name, capabilities, errors)
+            prompts = await self._fetch_prompts(
+                session, server_name, capabilities, errors
             )
-            tools = await self._fetch_tools(server_connection.session, server_name)
-            prompts = await self._fetch_prompts(server_connection.session, server_name)
             resources = await self._fetch_resources(
-                server_connection.session, server_name
+                session, server_name, capabilities, errors
             )
         else:
             async with gen_client(
                 server_name, server_registry=self.context.server_registry
             ) as client:
-                tools = await self._fetch_tools(client, server_name)
-                prompts = await self._fetch_prompts(client, server_name)
-                resources = await self._fetch_resources(client, server_name)
+                initialize_result = getattr(client, "initialize_result", None)
+                capabilities = (
+                    initialize_result.capabilities if initialize_result else None
+                )
+                server_info = initialize_result.serverInfo if initialize_result else None
 
-        return server_name, tools, prompts, resources
+                tools = await self._fetch_tools(client, server_name, capabilities, errors)
+                prompts = await self._fetch_prompts(
+                    client, server_name, capabilities, errors
+                )
+                resources = await self._fetch_resources(
+                    client, server_name, capabilities, errors
+                )
+
+        snapshot = CapabilitySnapshot(
+            config_hash="",
+            server_version=server_info.version if server_info else None,
+            capabilities=capabilities,
+            tools=tools,
+            prompts=prompts,
+            resources=resources,
+        )
+        return snapshot, errors
 
 
 class MCPCompoundServer(Server):
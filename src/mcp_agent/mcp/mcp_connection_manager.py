@@ -2,13 +2,16 @@
 Manages the lifecycle of multiple MCP server connections.
 """
 
+from contextlib import asynccontextmanager
 from datetime import timedelta
 import asyncio
 import threading
 from typing import (
     AsyncGenerator,
+    AsyncIterator,
     Callable,
     Dict,
+    List,
     Optional,
     TYPE_CHECKING,
 )
@@ -27,7 +30,7 @@ from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client, MCP_SESSION_ID
 from mcp.client.websocket import websocket_client
-from mcp.types import JSONRPCMessage, ServerCapabilities
+from mcp.types import Implementation, JSONRPCMessage, ServerCapabilities
 
 from mcp_agent.config import MCPServerSettings
 from mcp_agent.core.context_dependent import ContextDependent
@@ -73,6 +76,7 @@ class ServerConnection:
         self.server_name = server_name
         self.server_config = server_config
         self.server_capabilities: ServerCapabilities | None = None
+        self.server_info: Implementation | None = None
         self.session: ClientSession | None = None
         self._client_session_factory = client_session_factory
         self._init_hook = init_hook
@@ -87,10 +91,31 @@ class ServerConnection:
         self._error: bool = False
         self._error_message: str | None = None
 
+        # Dispatch bookkeeping for pooled connections
+        self.outstanding: int = 0
+        self.consecutive_failures: int = 0
+
     def is_healthy(self) -> bool:
         """Check if the server connection is healthy and ready to use."""
         return self.session is not None and not self._error
 
+    def record_success(self) -> None:
+        """Record a request that completed without a transport/session error."""
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Record a request that failed with a transport/session error."""
+        self.consecutive_failures += 1
+
+    def load_score(self) -> float | None:
+        """
+        Dispatch score used by the connection pool (lower is better).
+        Returns None if the connection is unhealthy and should not receive requests.
+        """
+        if not self.is_healthy():
+            return None
+        return self.outstanding + self.consecutive_failures * FAILURE_PENALTY
+
     def reset_error_state(self) -> None:
         """Reset the error state, allowing reconnection attempts."""
         self._error = False
@@ -122,6 +147,7 @@ class ServerConnection:
         result = await self.session.initialize()
 
         self.server_capabilities = result.capabilities
+        self.server_info = result.serverInfo
         # If there's an init hook, run it
         if self._init_hook:
             logger.info(f"{self.server_name}: Executing init hook.")
@@ -162,6 +188,60 @@ class ServerConnection:
         return session
 
 
+# Each consecutive failure counts as this many outstanding requests when dispatching
+FAILURE_PENALTY = 4
+# Pooled (non-primary) connections are replaced after this many consecutive failures
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+class ServerConnectionPool:
+    """
+    Additional connections to one server, used when its pool_max_size is greater than 1.
+    The manager's primary connection (running_servers[server_name]) is always part of the
+    pool; this only tracks the extra connections and the ones still starting up.
+    """
+
+    def __init__(self, server_name: str, min_size: int, max_size: int):
+        self.server_name = server_name
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.extras: List[ServerConnection] = []
+        self.starting: int = 0
+
+    def size(self) -> int:
+        """Connections open or starting, including the primary connection."""
+        return 1 + len(self.extras) + self.starting
+
+    def evict_unhealthy(self) -> None:
+        """Shut down extra connections that errored or keep failing requests."""
+        keep = []
+        for conn in self.extras:
+            if (
+                conn.is_healthy()
+                and conn.consecutive_failures < MAX_CONSECUTIVE_FAILURES
+            ):
+                keep.append(conn)
+            else:
+                logger.info(
+                    f"{self.server_name}: Evicting pooled connection "
+                    f"(healthy={conn.is_healthy()}, failures={conn.consecutive_failures})"
+                )
+                conn.request_shutdown()
+        self.extras = keep
+
+    def pick(self, primary: ServerConnection | None) -> ServerConnection | None:
+        """The healthy connection with the lowest load score (fewest outstanding requests)."""
+        candidates = [primary, *self.extras] if primary is not None else self.extras
+        scored = [(c.load_score(), i, c) for i, c in enumerate(candidates)]
+        scored = [t for t in scored if t[0] is not None]
+        return min(scored)[2] if scored else None
+
+    def shutdown(self) -> None:
+        for conn in self.extras:
+            conn.request_shutdown()
+        self.extras.clear()
+
+
 async def _server_lifecycle_task(server_conn: ServerConnection) -> None:
     """
     Manage the lifecycle of a single server connection.
@@ -232,6 +312,8 @@ class MCPConnectionManager(ContextDependent):
         super().__init__(context)
         self.server_registry = server_registry
         self.running_servers: Dict[str, ServerConnection] = {}
+        # Extra connections for servers configured with pool_max_size > 1
+        self.pools: Dict[str, ServerConnectionPool] = {}
         self._lock = Lock()
         # Manage our own task group - independent of task context
         self._tg: TaskGroup | None = None
@@ -428,6 +510,34 @@ class MCPConnectionManager(ContextDependent):
                 f"MCPConnectionManager: Auto-created task group for server: {server_name}"
             )
 
+        server_conn = self._create_connection(
+            server_name, client_session_factory, init_hook, session_id
+        )
+
+        async with self._lock:
+            # Check if already running
+            if server_name in self.running_servers:
+                return self.running_servers[server_name]
+
+            self.running_servers[server_name] = server_conn
+            self._tg.start_soon(_server_lifecycle_task, server_conn)
+
+        logger.info(f"{server_name}: Up and running with a persistent connection!")
+        return server_conn
+
+    def _create_connection(
+        self,
+        server_name: str,
+        client_session_factory: Callable[
+            [MemoryObjectReceiveStream, MemoryObjectSendStream, timedelta | None],
+            ClientSession,
+        ],
+        init_hook: Optional["InitHookCallable"] = None,
+        session_id: str | None = None,
+    ) -> ServerConnection:
+        """
+        Build a (not yet started) ServerConnection for a server in the registry.
+        """
         config = self.server_registry.registry.get(server_name)
         if not config:
             raise ValueError(f"Server '{server_name}' not found in registry.")
@@ -497,7 +607,7 @@ class MCPConnectionManager(ContextDependent):
             else:
                 raise ValueError(f"Unsupported transport: {config.transport}")
 
-        server_conn = ServerConnection(
+        return ServerConnection(
             server_name=server_name,
             server_config=config,
             transport_context_factory=transport_context_factory,
@@ -505,17 +615,6 @@ class MCPConnectionManager(ContextDependent):
             init_hook=init_hook or self.server_registry.init_hooks.get(server_name),
         )
 
-        async with self._lock:
-            # Check if already running
-            if server_name in self.running_servers:
-                return self.running_servers[server_name]
-
-            self.running_servers[server_name] = server_conn
-            self._tg.start_soon(_server_lifecycle_task, server_conn)
-
-        logger.info(f"{server_name}: Up and running with a persistent connection!")
-        return server_conn
-
     async def get_server(
         self,
         server_name: str,
@@ -562,6 +661,101 @@ class MCPConnectionManager(ContextDependent):
 
         return server_conn
 
+    @asynccontextmanager
+    async def lease(
+        self,
+        server_name: str,
+        client_session_factory: Callable[
+            [MemoryObjectReceiveStream, MemoryObjectSendStream, timedelta | None],
+            ClientSession,
+        ] = MCPAgentClientSession,
+        init_hook: Optional["InitHookCallable"] = None,
+    ) -> AsyncIterator[ServerConnection]:
+        """
+        Borrow a connection for a single request.
+
+        With the default pool_max_size of 1 this is the same connection get_server returns.
+        Otherwise the request goes to the healthy pooled connection with the fewest outstanding
+        requests, and a new connection is started in the background whenever all of them are
+        busy and the pool is below pool_max_size. Callers report transport errors with
+        ServerConnection.record_failure so failing connections are dispatched to less and
+        eventually replaced.
+        """
+        primary = await self.get_server(
+            server_name,
+            client_session_factory=client_session_factory,
+            init_hook=init_hook,
+        )
+        server_conn = primary
+        config = primary.server_config
+        if config.pool_max_size > 1:
+            async with self._lock:
+                pool = self.pools.get(server_name)
+                if pool is None:
+                    pool = ServerConnectionPool(
+                        server_name, config.pool_min_size, config.pool_max_size
+                    )
+                    self.pools[server_name] = pool
+                pool.evict_unhealthy()
+                server_conn = pool.pick(primary) or primary
+                busy = server_conn.outstanding > 0 and pool.size() < pool.max_size
+                for _ in range(max(pool.min_size - pool.size(), int(busy))):
+                    pool.starting += 1
+                    self._tg.start_soon(
+                        self._grow_pool, pool, client_session_factory, init_hook
+                    )
+
+        server_conn.outstanding += 1
+        try:
+            yield server_conn
+        finally:
+            server_conn.outstanding -= 1
+
+    async def _grow_pool(
+        self,
+        pool: ServerConnectionPool,
+        client_session_factory: Callable[
+            [MemoryObjectReceiveStream, MemoryObjectSendStream, timedelta | None],
+            ClientSession,
+        ],
+        init_hook: Optional["InitHookCallable"] = None,
+    ) -> None:
+        """Start one more pooled connection; it joins the pool once initialized."""
+        # Runs inside the shared TaskGroup: never let a failed start propagate
+        error = None
+        try:
+            server_conn = self._create_connection(
+                pool.server_name, client_session_factory, init_hook
+            )
+        except Exception as e:
+            server_conn, error = None, str(e)
+        else:
+            try:
+                self._tg.start_soon(_server_lifecycle_task, server_conn)
+                await server_conn.wait_for_initialized()
+                if not server_conn.is_healthy():
+                    error = server_conn._error_message or "Unknown error"
+            except Exception as e:
+                # The lifecycle task may already be running; it is shut down below
+                error = str(e)
+
+        async with self._lock:
+            pool.starting -= 1
+            if error is not None:
+                logger.warning(
+                    f"{pool.server_name}: Pooled connection failed to start: {error}"
+                )
+            if server_conn is None:
+                return
+            if error is not None or self.pools.get(pool.server_name) is not pool:
+                # Failed, or the server was disconnected while this connection was starting
+                server_conn.request_shutdown()
+                return
+            pool.extras.append(server_conn)
+            logger.info(
+                f"{pool.server_name}: Pooled connection ready ({pool.size()}/{pool.max_size})"
+            )
+
     async def get_server_capabilities(
         self,
         server_name: str,
@@ -584,6 +778,9 @@ class MCPConnectionManager(ContextDependent):
 
         async with self._lock:
             server_conn = self.running_servers.pop(server_name, None)
+            pool = self.pools.pop(server_name, None)
+        if pool:
+            pool.shutdown()
         if server_conn:
             server_conn.request_shutdown()
             logger.info(
@@ -604,6 +801,11 @@ class MCPConnectionManager(ContextDependent):
         servers_to_shutdown = []
 
         async with self._lock:
+            pools = list(self.pools.values())
+            self.pools.clear()
+            for pool in pools:
+                pool.shutdown()
+
             if not self.running_servers:
                 return
 
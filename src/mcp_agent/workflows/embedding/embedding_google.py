@@ -0,0 +1,68 @@
+from typing import List, Optional, TYPE_CHECKING
+
+from google.genai import types
+from numpy import array, float32, stack
+
+from mcp_agent.tracing.semconv import (
+    GEN_AI_OPERATION_NAME,
+    GEN_AI_REQUEST_MODEL,
+)
+from mcp_agent.tracing.telemetry import get_tracer
+from mcp_agent.workflows.embedding.embedding_base import EmbeddingModel, FloatArray
+from mcp_agent.workflows.llm.augmented_llm_google import create_google_client
+
+if TYPE_CHECKING:
+    from mcp_agent.core.context import Context
+
+
+class GoogleEmbeddingModel(EmbeddingModel):
+    """Google (Gemini API / Vertex AI) embedding model implementation"""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-004",
+        task_type: str = "SEMANTIC_SIMILARITY",
+        output_dimensionality: int | None = None,
+        context: Optional["Context"] = None,
+        **kwargs,
+    ):
+        super().__init__(context=context, **kwargs)
+        # Shares the client (and its connection pool) with GoogleAugmentedLLM
+        self.client = create_google_client(self.context.config.google)
+        self.model = model
+        self.task_type = task_type
+        self.output_dimensionality = output_dimensionality
+        # Cache the dimension since it's fixed per model (unless truncated)
+        self._embedding_dim = output_dimensionality or {
+            "text-embedding-004": 768,
+            "text-embedding-005": 768,
+            "text-multilingual-embedding-002": 768,
+            "gemini-embedding-001": 3072,
+        }.get(model, 768)
+
+    async def embed(self, data: List[str]) -> FloatArray:
+        tracer = get_tracer(self.context)
+        with tracer.start_as_current_span(f"{self.__class__.__name__}.embed") as span:
+            span.set_attribute(GEN_AI_REQUEST_MODEL, self.model)
+            span.set_attribute(GEN_AI_OPERATION_NAME, "embeddings")
+            span.set_attribute("data", data)
+            span.set_attribute("embedding_dim", self.embedding_dim)
+
+            response = await self.client.aio.models.embed_content(
+                model=self.model,
+                contents=data,
+                config=types.EmbedContentConfig(
+                    task_type=self.task_type,
+                    output_dimensionality=self.output_dimensionality,
+                ),
+            )
+
+            # Embeddings are returned in input order
+            embeddings = stack(
+                [array(embedding.values, dtype=float32) for embedding in response.embeddings]
+            )
+            return embeddings
+
+    @property
+    def embedding_dim(self) -> int:
+        return self._embedding_dim
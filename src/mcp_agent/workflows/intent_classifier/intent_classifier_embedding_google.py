@@ -0,0 +1,45 @@
+from typing import List, Optional, TYPE_CHECKING
+
+from mcp_agent.workflows.embedding.embedding_google import GoogleEmbeddingModel
+from mcp_agent.workflows.intent_classifier.intent_classifier_base import Intent
+from mcp_agent.workflows.intent_classifier.intent_classifier_embedding import (
+    EmbeddingIntentClassifier,
+)
+
+if TYPE_CHECKING:
+    from mcp_agent.core.context import Context
+
+
+class GoogleEmbeddingIntentClassifier(EmbeddingIntentClassifier):
+    """
+    An intent classifier that uses Google's embedding models for computing semantic similarity based classifications.
+    """
+
+    def __init__(
+        self,
+        intents: List[Intent],
+        embedding_model: GoogleEmbeddingModel | None = None,
+        context: Optional["Context"] = None,
+        **kwargs,
+    ):
+        embedding_model = embedding_model or GoogleEmbeddingModel()
+        super().__init__(
+            embedding_model=embedding_model, intents=intents, context=context, **kwargs
+        )
+
+    @classmethod
+    async def create(
+        cls,
+        intents: List[Intent],
+        embedding_model: GoogleEmbeddingModel | None = None,
+        context: Optional["Context"] = None,
+    ) -> "GoogleEmbeddingIntentClassifier":
+        """
+        Factory method to create and initialize a classifier.
+        Use this instead of constructor since we need async initialization.
+        """
+        instance = cls(
+            intents=intents, embedding_model=embedding_model, context=context
+        )
+        await instance.initialize()
+        return instance
@@ -32,6 +32,7 @@ from mcp.types import (
     StopReason,
     TextContent,
     TextResourceContents,
+    Tool,
 )
 
 # from mcp_agent import console
@@ -60,6 +61,7 @@ from mcp_agent.workflows.llm.augmented_llm import (
 )
 from mcp_agent.logging.logger import get_logger
 from mcp_agent.workflows.llm.multipart_converter_anthropic import AnthropicConverter
+from mcp_agent.workflows.llm.tool_schema_cache import tool_schema_cache
 
 MessageParamContent = Union[
     str,
@@ -183,14 +185,9 @@ class AnthropicAugmentedLLM(AugmentedLLM[MessageParam, Message]):
             list_tools_result = await self.agent.list_tools(
                 tool_filter=params.tool_filter
             )
-            available_tools: List[ToolParam] = [
-                {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "input_schema": tool.inputSchema,
-                }
-                for tool in list_tools_result.tools
-            ]
+            available_tools: List[ToolParam] = tool_schema_cache.compile_all(
+                "anthropic", list_tools_result.tools, anthropic_tool_declaration
+            )
 
             responses: List[Message] = []
             model = await self.select_model(params)
@@ -1041,3 +1038,12 @@ def anthropic_stop_reason_to_mcp_stop_reason(stop_reason: str) -> StopReason:
         return "toolUse"
     else:
         return stop_reason
+
+
+def anthropic_tool_declaration(tool: Tool) -> ToolParam:
+    """Convert an MCP tool to an Anthropic tool declaration."""
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "input_schema": tool.inputSchema,
+    }
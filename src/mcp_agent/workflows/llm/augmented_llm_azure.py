@@ -38,6 +38,7 @@ from mcp.types import (
     ModelPreferences,
     TextContent,
     TextResourceContents,
+    Tool,
 )
 
 from mcp_agent.config import AzureSettings
@@ -62,6 +63,7 @@ from mcp_agent.workflows.llm.augmented_llm import (
 )
 from mcp_agent.logging.logger import get_logger
 from mcp_agent.workflows.llm.multipart_converter_azure import AzureConverter
+from mcp_agent.workflows.llm.tool_schema_cache import tool_schema_cache
 
 MessageParam = Union[
     SystemMessage, UserMessage, AssistantMessage, ToolMessage, DeveloperMessage
@@ -162,16 +164,9 @@ class AzureAugmentedLLM(AugmentedLLM[MessageParam, ResponseMessage]):
 
             response = await self.agent.list_tools(tool_filter=params.tool_filter)
 
-            tools: list[ChatCompletionsToolDefinition] = [
-                ChatCompletionsToolDefinition(
-                    function=FunctionDefinition(
-                        name=tool.name,
-                        description=tool.description,
-                        parameters=tool.inputSchema,
-                    )
-                )
-                for tool in response.tools
-            ]
+            tools: list[ChatCompletionsToolDefinition] = tool_schema_cache.compile_all(
+                "azure", response.tools, azure_tool_declaration
+            )
 
             span.set_attribute(
                 "available_tools",
@@ -758,3 +753,14 @@ def image_url_to_mime_and_base64(image_url: ImageUrl) -> tuple[str, str]:
         raise ValueError(f"Invalid image data URI: {url[:30]}...")
     mime_type, base64_data = match.groups()
     return mime_type, base64_data
+
+
+def azure_tool_declaration(tool: Tool) -> ChatCompletionsToolDefinition:
+    """Convert an MCP tool to an Azure AI Inference tool definition."""
+    return ChatCompletionsToolDefinition(
+        function=FunctionDefinition(
+            name=tool.name,
+            description=tool.description,
+            parameters=tool.inputSchema,
+        )
+    )
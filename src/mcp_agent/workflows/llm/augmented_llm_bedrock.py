@@ -14,6 +14,7 @@ from mcp.types import (
     TextContent,
     TextResourceContents,
     BlobResourceContents,
+    Tool,
 )
 from mcp_agent.config import BedrockSettings
 from mcp_agent.executor.workflow_task import workflow_task
@@ -29,6 +30,7 @@ from mcp_agent.workflows.llm.augmented_llm import (
 )
 from mcp_agent.logging.logger import get_logger
 from mcp_agent.workflows.llm.multipart_converter_bedrock import BedrockConverter
+from mcp_agent.workflows.llm.tool_schema_cache import tool_schema_cache
 from mcp_agent.tracing.token_tracking_decorator import track_tokens
 
 if TYPE_CHECKING:
@@ -39,6 +41,7 @@ if TYPE_CHECKING:
         MessageUnionTypeDef,
         ContentBlockUnionTypeDef,
         ToolConfigurationTypeDef,
+        ToolTypeDef,
     )
 else:
     MessageOutputTypeDef = object
@@ -47,6 +50,7 @@ else:
     MessageUnionTypeDef = object
     ContentBlockUnionTypeDef = object
     ToolConfigurationTypeDef = object
+    ToolTypeDef = object
 
 
 class BedrockAugmentedLLM(AugmentedLLM[MessageUnionTypeDef, MessageUnionTypeDef]):
@@ -110,16 +114,9 @@ class BedrockAugmentedLLM(AugmentedLLM[MessageUnionTypeDef, MessageUnionTypeDef]
         response = await self.agent.list_tools(tool_filter=params.tool_filter)
 
         tool_config: ToolConfigurationTypeDef = {
-            "tools": [
-                {
-                    "toolSpec": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "inputSchema": {"json": tool.inputSchema},
-                    }
-                }
-                for tool in response.tools
-            ],
+            "tools": tool_schema_cache.compile_all(
+                "bedrock", response.tools, bedrock_tool_declaration
+            ),
             "toolChoice": {"auto": {}},
         }
 
@@ -589,3 +586,14 @@ def bedrock_content_to_mcp_content(
             )
 
     return mcp_content
+
+
+def bedrock_tool_declaration(tool: Tool) -> ToolTypeDef:
+    """Convert an MCP tool to a Bedrock Converse tool specification."""
+    return {
+        "toolSpec": {
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": {"json": tool.inputSchema},
+        }
+    }
@@ -1,4 +1,6 @@
-from typing import Type
+import asyncio
+import functools
+from typing import AsyncIterator, Literal, Type
 import base64
 
 from pydantic import BaseModel
@@ -14,6 +16,7 @@ from mcp.types import (
     TextContent,
     TextResourceContents,
     BlobResourceContents,
+    Tool,
 )
 
 from mcp_agent.config import GoogleSettings
@@ -30,6 +33,7 @@ from mcp_agent.workflows.llm.augmented_llm import (
     CallToolResult,
 )
 from mcp_agent.workflows.llm.multipart_converter_google import GoogleConverter
+from mcp_agent.workflows.llm.tool_schema_cache import tool_schema_cache
 from mcp_agent.tracing.token_tracking_decorator import track_tokens
 
 
@@ -89,42 +93,16 @@ class GoogleAugmentedLLM(
 
         messages.extend(GoogleConverter.convert_mixed_messages_to_google(message))
 
-        response = await self.agent.list_tools(tool_filter=params.tool_filter)
-
-        tools = [
-            types.Tool(
-                function_declarations=[
-                    types.FunctionDeclaration(
-                        name=tool.name,
-                        description=tool.description,
-                        parameters=transform_mcp_tool_schema(tool.inputSchema),
-                    )
-                ]
-            )
-            for tool in response.tools
-        ]
+        tools = await self._list_google_tools(params)
 
         responses: list[types.Content] = []
         model = await self.select_model(params)
 
         for i in range(params.max_iterations):
-            inference_config = types.GenerateContentConfig(
-                max_output_tokens=params.maxTokens,
-                temperature=params.temperature,
-                stop_sequences=params.stopSequences or [],
-                system_instruction=self.instruction or params.systemPrompt,
-                tools=tools,
-                automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                    disable=True
-                ),
-                candidate_count=1,
-                **(params.metadata or {}),
-            )
-
             arguments = {
                 "model": model,
                 "contents": messages,
-                "config": inference_config,
+                "config": self._inference_config(params, tools),
             }
 
             self.logger.debug("Completion request arguments:", data=arguments)
@@ -175,27 +153,8 @@ class GoogleAugmentedLLM(
                     f"Iteration {i}: Tool call results: {str(results) if results else 'None'}"
                 )
 
-                function_response_parts: list[types.Part] = []
-                for result in results:
-                    if (
-                        result
-                        and not isinstance(result, BaseException)
-                        and result.parts
-                    ):
-                        function_response_parts.extend(result.parts)
-                    else:
-                        self.logger.error(
-                            f"Warning: Unexpected error during tool execution: {result}. Continuing..."
-                        )
-                        function_response_parts.append(
-                            types.Part.from_text(text=f"Error executing tool: {result}")
-                        )
-
-                # Combine all parallel function responses into a single message
-                if function_response_parts:
-                    function_response_content = types.Content(
-                        role="tool", parts=function_response_parts
-                    )
+                function_response_content = self._combine_tool_results(results)
+                if function_response_content:
                     messages.append(function_response_content)
             else:
                 self.logger.debug(
@@ -210,6 +169,160 @@ class GoogleAugmentedLLM(
 
         return responses
 
+    async def generate_stream(
+        self, message, request_params: RequestParams | None = None
+    ) -> AsyncIterator["GoogleStreamEvent"]:
+        """
+        Same tool loop as generate(), but yields events while it runs: text deltas
+        as Gemini produces them, and tool_call_start / tool_call_end around each
+        tool execution. Ends with a single "done" event carrying the full text.
+
+        The completion is streamed straight from the google-genai client rather than
+        through the executor, so this is only available with the asyncio engine.
+        """
+        if self.context.config.execution_engine == "temporal":
+            raise NotImplementedError(
+                "generate_stream is not supported with the temporal execution engine"
+            )
+
+        messages: list[types.Content] = []
+        params = self.get_request_params(request_params)
+
+        if params.use_history:
+            messages.extend(self.history.get())
+
+        messages.extend(GoogleConverter.convert_mixed_messages_to_google(message))
+
+        tools = await self._list_google_tools(params)
+        model = await self.select_model(params)
+        client = create_google_client(self.context.config.google)
+        text_chunks: list[str] = []
+
+        try:
+            for i in range(params.max_iterations):
+                arguments = {
+                    "model": model,
+                    "contents": messages,
+                    "config": self._inference_config(params, tools),
+                }
+
+                self.logger.debug("Streaming completion request arguments:", data=arguments)
+                self._log_chat_progress(chat_turn=(len(messages) + 1) // 2, model=model)
+
+                # Function calls arrive as whole parts; text arrives in deltas
+                parts: list[types.Part] = []
+                finish_reason = None
+                stream = await client.aio.models.generate_content_stream(**arguments)
+                async for chunk in stream:
+                    if not chunk.candidates:
+                        continue
+                    candidate = chunk.candidates[0]
+                    finish_reason = candidate.finish_reason or finish_reason
+                    for part in (candidate.content.parts if candidate.content else None) or []:
+                        parts.append(part)
+                        if part.text and not part.thought:
+                            text_chunks.append(part.text)
+                            yield GoogleStreamEvent(type="text", text=part.text)
+
+                if not parts:
+                    break
+
+                messages.append(types.Content(role="model", parts=parts))
+
+                function_calls = [part.function_call for part in parts if part.function_call]
+                if not function_calls:
+                    self.logger.debug(
+                        f"Iteration {i}: Stopping because finish_reason is '{finish_reason}'"
+                    )
+                    break
+
+                for call in function_calls:
+                    yield GoogleStreamEvent(
+                        type="tool_call_start",
+                        tool_call_id=call.id,
+                        tool_name=call.name,
+                        arguments=dict(call.args or {}),
+                    )
+
+                # Run the calls in parallel, reporting each one as it finishes
+                tasks = {
+                    asyncio.ensure_future(self.execute_tool_call(call)): idx
+                    for idx, call in enumerate(function_calls)
+                }
+                results: list[types.Content | BaseException | None] = [None] * len(tasks)
+                pending = set(tasks)
+                try:
+                    while pending:
+                        done, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        for task in done:
+                            idx = tasks[task]
+                            results[idx] = task.exception() or task.result()
+                            call = function_calls[idx]
+                            yield GoogleStreamEvent(
+                                type="tool_call_end",
+                                tool_call_id=call.id,
+                                tool_name=call.name,
+                                is_error=_is_tool_error(results[idx]),
+                            )
+                finally:
+                    for task in pending:
+                        task.cancel()
+
+                function_response_content = self._combine_tool_results(results)
+                if function_response_content:
+                    messages.append(function_response_content)
+        finally:
+            if params.use_history:
+                self.history.set(messages)
+            self._log_chat_finished(model=model)
+
+        yield GoogleStreamEvent(type="done", text="".join(text_chunks))
+
+    async def _list_google_tools(self, params: RequestParams) -> list[types.Tool]:
+        response = await self.agent.list_tools(tool_filter=params.tool_filter)
+        # Schema transformation is recursive over every tool's inputSchema; do it once per tool
+        return tool_schema_cache.compile_all(
+            "google", response.tools, google_tool_declaration
+        )
+
+    def _inference_config(
+        self, params: RequestParams, tools: list[types.Tool]
+    ) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            max_output_tokens=params.maxTokens,
+            temperature=params.temperature,
+            stop_sequences=params.stopSequences or [],
+            system_instruction=self.instruction or params.systemPrompt,
+            tools=tools,
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(
+                disable=True
+            ),
+            candidate_count=1,
+            **(params.metadata or {}),
+        )
+
+    def _combine_tool_results(
+        self, results: list[types.Content | BaseException | None]
+    ) -> types.Content | None:
+        """Combine all parallel function responses into a single message"""
+        function_response_parts: list[types.Part] = []
+        for result in results:
+            if result and not isinstance(result, BaseException) and result.parts:
+                function_response_parts.extend(result.parts)
+            else:
+                self.logger.error(
+                    f"Warning: Unexpected error during tool execution: {result}. Continuing..."
+                )
+                function_response_parts.append(
+                    types.Part.from_text(text=f"Error executing tool: {result}")
+                )
+
+        if not function_response_parts:
+            return None
+        return types.Content(role="tool", parts=function_response_parts)
+
     async def generate_str(
         self,
         message,
@@ -350,6 +463,51 @@ class GoogleAugmentedLLM(
         return str(message.model_dump())
 
 
+class GoogleStreamEvent(BaseModel):
+    """An incremental event emitted by GoogleAugmentedLLM.generate_stream."""
+
+    type: Literal["text", "tool_call_start", "tool_call_end", "done"]
+    text: str | None = None
+    tool_call_id: str | None = None
+    tool_name: str | None = None
+    arguments: dict | None = None
+    is_error: bool | None = None
+
+
+def _is_tool_error(result: types.Content | BaseException | None) -> bool:
+    if result is None or isinstance(result, BaseException) or not result.parts:
+        return True
+    response = result.parts[0].function_response
+    return bool(response and response.response and "error" in response.response)
+
+
+def create_google_client(config: GoogleSettings | None) -> Client:
+    """
+    Return a shared client for these settings. Reusing the client keeps its
+    HTTP connection pool (and TLS sessions) warm across requests.
+    """
+    base_url = config.base_url if config else None
+    if config and config.vertexai:
+        return _cached_google_client(None, True, config.project, config.location, base_url)
+    return _cached_google_client(config.api_key if config else None, False, None, None, base_url)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_google_client(
+    api_key: str | None,
+    vertexai: bool,
+    project: str | None,
+    location: str | None,
+    base_url: str | None = None,
+) -> Client:
+    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+    if vertexai:
+        return Client(
+            vertexai=True, project=project, location=location, http_options=http_options
+        )
+    return Client(api_key=api_key, http_options=http_options)
+
+
 class RequestCompletionRequest(BaseModel):
     config: GoogleSettings
     payload: dict
@@ -374,14 +532,7 @@ class GoogleCompletionTasks:
         Request a completion from Google's API.
         """
 
-        if request.config and request.config.vertexai:
-            google_client = Client(
-                vertexai=request.config.vertexai,
-                project=request.config.project,
-                location=request.config.location,
-            )
-        else:
-            google_client = Client(api_key=request.config.api_key)
+        google_client = create_google_client(request.config)
 
         payload = request.payload
         response = google_client.models.generate_content(**payload)
@@ -518,6 +669,19 @@ class GoogleMCPTypeConverter(ProviderToMCPConverter[types.Content, types.Content
         return function_response_content
 
 
+def google_tool_declaration(tool: Tool) -> types.Tool:
+    """Convert an MCP tool to a Gemini tool with a single function declaration."""
+    return types.Tool(
+        function_declarations=[
+            types.FunctionDeclaration(
+                name=tool.name,
+                description=tool.description,
+                parameters=transform_mcp_tool_schema(tool.inputSchema),
+            )
+        ]
+    )
+
+
 def transform_mcp_tool_schema(schema: dict) -> dict:
     """Transform JSON Schema to OpenAPI Schema format compatible with Gemini.
 
@@ -33,6 +33,7 @@ from mcp.types import (
     ModelPreferences,
     TextContent,
     TextResourceContents,
+    Tool,
 )
 
 from mcp_agent.config import OpenAISettings
@@ -63,6 +64,7 @@ from mcp_agent.workflows.llm.augmented_llm import (
 )
 from mcp_agent.logging.logger import get_logger
 from mcp_agent.workflows.llm.multipart_converter_openai import OpenAIConverter
+from mcp_agent.workflows.llm.tool_schema_cache import tool_schema_cache
 
 
 class RequestCompletionRequest(BaseModel):
@@ -192,18 +194,11 @@ class OpenAIAugmentedLLM(
             response: ListToolsResult = await self.agent.list_tools(
                 tool_filter=params.tool_filter
             )
-            available_tools: List[ChatCompletionToolParam] = [
-                ChatCompletionToolParam(
-                    type="function",
-                    function={
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.inputSchema,
-                        # TODO: saqadri - determine if we should specify "strict" to True by default
-                    },
+            available_tools: List[ChatCompletionToolParam] = (
+                tool_schema_cache.compile_all(
+                    "openai", response.tools, openai_tool_declaration
                 )
-                for tool in response.tools
-            ]
+            )
 
             if self.context.tracing_enabled:
                 span.set_attribute(
@@ -1208,3 +1203,16 @@ def openai_content_to_mcp_content(
                 raise ValueError(f"Unexpected content type: {c['type']}")
 
     return mcp_content
+
+
+def openai_tool_declaration(tool: Tool) -> ChatCompletionToolParam:
+    """Convert an MCP tool to an OpenAI chat completions tool declaration."""
+    return ChatCompletionToolParam(
+        type="function",
+        function={
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.inputSchema,
+            # TODO: saqadri - determine if we should specify "strict" to True by default
+        },
+    )
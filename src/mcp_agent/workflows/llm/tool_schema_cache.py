@@ -0,0 +1,104 @@
+"""
+Cache of provider-specific tool declarations compiled from MCP tools.
+
+Each AugmentedLLM lists the agent's tools at the start of every generation and converts them
+into the declaration format its provider's API expects (for Gemini this includes rewriting
+the JSON schema). The result only depends on the tool, so it is compiled once per
+(provider, tool name, schema hash) and reused by every request and every LLM instance.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Tuple, TypeVar
+
+from mcp.types import Tool
+
+T = TypeVar("T")
+
+DEFAULT_MAX_SIZE = 2048
+
+
+def tool_schema_hash(tool: Tool) -> str:
+    """Hash of the parts of a tool, other than its name, that go into a declaration."""
+    payload = json.dumps(
+        {"description": tool.description, "inputSchema": tool.inputSchema},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolSchemaCache:
+    """
+    LRU cache of compiled tool declarations, keyed by (provider, tool name, schema hash).
+    Compiled declarations are shared between requests and must not be modified.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._declarations: OrderedDict[Tuple[str, str, str], Any] = OrderedDict()
+        # id(tool) -> (tool, schema hash) for frozen Tool objects (such as the FrozenTool views
+        # list_tools shares between calls), so they aren't serialized and hashed again on every request.
+        # Holding the tool keeps its id from being reused while the entry exists.
+        self._hashes: OrderedDict[int, Tuple[Tool, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, provider: str, tool: Tool, compile_fn: Callable[[Tool], T]) -> T:
+        """Return the declaration for a tool, calling compile_fn(tool) on a miss."""
+        key = (provider, tool.name, self._schema_hash(tool))
+
+        with self._lock:
+            declaration = self._declarations.get(key)
+            if declaration is not None:
+                self._declarations.move_to_end(key)
+                self.hits += 1
+                return declaration
+
+        declaration = compile_fn(tool)
+
+        with self._lock:
+            self.misses += 1
+            self._declarations[key] = declaration
+            while len(self._declarations) > self.max_size:
+                self._declarations.popitem(last=False)
+
+        return declaration
+
+    def compile_all(
+        self, provider: str, tools: Iterable[Tool], compile_fn: Callable[[Tool], T]
+    ) -> List[T]:
+        """Return the declarations for a list of tools, in order."""
+        return [self.compile(provider, tool, compile_fn) for tool in tools]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._declarations.clear()
+            self._hashes.clear()
+
+    def _schema_hash(self, tool: Tool) -> str:
+        if not tool.model_config.get("frozen", False):
+            return tool_schema_hash(tool)
+
+        with self._lock:
+            entry = self._hashes.get(id(tool))
+            if entry is not None and entry[0] is tool:
+                self._hashes.move_to_end(id(tool))
+                return entry[1]
+
+        digest = tool_schema_hash(tool)
+
+        with self._lock:
+            self._hashes[id(tool)] = (tool, digest)
+            while len(self._hashes) > self.max_size:
+                self._hashes.popitem(last=False)
+
+        return digest
+
+
+# Shared by all AugmentedLLM instances in the process
+tool_schema_cache = ToolSchemaCache()
@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+pytest.importorskip("mcp")
+
+from mcp.types import Tool  # noqa: E402
+
+from mcp_agent.config import MCPServerSettings  # noqa: E402
+from mcp_agent.mcp.capability_cache import (  # noqa: E402
+    CapabilityCache,
+    CapabilitySnapshot,
+    config_fingerprint,
+)
+
+
+def _snapshot(config_hash: str, version: str | None = "1.0", tool: str = "echo") -> CapabilitySnapshot:
+    return CapabilitySnapshot(
+        config_hash=config_hash,
+        server_version=version,
+        tools=[Tool(name=tool, inputSchema={"type": "object"})],
+    )
+
+
+def test_fingerprint_ignores_client_side_settings():
+    a = MCPServerSettings(name="s", command="python", args=["server.py"])
+    b = MCPServerSettings(name="s", command="python", args=["server.py"], allowed_tools={"echo"})
+    c = MCPServerSettings(name="s", command="python", args=["other.py"])
+    assert config_fingerprint(a) == config_fingerprint(b)
+    assert config_fingerprint(a) != config_fingerprint(c)
+    assert config_fingerprint(None) == ""
+
+
+def test_fingerprint_changes_when_stdio_script_changes(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text("print('v1')\n")
+    os.utime(script, ns=(1_000_000_000, 1_000_000_000))
+    config = MCPServerSettings(name="s", command="python", args=[str(script)])
+    before = config_fingerprint(config)
+    assert config_fingerprint(config) == before
+
+    # FastMCP 回報的 serverInfo.version 是 SDK 版本，改了 script 版本也不會變
+    script.write_text("print('v2')\n")
+    os.utime(script, ns=(2_000_000_000, 2_000_000_000))
+    assert config_fingerprint(config) != before
+
+
+def test_fingerprint_ignores_files_for_remote_servers(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text("")
+    config = MCPServerSettings(name="s", transport="sse", url="http://localhost/sse", args=[str(script)])
+    before = config_fingerprint(config)
+    os.utime(script, ns=(2_000_000_000, 2_000_000_000))
+    assert config_fingerprint(config) == before
+
+
+def test_get_checks_config_hash_and_version():
+    cache = CapabilityCache()
+    cache.put("s", _snapshot("h1", "1.0"))
+    assert cache.get("s", "h1") is not None
+    assert cache.get("s", "h1", "1.0") is not None
+    assert cache.get("s", "h1", "2.0") is None
+    assert cache.get("s", "h2") is None
+    assert cache.get("other", "h1") is None
+
+
+def test_invalidate_notifies_listeners():
+    cache = CapabilityCache()
+    seen = []
+    cache.add_listener(seen.append)
+    cache.put("a", _snapshot("h"))
+    cache.put("b", _snapshot("h"))
+
+    cache.invalidate("a")
+    assert cache.get("a", "h") is None
+    assert cache.get("b", "h") is not None
+
+    cache.invalidate()
+    assert cache.get("b", "h") is None
+    assert seen == ["a", None]
+
+    cache.remove_listener(seen.append)
+    cache.invalidate("a")
+    assert seen == ["a", None]
+
+
+def test_disabled_cache_stores_nothing_but_relays_invalidations():
+    cache = CapabilityCache(enabled=False)
+    seen = []
+    cache.add_listener(seen.append)
+    cache.put("s", _snapshot("h"))
+    assert cache.get("s", "h") is None
+    cache.invalidate("s")
+    assert seen == ["s"]
+
+
+def test_persisted_cache_survives_restart(tmp_path):
+    path = str(tmp_path / "caps" / "cache.json")
+    CapabilityCache(path).put("s", _snapshot("h", tool="lookup"))
+
+    restored = CapabilityCache(path).get("s", "h", "1.0")
+    assert [t.name for t in restored.tools] == ["lookup"]
+
+    CapabilityCache(path).invalidate("s")
+    assert CapabilityCache(path).get("s", "h") is None
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    assert CapabilityCache(str(path)).get("s", "h") is None
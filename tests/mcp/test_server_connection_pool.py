@@ -0,0 +1,217 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("mcp")
+
+from mcp_agent.config import MCPServerSettings  # noqa: E402
+from mcp_agent.mcp.mcp_connection_manager import (  # noqa: E402
+    FAILURE_PENALTY,
+    MAX_CONSECUTIVE_FAILURES,
+    MCPConnectionManager,
+    ServerConnection,
+    ServerConnectionPool,
+)
+
+
+def _config(min_size: int = 1, max_size: int = 1) -> MCPServerSettings:
+    return MCPServerSettings(
+        name="s", command="python", pool_min_size=min_size, pool_max_size=max_size
+    )
+
+
+def _conn(config: MCPServerSettings | None = None, healthy: bool = True) -> ServerConnection:
+    """A ServerConnection that never starts a transport; healthy means it has a session."""
+    conn = ServerConnection(
+        server_name="s",
+        server_config=config or _config(),
+        transport_context_factory=lambda: None,
+        client_session_factory=lambda *args: None,
+    )
+    if healthy:
+        conn.session = object()
+    return conn
+
+
+class FakeTaskGroup:
+    """Records start_soon calls instead of running them."""
+
+    def __init__(self):
+        self.started = []
+
+    def start_soon(self, func, *args):
+        self.started.append((func, args))
+
+
+class FakeRegistry:
+    registry = {}
+    init_hooks = {}
+
+
+def _manager(primary: ServerConnection) -> MCPConnectionManager:
+    manager = MCPConnectionManager(FakeRegistry())
+    manager._tg = FakeTaskGroup()
+
+    async def get_server(server_name, **kwargs):
+        return primary
+
+    manager.get_server = get_server
+    return manager
+
+
+def test_pick_prefers_fewest_outstanding():
+    async def main():
+        pool = ServerConnectionPool("s", 1, 3)
+        primary, a, b = _conn(), _conn(), _conn()
+        pool.extras = [a, b]
+        primary.outstanding, a.outstanding, b.outstanding = 2, 1, 0
+        assert pool.pick(primary) is b
+        b.outstanding = 3
+        assert pool.pick(primary) is a
+
+    asyncio.run(main())
+
+
+def test_pick_penalizes_failures_and_skips_unhealthy():
+    async def main():
+        pool = ServerConnectionPool("s", 1, 3)
+        primary, flaky, broken = _conn(), _conn(), _conn(healthy=False)
+        pool.extras = [flaky, broken]
+        primary.outstanding = FAILURE_PENALTY - 1
+        flaky.record_failure()
+        assert flaky.load_score() == FAILURE_PENALTY
+        assert broken.load_score() is None
+        assert pool.pick(primary) is primary
+
+        flaky.record_success()
+        assert pool.pick(primary) is flaky
+        assert pool.pick(None) is flaky
+
+    asyncio.run(main())
+
+
+def test_evict_unhealthy_shuts_down_failing_connections():
+    async def main():
+        pool = ServerConnectionPool("s", 1, 4)
+        good, broken, flaky = _conn(), _conn(healthy=False), _conn()
+        for _ in range(MAX_CONSECUTIVE_FAILURES):
+            flaky.record_failure()
+        pool.extras = [good, broken, flaky]
+        pool.evict_unhealthy()
+        assert pool.extras == [good]
+        assert broken._is_shutdown_requested_flag()
+        assert flaky._is_shutdown_requested_flag()
+        assert not good._is_shutdown_requested_flag()
+
+    asyncio.run(main())
+
+
+def test_lease_grows_only_when_busy_and_below_max():
+    async def main():
+        primary = _conn(_config(max_size=2))
+        manager = _manager(primary)
+        async with manager.lease("s") as first:
+            assert first is primary
+            assert manager._tg.started == []
+            # The only connection is busy: start one more in the background
+            async with manager.lease("s") as second:
+                assert second is primary
+                assert len(manager._tg.started) == 1
+                # Already at pool_max_size (one open, one starting)
+                async with manager.lease("s"):
+                    assert len(manager._tg.started) == 1
+        assert primary.outstanding == 0
+        assert manager.pools["s"].size() == 2
+
+    asyncio.run(main())
+
+
+def test_lease_starts_pool_min_size_on_first_use():
+    async def main():
+        primary = _conn(_config(min_size=3, max_size=4))
+        manager = _manager(primary)
+        async with manager.lease("s"):
+            assert len(manager._tg.started) == 2
+        async with manager.lease("s"):
+            assert len(manager._tg.started) == 2
+        assert manager.pools["s"].size() == 3
+
+    asyncio.run(main())
+
+
+def test_lease_without_pooling_uses_primary():
+    async def main():
+        primary = _conn()
+        manager = _manager(primary)
+        async with manager.lease("s") as conn:
+            assert conn is primary
+            assert conn.outstanding == 1
+        assert manager.pools == {}
+        assert manager._tg.started == []
+
+    asyncio.run(main())
+
+
+def test_grow_pool_adds_initialized_connection():
+    async def main():
+        primary = _conn(_config(max_size=2))
+        manager = _manager(primary)
+        pool = ServerConnectionPool("s", 1, 2)
+        pool.starting = 1
+        manager.pools["s"] = pool
+        extra = _conn()
+        extra._initialized_event.set()
+        manager._create_connection = lambda *args: extra
+
+        await manager._grow_pool(pool, None)
+        assert pool.extras == [extra]
+        assert pool.starting == 0
+        assert not extra._is_shutdown_requested_flag()
+
+    asyncio.run(main())
+
+
+def test_grow_pool_shuts_down_started_connection_on_error():
+    async def main():
+        primary = _conn(_config(max_size=2))
+        manager = _manager(primary)
+        pool = ServerConnectionPool("s", 1, 2)
+        pool.starting = 1
+        manager.pools["s"] = pool
+        extra = _conn()
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        extra.wait_for_initialized = fail
+        manager._create_connection = lambda *args: extra
+
+        await manager._grow_pool(pool, None)
+        # The lifecycle task was started, so the connection must be told to shut down
+        assert len(manager._tg.started) == 1
+        assert extra._is_shutdown_requested_flag()
+        assert pool.extras == []
+        assert pool.starting == 0
+
+    asyncio.run(main())
+
+
+def test_grow_pool_survives_create_failure():
+    async def main():
+        primary = _conn(_config(max_size=2))
+        manager = _manager(primary)
+        pool = ServerConnectionPool("s", 1, 2)
+        pool.starting = 1
+        manager.pools["s"] = pool
+
+        def fail(*args):
+            raise ValueError("no such server")
+
+        manager._create_connection = fail
+
+        await manager._grow_pool(pool, None)
+        assert manager._tg.started == []
+        assert pool.extras == []
+        assert pool.starting == 0
+
+    asyncio.run(main())
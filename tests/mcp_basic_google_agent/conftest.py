@@ -0,0 +1,7 @@
+# mcp_basic_google_agent 後端模組的單元測試。
+# 後端模組以扁平方式互相 import（from response_cache import ...），測試時把該目錄放進 sys.path。
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "mcp_basic_google_agent"))
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from response_cache import SemanticResponseCache, query_group  # noqa: E402
+
+SNAPSHOTS = {"esg": "v1", "labor": "v1", "ge": "v1"}
+
+
+class FakeEmbedder:
+    """每個問題都回傳同一個向量：任兩題的相似度都是 1，只剩分組決定能否命中。"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def embed(self, data):
+        self.calls += 1
+        return np.ones((len(data), 4), dtype=np.float32)
+
+
+def _cache(**kwargs) -> SemanticResponseCache:
+    return SemanticResponseCache(embedder=FakeEmbedder(), **kwargs)
+
+
+def test_query_group_excludes_company_codes_from_numbers():
+    assert query_group("2330 ２０２３ 年的薪資", ["2330"]) == (("2330",), ("2023",))
+    assert query_group("台積電薪資", ["2330", "2317"]) == (("2317", "2330"), ())
+
+
+def test_semantic_hit_within_same_company():
+    async def main():
+        cache = _cache()
+        await cache.store("台積電的 ESG 薪資", ["2330"], SNAPSHOTS, "answer")
+        assert await cache.lookup("台積電員工薪資如何", ["2330"], SNAPSHOTS) == "answer"
+        assert cache.stats()["semantic_hits"] == 1
+
+    asyncio.run(main())
+
+
+def test_different_companies_do_not_match():
+    async def main():
+        cache = _cache()
+        await cache.store("台積電的 ESG 薪資", ["2330"], SNAPSHOTS, "tsmc")
+        assert await cache.lookup("鴻海的 ESG 薪資", ["2317"], SNAPSHOTS) is None
+
+    asyncio.run(main())
+
+
+def test_without_entities_only_exact_text_matches():
+    async def main():
+        cache = _cache()
+        await cache.store("小明公司的薪資", [], SNAPSHOTS, "ming")
+        # 解析不出公司的問題都落在同一組，embedding 再像也不能互相命中
+        assert await cache.lookup("小華公司的薪資", [], SNAPSHOTS) is None
+        assert await cache.lookup("小明公司的薪資？", [], SNAPSHOTS) == "ming"
+        assert cache.stats()["semantic_hits"] == 0
+        assert cache.embedder.calls == 0
+
+    asyncio.run(main())
+
+
+def test_different_years_do_not_match():
+    async def main():
+        cache = _cache()
+        await cache.store("台積電 2023 年的薪資", ["2330"], SNAPSHOTS, "2023")
+        assert await cache.lookup("台積電 2024 年的薪資", ["2330"], SNAPSHOTS) is None
+        assert await cache.lookup("台積電 2023 年薪資多少", ["2330"], SNAPSHOTS) == "2023"
+
+    asyncio.run(main())
+
+
+def test_snapshot_change_invalidates():
+    async def main():
+        cache = _cache()
+        await cache.store("台積電的薪資", ["2330"], SNAPSHOTS, "old")
+        assert await cache.lookup("台積電的薪資", ["2330"], {**SNAPSHOTS, "esg": "v2"}) is None
+        stats = cache.stats()
+        assert stats["invalidations"] == 1
+        assert stats["entries"] == 0
+
+    asyncio.run(main())
+
+
+def test_lru_eviction():
+    async def main():
+        cache = _cache(max_entries=2)
+        for code in ("1101", "2317", "2330"):
+            await cache.store(f"{code} 的薪資", [code], SNAPSHOTS, code)
+        assert cache.stats()["entries"] == 2
+        assert await cache.lookup("1101 的薪資", ["1101"], SNAPSHOTS) is None
+        assert await cache.lookup("2330 的薪資", ["2330"], SNAPSHOTS) == "2330"
+
+    asyncio.run(main())
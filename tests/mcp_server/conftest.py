@@ -0,0 +1,31 @@
+# job-guardian MCP server 純 stdlib 模組的單元測試。
+# mcp_server 內的模組以扁平方式互相 import（from columnar import ...），測試時把該目錄放進 sys.path。
+
+import os
+import re
+import sys
+import unicodedata
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "mcp_server"))
+
+_SUFFIX_PAT = re.compile(r"(股份有?限公司|有限?公司|公司|Co\.?,?Ltd\.?)$")
+
+
+def _normalize_company_name(name: str) -> str:
+    """同 server.normalize_company_name（server.py 需要 mcp 套件，測試不直接 import）。"""
+    from resolver import fold_variants
+
+    if not name:
+        return ""
+    s = unicodedata.normalize("NFKC", str(name)).strip()
+    s = fold_variants(s)
+    s = re.sub(r"（.*?）|\(.*?\)", "", s)
+    s = re.sub(r"\s+", "", s)
+    return _SUFFIX_PAT.sub("", s)
+
+
+@pytest.fixture
+def normalize():
+    return _normalize_company_name
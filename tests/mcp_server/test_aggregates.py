@@ -0,0 +1,72 @@
+from aggregates import build_esg_summaries, build_violation_summaries, merge_violations, parse_number
+from columnar import ColumnarTable, parse_date, parse_int
+from company_index import DatasetIndex
+
+VIO_ROWS = [
+    {"事業單位名稱": "甲公司", "公告日期": "2023-03-01", "罰鍰金額": "20,000", "違反法條": "第24條"},
+    {"事業單位名稱": "乙公司", "公告日期": "2024-01-15", "罰鍰金額": "50000", "違反法條": "第32條"},
+    {"事業單位名稱": "甲公司", "公告日期": "2024-07-09", "罰鍰金額": "", "違反法條": "第24條"},
+    {"事業單位名稱": "甲公司", "公告日期": "", "罰鍰金額": "10000", "違反法條": "第30條"},
+]
+
+ESG_ROWS = [
+    {"公司名稱": "甲", "公司代號": "1111", "年度": "2022", "產業別": "半導體", "員工薪資中位數": "900"},
+    {"公司名稱": "甲", "公司代號": "1111", "年度": "2023", "產業別": "半導體", "員工薪資中位數": "1,000"},
+    {"公司名稱": "乙", "公司代號": "2222", "年度": "2023", "產業別": "半導體", "員工薪資中位數": "800"},
+    {"公司名稱": "丙", "公司代號": "3333", "年度": "2023", "產業別": "半導體", "員工薪資中位數": ""},
+    {"公司名稱": "丁", "公司代號": "4444", "年度": "2023", "產業別": "食品", "員工薪資中位數": "700"},
+]
+
+
+def _violations(normalize):
+    table = ColumnarTable.from_rows(VIO_ROWS, {"公告日期": parse_date, "罰鍰金額": parse_int})
+    index = DatasetIndex.build((table.pick(i, "事業單位名稱") for i in range(len(table))), normalize)
+    summaries = build_violation_summaries(table, index, ("公告日期",), ("罰鍰金額",), ("違反法條",))
+    return index, summaries
+
+
+def test_parse_number():
+    assert parse_number("1,234") == 1234.0
+    assert parse_number("27.03%") == 27.03
+    assert parse_number("") is None
+    assert parse_number("N/A") is None
+
+
+def test_violation_summary_per_company(normalize):
+    index, summaries = _violations(normalize)
+    (nid,) = index.match_names("甲公司", partial=False)
+    summary = summaries[nid].to_dict()
+    assert summary["count"] == 3
+    assert summary["total_fine"] == 30000
+    assert summary["count_by_year"] == {"2023": 1, "2024": 1}
+    assert summary["top_articles"][0] == {"法條": "第24條", "count": 2}
+    assert summary["latest_date"] == "20240709"
+
+
+def test_merge_violations_combines_matched_names(normalize):
+    index, summaries = _violations(normalize)
+    merged = merge_violations(summaries, index.match_names("公司", partial=True)).to_dict()
+    assert merged["count"] == 4
+    assert merged["total_fine"] == 80000
+    assert merged["count_by_year"] == {"2023": 1, "2024": 2}
+    assert merge_violations(summaries, []).to_dict()["count"] == 0
+
+
+def test_esg_summary_uses_latest_year_and_industry_percentiles(normalize):
+    table = ColumnarTable.from_rows(ESG_ROWS, {"年度": parse_int})
+    index = DatasetIndex.build((table.pick(i, "公司名稱") for i in range(len(table))), normalize)
+    summaries = build_esg_summaries(
+        table, index, ("年度",), ("公司代號",), ("產業別",), {"員工薪資中位數": ("員工薪資中位數",)}
+    )
+    by_name = {s.name: s.to_dict() for s in summaries.values()}
+
+    first = by_name["甲"]
+    assert first["年度"] == 2023
+    assert first["員工薪資中位數"] == 1000.0
+    # 同產業、同年度有值的公司：甲 1000、乙 800
+    assert first["percentile"]["員工薪資中位數"] == 100.0
+    assert by_name["乙"]["percentile"]["員工薪資中位數"] == 50.0
+    assert by_name["丙"]["percentile"]["員工薪資中位數"] is None
+    assert first["peer_group"] == "半導體"
+    assert first["peer_count"] == 2
+    assert by_name["丁"]["peer_count"] == 1
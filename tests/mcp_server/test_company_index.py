@@ -0,0 +1,86 @@
+from company_index import DatasetIndex, NameIndex, edit_distance
+
+
+ROWS = [
+    "台灣積體電路製造股份有限公司",
+    "鴻海精密工業股份有限公司",
+    "台灣積體電路製造股份有限公司",
+    "",
+    "中華電信股份有限公司",
+    "Acer Inc.",
+]
+
+
+def test_edit_distance_is_bounded():
+    assert edit_distance("中華電信", "中華電信", 1) == 0
+    assert edit_distance("中華電視", "中華電信", 1) == 1
+    assert edit_distance("中華電視台", "中華電信", 1) is None
+
+
+def test_edit_distance_partial_matches_any_substring():
+    assert edit_distance("積體電路", "台灣積體電路製造", 0, partial=True) == 0
+    assert edit_distance("積休電路", "台灣積體電路製造", 1, partial=True) == 1
+
+
+def test_name_ids_are_stable_and_deduplicated(normalize):
+    names = NameIndex(normalize)
+    a = names.add("鴻海精密工業股份有限公司")
+    assert names.add("鴻海精密工業股份有限公司") == a
+    assert names.add("中華電信股份有限公司") != a
+    assert len(names) == 2
+
+
+def test_build_groups_rows_by_name(normalize):
+    index = DatasetIndex.build(ROWS, normalize)
+    tsmc = index.match_names("台灣積體電路製造股份有限公司", partial=False)
+    assert len(tsmc) == 1
+    assert index.rows_for(tsmc) == [0, 2]
+
+
+def test_exact_match_uses_normalized_name(normalize):
+    index = DatasetIndex.build(ROWS, normalize)
+    # 尾綴、大小寫不影響精確比對
+    assert index.rows_for(index.match_names("中華電信", partial=False)) == [4]
+    assert index.rows_for(index.match_names("acer inc.", partial=False)) == [5]
+    assert index.match_names("中華", partial=False) == []
+
+
+def test_case_sensitive_exact_match(normalize):
+    index = DatasetIndex.build(ROWS, normalize, case_sensitive=True)
+    assert index.match_names("acer inc.", partial=False) == []
+    assert index.rows_for(index.match_names("Acer Inc.", partial=False)) == [5]
+
+
+def test_partial_match_uses_substrings(normalize):
+    index = DatasetIndex.build(ROWS, normalize)
+    assert index.rows_for(index.match_names("積體電路", partial=True)) == [0, 2]
+    assert index.rows_for(index.match_names("精密", partial=True)) == [1]
+    assert index.match_names("聯發科", partial=True) == []
+
+
+def test_empty_partial_query_matches_everything(normalize):
+    index = DatasetIndex.build(ROWS, normalize)
+    assert index.rows_for(index.match_names("", partial=True)) == [0, 1, 2, 4, 5]
+
+
+def test_fuzzy_names_tolerates_typos(normalize):
+    index = DatasetIndex.build(ROWS, normalize)
+    hits = dict(index.fuzzy_names(normalize("鴻海精蜜工業"), 1))
+    nid = index.match_names("鴻海精密工業", partial=False)[0]
+    assert hits == {nid: 1}
+
+
+def test_rebuild_reuses_previous_name_index(normalize):
+    first = DatasetIndex.build(ROWS, normalize)
+    second = DatasetIndex.build(ROWS[:2], normalize, previous=first)
+    assert second.names is first.names
+    # 已不在新版資料中的名稱查不到
+    assert second.match_names("中華電信", partial=False) == []
+    assert second.rows_for(second.match_names("鴻海精密工業", partial=False)) == [1]
+
+
+def test_rebuild_drops_name_index_with_many_dead_names(normalize):
+    first = DatasetIndex.build([f"公司{i}" for i in range(10)], normalize)
+    second = DatasetIndex.build(["公司0"], normalize, previous=first)
+    assert second.names is not first.names
+    assert len(second.names) == 1
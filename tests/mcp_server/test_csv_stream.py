@@ -0,0 +1,102 @@
+import codecs
+import csv
+import io
+
+import pytest
+
+from columnar import parse_int
+from csv_stream import StreamingCsvParser, parse_csv_bytes, sniff_encoding
+
+
+def _expected(text: str):
+    """csv.DictReader 一次讀完整份文字的結果（TableBuilder 會去掉前後空白、缺欄補空字串）。"""
+    return [{k: (v or "").strip() for k, v in row.items()} for row in csv.DictReader(io.StringIO(text))]
+
+
+def _rows(table):
+    return [table.row(i) for i in range(len(table))]
+
+
+CASES = [
+    "name,date,fine\n台積電,2023-01-02,1000\n鴻海,2024-05-06,2000\n",
+    'name,note\n"multi\nline, with ""quotes""",ok\nb,c\n',
+    "a,b\r\n1,2\r\n\r\n3,4",
+    "公司,年\n台積電,2023\n\"多\n行\",2024\n",
+    'name,date,fine\nab"c,2020,1\nx,2021,2\n',
+]
+
+
+@pytest.mark.parametrize("text", CASES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_matches_csv_reader_for_any_chunking(text, chunk_size):
+    table = parse_csv_bytes(text.encode("utf-8"), chunk_size=chunk_size)
+    assert _rows(table) == _expected(text)
+
+
+def test_quote_inside_unquoted_field_does_not_swallow_following_records():
+    parser = StreamingCsvParser()
+    for chunk in (b'name,date,fine\nab"c,20', b"20,1\nx,2021,2\n"):
+        parser.feed(chunk)
+    table = parser.close()
+    assert _rows(table) == [
+        {"name": 'ab"c', "date": "2020", "fine": "1"},
+        {"name": "x", "date": "2021", "fine": "2"},
+    ]
+    assert parser.bad_records == 0
+
+
+def test_malformed_records_are_skipped_and_counted():
+    # 欄位中間的 \r 會讓 csv.reader 丟出 csv.Error
+    parser = StreamingCsvParser()
+    parser.feed(b"a,b\nx\ry,1\nz,2\n")
+    table = parser.close()
+    assert _rows(table) == [{"a": "z", "b": "2"}]
+    assert parser.bad_records == 1
+
+
+def test_oversized_quoted_field_is_skipped():
+    body = b'a,b\n"' + b"x" * (csv.field_size_limit() + 10) + b"\n1,2\n"
+    parser = StreamingCsvParser()
+    for start in range(0, len(body), 4096):
+        parser.feed(body[start : start + 4096])
+    table = parser.close()
+    assert parser.bad_records == 1
+    assert _rows(table) == [{"a": "1", "b": "2"}]
+
+
+def test_unterminated_quote_at_end_of_file_keeps_remaining_text():
+    table = parse_csv_bytes(b'a,b\n"unterminated,x\ny,z\n', chunk_size=3)
+    assert _rows(table) == [{"a": "unterminated,x\ny,z", "b": ""}]
+
+
+def test_big5_body_is_detected_after_ascii_header():
+    text = "name,city\n台灣積體電路,新竹市\n"
+    body = text.encode("cp950")
+    parser = StreamingCsvParser()
+    for start in range(0, len(body), 5):
+        parser.feed(body[start : start + 5])
+    table = parser.close()
+    assert parser.encoding == "cp950"
+    assert _rows(table) == _expected(text)
+
+
+def test_utf8_bom_is_stripped():
+    table = parse_csv_bytes(codecs.BOM_UTF8 + "公司,年\n台積電,2023\n".encode("utf-8"), chunk_size=2)
+    assert table.headers == ["公司", "年"]
+
+
+def test_sniff_encoding():
+    assert sniff_encoding(codecs.BOM_UTF8 + b"a") == "utf-8-sig"
+    assert sniff_encoding("台積電".encode("utf-8")) == "utf-8"
+    assert sniff_encoding("台積電".encode("cp950")) == "cp950"
+
+
+def test_int_columns_are_parsed():
+    table = parse_csv_bytes(b"name,fine\na,1000\nb,\n", {"fine": parse_int})
+    assert table.pick_int(0, "fine") == 1000
+    assert table.pick_int(1, "fine") is None
+
+
+def test_empty_body():
+    table = StreamingCsvParser().close()
+    assert len(table) == 0
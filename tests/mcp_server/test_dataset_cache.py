@@ -0,0 +1,234 @@
+import asyncio
+import time
+
+import pytest
+
+import dataset_cache
+import snapshot_store
+from columnar import ColumnarTable
+from dataset_cache import DatasetCache, FetchResult
+
+URL = "https://example.com/dataset.csv"
+
+
+def _table(value: str) -> ColumnarTable:
+    return ColumnarTable.from_rows([{"公司名稱": value}])
+
+
+class FakeFetcher:
+    """依序回傳 results；gate 設定時每次下載都等 gate 放行。"""
+
+    def __init__(self, *results: FetchResult, gate: asyncio.Event = None):
+        self.results = list(results)
+        self.calls = []
+        self.gate = gate
+
+    async def __call__(self, url, etag, last_modified):
+        self.calls.append((url, etag, last_modified))
+        if self.gate is not None:
+            await self.gate.wait()
+        else:
+            await asyncio.sleep(0)
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+async def _settle(cache: DatasetCache) -> None:
+    """等背景刷新 task 跑完。"""
+    while cache._tasks:
+        await asyncio.gather(*list(cache._tasks))
+
+
+def test_concurrent_cold_gets_fetch_once():
+    async def main():
+        fetcher = FakeFetcher(FetchResult(_table("甲"), etag="e1"))
+        cache = DatasetCache(fetcher)
+        entries = await asyncio.gather(*(cache.get(URL) for _ in range(20)))
+        assert len(fetcher.calls) == 1
+        assert all(e is entries[0] for e in entries)
+        assert entries[0].table.pick(0, "公司名稱") == "甲"
+        assert entries[0].etag == "e1"
+
+    asyncio.run(main())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def main():
+        gate = asyncio.Event()
+        fetcher = FakeFetcher(FetchResult(_table("舊"), etag="e1"), FetchResult(_table("新"), etag="e2"))
+        cache = DatasetCache(fetcher, ttl=60)
+        entry = await cache.get(URL)
+        entry.fetched_at -= 120  # 過期
+
+        fetcher.gate = gate
+        served = [await cache.get(URL) for _ in range(5)]
+        for _ in range(10):  # 讓背景刷新 task 跑到等 gate
+            await asyncio.sleep(0)
+        assert all(e.table.pick(0, "公司名稱") == "舊" for e in served)
+        assert entry.refreshing
+        assert len(fetcher.calls) == 2  # 冷啟動 1 次 + 背景刷新 1 次
+        assert fetcher.calls[1][1] == "e1"  # 條件式請求帶上 ETag
+
+        gate.set()
+        await _settle(cache)
+        assert not entry.refreshing
+        assert entry.table.pick(0, "公司名稱") == "新"
+        assert entry.etag == "e2"
+        assert entry.age() < 60
+
+    asyncio.run(main())
+
+
+def test_not_modified_only_bumps_fetched_at():
+    async def main():
+        fetcher = FakeFetcher(
+            FetchResult(_table("甲"), etag="e1", last_modified="Mon"),
+            FetchResult(None, etag="e1", last_modified="Mon", not_modified=True),
+        )
+        cache = DatasetCache(fetcher, ttl=60)
+        entry = await cache.get(URL)
+        data = entry.data
+        entry.fetched_at -= 120
+
+        await cache.get(URL)
+        await _settle(cache)
+        assert entry.data is data
+        assert (entry.etag, entry.last_modified) == ("e1", "Mon")
+        assert entry.age() < 60
+        assert entry.last_error is None
+
+    asyncio.run(main())
+
+
+def test_failed_refresh_keeps_old_data():
+    async def main():
+        calls = []
+
+        async def fetcher(url, etag, last_modified):
+            calls.append(url)
+            if len(calls) > 1:
+                raise RuntimeError("來源網站掛了")
+            return FetchResult(_table("甲"))
+
+        cache = DatasetCache(fetcher, ttl=60)
+        entry = await cache.get(URL)
+        entry.fetched_at -= 120
+        await cache.get(URL)
+        await _settle(cache)
+        assert entry.table.pick(0, "公司名稱") == "甲"
+        assert "來源網站掛了" in entry.last_error
+
+    asyncio.run(main())
+
+
+def test_memory_only_entries_are_tagged_by_content():
+    async def main():
+        first = await DatasetCache(FakeFetcher(FetchResult(_table("甲")))).get(URL)
+        second = await DatasetCache(FakeFetcher(FetchResult(_table("甲")))).get(URL)
+        other = await DatasetCache(FakeFetcher(FetchResult(_table("乙")))).get(URL)
+        assert first.version is None
+        assert first.data.digest == second.data.digest != other.data.digest
+
+    asyncio.run(main())
+
+
+def test_cold_start_loads_snapshot_from_disk(tmp_path):
+    async def main():
+        await DatasetCache(FakeFetcher(FetchResult(_table("甲"), etag="e1")), cache_dir=str(tmp_path)).get(URL)
+
+        fetcher = FakeFetcher(FetchResult(_table("不該下載")))
+        entry = await DatasetCache(fetcher, cache_dir=str(tmp_path)).get(URL)
+        assert fetcher.calls == []
+        assert entry.table.pick(0, "公司名稱") == "甲"
+        assert entry.etag == "e1"
+        assert entry.version is not None
+
+    asyncio.run(main())
+
+
+def test_refresh_adopts_newer_snapshot_from_another_process(tmp_path):
+    async def main():
+        a = DatasetCache(FakeFetcher(FetchResult(_table("舊"))), ttl=60, cache_dir=str(tmp_path))
+        entry = await a.get(URL)
+        entry.fetched_at -= 120
+
+        # 另一個行程已下載並寫好新版快照
+        snapshot_store.SnapshotStore(str(tmp_path)).save(URL, _table("新"), etag="e2", fetched_at=time.time())
+
+        fetcher = FakeFetcher(FetchResult(_table("不該下載")))
+        a.fetcher = fetcher
+        await a.get(URL)
+        await _settle(a)
+        assert fetcher.calls == []
+        assert entry.table.pick(0, "公司名稱") == "新"
+        assert entry.etag == "e2"
+
+    asyncio.run(main())
+
+
+@pytest.mark.skipif(snapshot_store.fcntl is None, reason="需要 flock")
+def test_refresh_backs_off_while_another_process_holds_the_lock(tmp_path):
+    async def main():
+        fetcher = FakeFetcher(FetchResult(_table("甲")))
+        cache = DatasetCache(fetcher, ttl=60, cache_dir=str(tmp_path))
+        entry = await cache.get(URL)
+        entry.fetched_at -= 120
+
+        # flock 以開啟的檔案為單位：另開一次就等同其他行程持有刷新鎖
+        with snapshot_store.SnapshotStore(str(tmp_path)).refresh_lock(URL) as held:
+            assert held
+            await cache.get(URL)
+            await _settle(cache)
+            assert len(fetcher.calls) == 1
+            # 記下這次嘗試：之後的 get 不會每次都再排一次刷新
+            assert entry.age() < 60
+            await cache.get(URL)
+            assert not cache._tasks
+
+    asyncio.run(main())
+
+
+@pytest.mark.skipif(snapshot_store.fcntl is None, reason="需要 flock")
+def test_cold_start_waits_for_the_lock_holder_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, "LOCK_POLL_INTERVAL", 0.01)
+
+    async def main():
+        store = snapshot_store.SnapshotStore(str(tmp_path))
+        fetcher = FakeFetcher(FetchResult(_table("不該下載")))
+        cache = DatasetCache(fetcher, cache_dir=str(tmp_path))
+
+        with store.refresh_lock(URL) as held:
+            assert held
+            loading = asyncio.create_task(cache.get(URL))
+            await asyncio.sleep(0.05)
+            assert not loading.done()
+            store.save(URL, _table("甲"), fetched_at=time.time())
+
+        entry = await asyncio.wait_for(loading, 5)
+        assert fetcher.calls == []
+        assert entry.table.pick(0, "公司名稱") == "甲"
+
+    asyncio.run(main())
+
+
+def test_get_snapshot_requires_cache_dir():
+    async def main():
+        cache = DatasetCache(FakeFetcher(FetchResult(_table("甲"))))
+        with pytest.raises(ValueError):
+            await cache.get(URL, "2024-01-01")
+
+    asyncio.run(main())
+
+
+def test_get_snapshot_by_date(tmp_path):
+    async def main():
+        store = snapshot_store.SnapshotStore(str(tmp_path))
+        old = store.save(URL, _table("舊"), fetched_at=1_700_000_000)  # 2023-11-14
+        store.save(URL, _table("新"), fetched_at=1_700_172_800)  # 2023-11-16
+
+        cache = DatasetCache(FakeFetcher(FetchResult(_table("不該下載"))), ttl=1e12, cache_dir=str(tmp_path))
+        entry = await cache.get(URL, "2023-11-15")
+        assert entry.version == old
+        assert entry.table.pick(0, "公司名稱") == "舊"
+        assert (await cache.get(URL)).table.pick(0, "公司名稱") == "新"
+
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import pytest
+
+from columnar import ColumnarTable
+from payload import RAW_KEY, View, decode_cursor, encode_cursor
+
+TABLE = ColumnarTable.from_rows([{"事業單位名稱": "甲公司", "處分字號": "勞字第1號", "罰鍰金額": "20000"}])
+ITEM = {"事業單位名稱": "甲公司", "罰鍰金額": "20000", "違反法條": None, "備註": ""}
+
+
+def test_compact_drops_empty_fields():
+    assert View("compact").shape(ITEM, TABLE, 0) == {"事業單位名稱": "甲公司", "罰鍰金額": "20000"}
+
+
+def test_standard_keeps_all_extracted_fields():
+    assert View("standard").shape(ITEM, TABLE, 0) == ITEM
+
+
+def test_full_adds_raw_row():
+    shaped = View("full").shape(ITEM, TABLE, 0)
+    assert shaped[RAW_KEY] == TABLE.row(0)
+
+
+def test_fields_select_extracted_and_raw_columns():
+    view = View("compact", ["罰鍰金額", "處分字號", "不存在", ""])
+    assert view.shape(ITEM, TABLE, 0) == {"罰鍰金額": "20000", "處分字號": "勞字第1號"}
+
+
+def test_invalid_verbosity():
+    with pytest.raises(ValueError):
+        View("verbose")
+
+
+@pytest.mark.parametrize("version", ["20250101T000000Z-abcdef12", "0f24702aa9e9df090db139166e0ba04ef59768b3", None])
+def test_cursor_round_trip(version):
+    cursor = encode_cursor(version, 40, '["labor_violations", "甲公司", null]')
+    assert decode_cursor(cursor, '["labor_violations", "甲公司", null]') == (version, 40)
+
+
+def test_cursor_rejects_other_query():
+    cursor = encode_cursor("v1", 20, '["esg_hr", "甲公司", null]')
+    with pytest.raises(ValueError, match="查詢條件不符"):
+        decode_cursor(cursor, '["esg_hr", "乙公司", null]')
+
+
+def test_cursor_rejects_garbage():
+    with pytest.raises(ValueError, match="無效的 cursor"):
+        decode_cursor("not-a-cursor", "key")
@@ -0,0 +1,118 @@
+import pytest
+
+from columnar import ColumnarTable
+from company_index import DatasetIndex
+from resolver import AliasTable, find_codes, find_companies, fold_variants, load_alias_file, resolve
+
+NAMES = [
+    "中華電信股份有限公司",
+    "中華航空股份有限公司",
+    "台灣大哥大股份有限公司",
+    "台灣積體電路製造股份有限公司",
+    "中鋼股份有限公司",
+]
+
+ESG_ROWS = [
+    {"公司代號": "2412", "公司名稱": "中華電信股份有限公司", "英文簡稱": "CHT"},
+    {"公司代號": "2330", "公司名稱": "台灣積體電路製造股份有限公司", "英文簡稱": "TSMC"},
+    {"公司代號": "2002", "公司名稱": "中鋼股份有限公司", "英文簡稱": "CSC"},
+]
+
+# server._match 只自動採用這兩種比對方式，其餘候選需使用者確認
+AUTO_MATCHES = ("exact", "alias")
+
+
+@pytest.fixture
+def index(normalize):
+    return DatasetIndex.build(NAMES, normalize)
+
+
+@pytest.fixture
+def aliases(normalize):
+    table = ColumnarTable.from_rows(ESG_ROWS)
+    return AliasTable.build(table, normalize, ("公司代號",), ("公司名稱",), ("英文簡稱",))
+
+
+def _names(index, nids):
+    return sorted(index.names.names[nid] for nid in nids)
+
+
+def test_fold_variants():
+    assert fold_variants("台积电") == "台積電"
+    assert fold_variants("臺灣") == "台灣"
+
+
+def test_alias_table_maps_codes_and_names(aliases):
+    assert aliases.code_of("2330") == "2330"
+    assert aliases.code_of("tsmc") == "2330"
+    assert aliases.code_of("台灣積體電路製造") == "2330"
+    assert aliases.code_of("聯發科") is None
+    assert aliases.expand("TSMC") == ["台灣積體電路製造股份有限公司"]
+
+
+@pytest.mark.parametrize("query", ["2330", "TSMC", "tsmc"])
+def test_codes_and_english_names_resolve_as_alias(index, aliases, query):
+    (top,) = resolve(index, query, aliases)
+    assert top.name == "台灣積體電路製造股份有限公司"
+    assert top.match == "alias"
+    assert top.score == 1.0
+
+
+@pytest.mark.parametrize(
+    "query, near",
+    [
+        ("中華電視", "中華電信股份有限公司"),
+        ("中華航運", "中華航空股份有限公司"),
+        ("台灣大學", "台灣大哥大股份有限公司"),
+    ],
+)
+def test_similar_names_are_only_fuzzy_candidates(index, aliases, query, near):
+    candidates = resolve(index, query, aliases)
+    assert candidates[0].name == near
+    assert all(c.match not in AUTO_MATCHES for c in candidates)
+
+
+def test_typo_within_distance_is_found(index, aliases):
+    candidates = resolve(index, "台灣積休電路製造", aliases)
+    assert candidates[0].name == "台灣積體電路製造股份有限公司"
+    assert candidates[0].match == "fuzzy"
+    assert candidates[0].distance == 1
+
+
+def test_short_queries_are_not_fuzzy_matched(index, aliases):
+    assert resolve(index, "華視", aliases) == []
+
+
+def test_candidates_are_ranked_and_limited(index, aliases):
+    candidates = resolve(index, "中華", aliases, limit=1)
+    assert len(candidates) == 1
+    assert candidates[0].match == "substring"
+
+
+def test_find_companies_prefers_longer_names(normalize):
+    index = DatasetIndex.build(["中華電信股份有限公司", "中華"], normalize)
+    assert _names(index, find_companies(index, "中華電信和台積電哪個好")) == ["中華電信股份有限公司"]
+
+
+@pytest.mark.parametrize(
+    "text, codes",
+    [
+        ("2330 薪水多少", ["2330"]),
+        ("台積電 2023 年和 2024年的薪水", []),
+        ("2025 年有沒有違規", []),
+        ("股票代號 2002 的違規紀錄", ["2002"]),
+        ("代碼：2002", ["2002"]),
+        ("中鋼(2002) 和中鋼（2002）", ["2002"]),
+        ("2002.TW 的薪水", ["2002"]),
+        ("tsmc 2002 年", ["2330"]),
+    ],
+)
+def test_find_codes_ignores_bare_years(aliases, text, codes):
+    assert find_codes(aliases, text) == codes
+
+
+def test_load_alias_file(tmp_path):
+    path = tmp_path / "aliases.csv"
+    path.write_text("code,alias\n2330,台積電,TSMC\n,skipped\n", encoding="utf-8")
+    assert load_alias_file(str(path)) == [("2330", "台積電", "TSMC")]
+    assert load_alias_file(str(tmp_path / "missing.csv")) == []
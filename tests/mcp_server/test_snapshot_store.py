@@ -0,0 +1,93 @@
+import pytest
+
+import snapshot_store
+from columnar import ColumnarTable, parse_date, parse_int
+from snapshot_store import SnapshotStore, table_digest
+
+URL = "https://example.com/dataset.csv"
+PARSERS = {"公告日期": parse_date, "罰鍰金額": parse_int}
+
+
+def _table(n: int = 3) -> ColumnarTable:
+    rows = [
+        {"事業單位名稱": f"公司{i % 2}", "公告日期": f"2024-01-0{i + 1}", "罰鍰金額": str(1000 * i)}
+        for i in range(n)
+    ]
+    return ColumnarTable.from_rows(rows, PARSERS)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    table = _table()
+    version = store.save(URL, table, etag='"abc"', last_modified="Mon", fetched_at=1_700_000_000)
+
+    loaded, header = store.load(URL, version, PARSERS)
+    assert loaded.rows() == table.rows()
+    assert loaded.pick_int(2, "罰鍰金額") == 2000
+    assert loaded.pick_int(0, "公告日期") == 20240101
+    assert header["etag"] == '"abc"'
+
+    state = store.state(URL)
+    assert state.version == version
+    assert state.fetched_at == 1_700_000_000
+    assert version.startswith("20231114T")
+
+
+def test_unchanged_content_keeps_version(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first = store.save(URL, _table(), fetched_at=1_700_000_000)
+    second = store.save(URL, _table(), etag="new", fetched_at=1_700_086_400)
+    assert second == first
+    assert store.versions(URL) == [first]
+    assert store.state(URL).etag == "new"
+
+
+def test_touch_updates_validation_only(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    version = store.save(URL, _table(), etag="a", fetched_at=1)
+    store.touch(URL, "b", "Tue", 2)
+    state = store.state(URL)
+    assert (state.version, state.etag, state.last_modified, state.fetched_at) == (version, "b", "Tue", 2)
+
+
+def test_old_versions_are_pruned(tmp_path):
+    store = SnapshotStore(str(tmp_path), keep=2)
+    versions = [store.save(URL, _table(n), fetched_at=1_700_000_000 + 86_400 * n) for n in range(1, 5)]
+    assert store.versions(URL) == versions[-2:]
+
+
+def test_resolve_by_id_prefix_and_date(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    v1 = store.save(URL, _table(1), fetched_at=1_700_000_000)  # 2023-11-14
+    v2 = store.save(URL, _table(2), fetched_at=1_700_172_800)  # 2023-11-16
+
+    assert store.resolve(URL, v1) == v1
+    assert store.resolve(URL, v2[:12]) == v2
+    assert store.resolve(URL, "2023-11-15") == v1
+    assert store.resolve(URL, "20231116") == v2
+    assert store.resolve(URL, "2023-11-01") is None
+    assert store.resolve(URL, "not-a-version") is None
+
+
+def test_table_digest_depends_only_on_content():
+    assert table_digest(_table()) == table_digest(_table())
+    assert table_digest(_table()) != table_digest(_table(2))
+
+
+def test_digest_matches_snapshot_version(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    table = _table()
+    store.save(URL, table)
+    assert store.state(URL).sha1 == table_digest(table)
+
+
+@pytest.mark.skipif(snapshot_store.fcntl is None, reason="需要 flock")
+def test_refresh_lock_is_exclusive(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    with store.refresh_lock(URL) as first:
+        assert first
+        # flock 以開啟的檔案為單位：同一行程另外開檔也拿不到
+        with store.refresh_lock(URL) as second:
+            assert not second
+    with store.refresh_lock(URL) as again:
+        assert again
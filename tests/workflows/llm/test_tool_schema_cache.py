@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("mcp")
+
+from mcp.types import Tool  # noqa: E402
+from pydantic import ConfigDict  # noqa: E402
+
+from mcp_agent.workflows.llm.tool_schema_cache import ToolSchemaCache, tool_schema_hash  # noqa: E402
+
+
+class FrozenTool(Tool):
+    model_config = ConfigDict(frozen=True)
+
+
+def _tool(name: str = "search", description: str = "Search", schema: dict | None = None, cls=Tool) -> Tool:
+    return cls(name=name, description=description, inputSchema=schema or {"type": "object"})
+
+
+class Compiler:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, tool: Tool) -> dict:
+        self.calls += 1
+        return {"name": tool.name, "parameters": tool.inputSchema}
+
+
+def test_schema_hash_ignores_name_and_tracks_schema():
+    assert tool_schema_hash(_tool("a")) == tool_schema_hash(_tool("b"))
+    assert tool_schema_hash(_tool()) != tool_schema_hash(_tool(description="Find"))
+    assert tool_schema_hash(_tool()) != tool_schema_hash(
+        _tool(schema={"type": "object", "properties": {"q": {"type": "string"}}})
+    )
+
+
+def test_equal_tools_compile_once():
+    cache, compile_fn = ToolSchemaCache(), Compiler()
+    first = cache.compile("openai", _tool(), compile_fn)
+    second = cache.compile("openai", _tool(), compile_fn)
+    assert second is first
+    assert compile_fn.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_schema_change_recompiles():
+    cache, compile_fn = ToolSchemaCache(), Compiler()
+    cache.compile("openai", _tool(), compile_fn)
+    changed = cache.compile("openai", _tool(schema={"type": "object", "required": ["q"]}), compile_fn)
+    assert changed["parameters"]["required"] == ["q"]
+    assert compile_fn.calls == 2
+
+
+def test_providers_are_cached_separately():
+    cache, compile_fn = ToolSchemaCache(), Compiler()
+    cache.compile("openai", _tool(), compile_fn)
+    cache.compile("google", _tool(), compile_fn)
+    assert compile_fn.calls == 2
+
+
+def test_compile_all_keeps_order():
+    cache, compile_fn = ToolSchemaCache(), Compiler()
+    tools = [_tool("b"), _tool("a"), _tool("c")]
+    assert [d["name"] for d in cache.compile_all("openai", tools, compile_fn)] == ["b", "a", "c"]
+
+
+def test_lru_eviction_and_clear():
+    cache, compile_fn = ToolSchemaCache(max_size=2), Compiler()
+    for name in ("a", "b", "c"):
+        cache.compile("openai", _tool(name), compile_fn)
+    cache.compile("openai", _tool("a"), compile_fn)
+    assert compile_fn.calls == 4
+
+    cache.clear()
+    cache.compile("openai", _tool("c"), compile_fn)
+    assert compile_fn.calls == 5
+
+
+def test_frozen_tools_reuse_their_schema_hash(monkeypatch):
+    import mcp_agent.workflows.llm.tool_schema_cache as module
+
+    hashed = []
+    original = module.tool_schema_hash
+    monkeypatch.setattr(module, "tool_schema_hash", lambda tool: hashed.append(tool.name) or original(tool))
+
+    cache, compile_fn = ToolSchemaCache(), Compiler()
+    frozen = _tool("frozen", cls=FrozenTool)
+    plain = _tool("plain")
+    for _ in range(3):
+        cache.compile("openai", frozen, compile_fn)
+        cache.compile("openai", plain, compile_fn)
+    assert hashed.count("frozen") == 1
+    assert hashed.count("plain") == 3